@@ -0,0 +1,154 @@
+"""
+Serialization / compression benchmark for the large API payloads
+
+Compares the previous response path (jsonable_encoder + json.dumps, no
+compression) with the current one (orjson, gzip or brotli above the size
+threshold) on synthetic payloads shaped like /analytics/journals,
+/admin/submissions, /journals and /journals/structure.
+
+Usage:
+    python bench_serialization.py [--scale 1.0] [--repeat 20] [--bandwidth-mbps 10]
+
+Transfer time is estimated from the body size at the given bandwidth.
+Brotli rows are skipped unless the optional `brotli` package is installed.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Same settings as the server's CompressionMiddleware
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+rng = random.Random(42)
+
+def journal_analytics(n: int) -> list:
+    return [{
+        "journal_id": f"journal_{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}",
+        "journal_name": f"Journal of {rng.choice(['Applied', 'Theoretical', 'Clinical', 'Computational'])} Studies {i}",
+        "publisher_id": f"pub_{rng.randrange(60):012d}",
+        "publisher_name": rng.choice(["Elsevier", "Springer Nature", "Wiley", "Taylor & Francis", "MDPI"]),
+        "total_cases": rng.randrange(5, 400),
+        "transparency_score": round(rng.uniform(0, 100), 1),
+        "review_depth_score": round(rng.uniform(0, 100), 1),
+        "editorial_effort_score": round(rng.uniform(0, 100), 1),
+        "consistency_score": round(rng.uniform(0, 100), 1),
+        "desk_reject_rate": round(rng.uniform(0, 100), 1),
+        "no_peer_review_rate": round(rng.uniform(0, 100), 1)
+    } for i in range(n)]
+
+def admin_submissions(n: int) -> dict:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    submissions = [{
+        "submission_id": f"sub_{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}",
+        "user_hashed_id": uuid.UUID(int=rng.getrandbits(128)).hex,
+        "journal_id": f"journal_{rng.randrange(2000):012d}",
+        "publisher_id": f"pub_{rng.randrange(60):012d}",
+        "journal_name": "Journal of Applied Studies",
+        "publisher_name": "Springer Nature",
+        "scientific_area_grande": "1",
+        "scientific_area_area": "1.03",
+        "scientific_area_subarea": "1.03.02",
+        "manuscript_type": rng.choice(["experimental", "methodological", "review"]),
+        "decision_type": rng.choice(["desk_reject", "reject_after_review", "major_revision", "minor_revision"]),
+        "reviewer_count": rng.choice(["0", "1", "2+"]),
+        "time_to_decision": rng.choice(["0-30", "31-90", "90+"]),
+        "apc_range": rng.choice(["no_apc", "under_1000", "1000_3000", "over_3000"]),
+        "review_comments": rng.sample(["methodology", "statistics", "conceptual", "formatting_language"], 2),
+        "editor_comments": rng.choice(["yes_technical", "yes_generic", "no"]),
+        "perceived_coherence": rng.choice(["yes", "partially", "no"]),
+        "status": rng.choice(["pending", "validated", "flagged"]),
+        "valid_for_stats": True,
+        "validation_flags": {"issues": [], "warnings": ["fast_submission"]},
+        "has_evidence": rng.random() < 0.5,
+        "created_at": (start + timedelta(minutes=i)).isoformat()
+    } for i in range(n)]
+    return {"submissions": submissions, "total": n * 40, "skip": 0, "limit": n}
+
+def journals_list(n: int) -> list:
+    return [{
+        "journal_id": f"journal_{i:012d}",
+        "name": f"Journal of {rng.choice(['Applied', 'Theoretical', 'Clinical'])} Research {i}",
+        "name_key": f"journal of research {i}",
+        "publisher_id": f"pub_{i % 60:012d}",
+        "is_user_added": False,
+        "is_verified": True,
+        "open_access": rng.choice([True, False, None]),
+        "validated_submission_count": rng.randrange(100),
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat()
+    } for i in range(n)]
+
+def journals_structure(publishers: int, per_publisher: int) -> dict:
+    return {
+        f"Publisher {p}": [f"Journal {p}-{j} of Advanced Studies" for j in range(per_publisher)]
+        for p in range(publishers)
+    }
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of `repeat` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def gzip_compress(body: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+def brotli_compress(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply payload sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (best is kept)")
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0, help="Link speed for transfer estimates")
+    args = parser.parse_args()
+
+    def scaled(n: int) -> int:
+        return max(1, int(n * args.scale))
+
+    payloads = {
+        "/analytics/journals": journal_analytics(scaled(1000)),
+        "/admin/submissions": admin_submissions(scaled(200)),
+        "/journals": journals_list(scaled(5000)),
+        "/journals/structure": journals_structure(scaled(60), 40)
+    }
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+
+    print(f"Best of {args.repeat} runs; transfer estimated at {args.bandwidth_mbps:g} Mbit/s")
+    print(f"{'payload':<22}{'path':<24}{'serialize ms':>14}{'compress ms':>13}{'bytes':>11}{'transfer ms':>13}{'total ms':>10}")
+
+    for name, payload in payloads.items():
+        before_ms = best_of(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+        body = orjson.dumps(payload)
+        after_ms = best_of(lambda: orjson.dumps(payload), args.repeat)
+
+        rows = [("json + encoder (before)", before_ms, 0.0, len(json.dumps(jsonable_encoder(payload)).encode()))]
+        rows.append(("orjson", after_ms, 0.0, len(body)))
+        rows.append(("orjson + gzip", after_ms, best_of(lambda: gzip_compress(body), args.repeat), len(gzip_compress(body))))
+        if brotli is not None:
+            rows.append(("orjson + brotli", after_ms, best_of(lambda: brotli_compress(body), args.repeat), len(brotli_compress(body))))
+
+        for label, serialize_ms, compress_ms, size in rows:
+            transfer_ms = size / bytes_per_ms
+            total_ms = serialize_ms + compress_ms + transfer_ms
+            print(f"{name:<22}{label:<24}{serialize_ms:>14.2f}{compress_ms:>13.2f}{size:>11,}{transfer_ms:>13.1f}{total_ms:>10.1f}")
+        print()
+
+if __name__ == "__main__":
+    main()
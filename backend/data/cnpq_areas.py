@@ -970,35 +970,20 @@ def get_subareas(area_code: str):
     
     return area.get("subareas", [])
 
+def _build_code_index():
+    """Flat code -> details map over all three levels"""
+    index = {}
+    for ga_code, ga in CNPQ_AREAS.items():
+        index[ga_code] = {"type": "grande_area", "code": ga_code, "name": ga["name"], "name_en": ga["name_en"]}
+        for area_code, area in ga["areas"].items():
+            index[area_code] = {"type": "area", "code": area_code, "name": area["name"], "name_en": area["name_en"]}
+            for subarea in area.get("subareas", []):
+                index[subarea["code"]] = {"type": "subarea", "code": subarea["code"], "name": subarea["name"], "name_en": subarea["name_en"]}
+    return index
+
+_CODE_INDEX = _build_code_index()
+
 def get_area_by_code(code: str):
     """Get area details by full code (e.g., "1.01.02")"""
-    parts = code.split(".")
-    
-    if len(parts) == 1:
-        # Grande Área
-        ga = CNPQ_AREAS.get(code)
-        if ga:
-            return {"type": "grande_area", "code": code, "name": ga["name"], "name_en": ga["name_en"]}
-    
-    elif len(parts) == 2:
-        # Área
-        grande_area_code = parts[0]
-        ga = CNPQ_AREAS.get(grande_area_code)
-        if ga:
-            area = ga["areas"].get(code)
-            if area:
-                return {"type": "area", "code": code, "name": area["name"], "name_en": area["name_en"]}
-    
-    elif len(parts) == 3:
-        # Subárea
-        grande_area_code = parts[0]
-        area_code = f"{parts[0]}.{parts[1]}"
-        ga = CNPQ_AREAS.get(grande_area_code)
-        if ga:
-            area = ga["areas"].get(area_code)
-            if area:
-                for subarea in area.get("subareas", []):
-                    if subarea["code"] == code:
-                        return {"type": "subarea", "code": code, "name": subarea["name"], "name_en": subarea["name_en"]}
-    
-    return None
+    area = _CODE_INDEX.get(code)
+    return dict(area) if area else None
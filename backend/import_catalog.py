@@ -0,0 +1,62 @@
+"""
+Bulk journal catalog import for Editorial Decision Statistics Platform
+Loads a local OpenAlex/DOAJ dump (JSONL or CSV, optionally gzip-compressed)
+
+Usage:
+    python import_catalog.py sources.jsonl.gz [--format jsonl|csv] [--source openalex] [--open-access]
+
+Records are upserted in unordered batches against the catalog's unique keys,
+so an import can be re-run safely. Running servers pick up the new catalog
+on their next version sync (VERSION_SYNC_SECONDS).
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from server import (
+    client,
+    ensure_indexes,
+    catalog_dump_format,
+    open_catalog_dump,
+    iter_catalog_dump,
+    import_catalog
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import journals and publishers from a catalog dump")
+    parser.add_argument("path", type=Path, help="JSONL or CSV dump (.gz allowed)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Dump format (default: from the file extension)")
+    parser.add_argument("--source", help="Recorded on new journals/publishers (default: file name)")
+    parser.add_argument("--open-access", action="store_true",
+                        help="Mark journals without an open access field as open access (e.g. DOAJ CSV)")
+    args = parser.parse_args()
+
+    try:
+        fmt = catalog_dump_format(args.path.name, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # The upserts rely on the unique name_key indexes
+    await ensure_indexes()
+
+    source = args.source or args.path.name.split(".")[0]
+    with open(args.path, "rb") as binary:
+        lines = open_catalog_dump(binary, args.path.name)
+        report = await import_catalog(
+            iter_catalog_dump(lines, fmt, args.path.name),
+            source=source,
+            open_access_default=True if args.open_access else None
+        )
+
+    print(json.dumps(report, indent=2))
+    client.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -1,21 +1,56 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, UploadFile, File, Depends
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bson import ObjectId
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterable, Iterator
 import uuid
 import hashlib
+import hmac
+import re
+import unicodedata
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 import httpx
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
+from PIL import Image, ImageOps
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.exceptions import InvalidTag
+import struct
+import bisect
+import itertools
+import functools
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 import base64
+import json
+import io
+import csv
+import gzip
+import zlib
+import orjson
 from urllib.parse import urlencode
 
+try:
+    import brotli
+except ImportError:  # optional: compressed responses fall back to gzip
+    brotli = None
+
 
 
 ROOT_DIR = Path(__file__).parent
@@ -26,9 +61,25 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Encryption key for evidence files
-ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY', Fernet.generate_key().decode())
-fernet = Fernet(ENCRYPTION_KEY.encode() if isinstance(ENCRYPTION_KEY, str) else ENCRYPTION_KEY)
+# Encryption keys for evidence files. ENCRYPTION_KEYS is a comma-separated
+# keyring of Fernet-format keys, newest first: the first (primary) key
+# encrypts new evidence, the others only decrypt until the rewrap job has
+# moved everything to the primary. ENCRYPTION_KEY still works for one key.
+ENCRYPTION_KEYS = [
+    key.strip()
+    for key in os.environ.get('ENCRYPTION_KEYS', os.environ.get('ENCRYPTION_KEY', '')).split(',')
+    if key.strip()
+]
+if not ENCRYPTION_KEYS:
+    # A random key makes every stored evidence file unreadable after a restart
+    if os.environ.get('ALLOW_EPHEMERAL_ENCRYPTION_KEY', '').lower() not in ('1', 'true', 'yes'):
+        raise RuntimeError(
+            "ENCRYPTION_KEYS (or ENCRYPTION_KEY) must be set; "
+            "set ALLOW_EPHEMERAL_ENCRYPTION_KEY=1 to use a throwaway key in development"
+        )
+    ENCRYPTION_KEYS = [Fernet.generate_key().decode()]
+    logging.getLogger(__name__).warning("Using an ephemeral evidence encryption key (ALLOW_EPHEMERAL_ENCRYPTION_KEY)")
+fernet = MultiFernet([Fernet(key.encode()) for key in ENCRYPTION_KEYS])
 
 # ORCID OAuth Configuration
 ORCID_CLIENT_ID = os.environ.get('ORCID_CLIENT_ID', '')
@@ -43,8 +94,34 @@ ORCID_REDIRECT_URI = os.environ.get('ORCID_REDIRECT_URI', '')
 UPLOAD_DIR = Path("/app/uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Evidence is streamed in fixed-size chunks; uploads above the limit are rejected early
+EVIDENCE_CHUNK_SIZE = int(os.environ.get("EVIDENCE_CHUNK_SIZE", str(64 * 1024)))
+MAX_EVIDENCE_BYTES = int(os.environ.get("MAX_EVIDENCE_BYTES", str(10 * 1024 * 1024)))
+# Dedicated pool for evidence crypto and disk I/O, kept off the event loop
+EVIDENCE_IO_WORKERS = int(os.environ.get("EVIDENCE_IO_WORKERS", "4"))
+EVIDENCE_IO_MAX_PENDING = int(os.environ.get("EVIDENCE_IO_MAX_PENDING", "64"))
+# Where new evidence is stored: "local" (UPLOAD_DIR), "gridfs" or "s3".
+# Existing objects stay readable from the backend recorded on their document.
+EVIDENCE_STORAGE = os.environ.get("EVIDENCE_STORAGE", "local")
+GRIDFS_EVIDENCE_BUCKET = os.environ.get("GRIDFS_EVIDENCE_BUCKET", "evidence")
+S3_EVIDENCE_BUCKET = os.environ.get("S3_EVIDENCE_BUCKET", "")
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None  # e.g. a MinIO server
+S3_REGION = os.environ.get("S3_REGION") or None
+# Longest side (px) of the JPEG previews shown in the moderation screen
+EVIDENCE_PREVIEW_MAX_SIZE = int(os.environ.get("EVIDENCE_PREVIEW_MAX_SIZE", "480"))
+# A preview render claimed longer ago than this is presumed dead and may be re-claimed
+EVIDENCE_PREVIEW_LEASE_SECONDS = float(os.environ.get("EVIDENCE_PREVIEW_LEASE_SECONDS", "300"))
+# Failed renders are retried after this delay, doubling per attempt (capped at a day)
+EVIDENCE_PREVIEW_RETRY_SECONDS = float(os.environ.get("EVIDENCE_PREVIEW_RETRY_SECONDS", "60"))
+
 # Create the main app
-app = FastAPI(title="Editorial Decision Statistics Platform")
+class FastJSONResponse(ORJSONResponse):
+    """orjson rendering; non-string dict keys are stringified, as the json module does"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+app = FastAPI(title="Editorial Decision Statistics Platform", default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -92,6 +169,11 @@ class SubmissionModeration(BaseModel):
     status: str  # validated, flagged, pending
     admin_notes: Optional[str] = None
 
+class BulkSubmissionModeration(BaseModel):
+    submission_ids: List[str]
+    status: str  # validated, flagged, pending
+    admin_notes: Optional[str] = None
+
 class AdminStats(BaseModel):
     total_users: int
     total_submissions: int
@@ -203,12 +285,72 @@ class EvidenceFile(BaseModel):
     model_config = ConfigDict(extra="ignore")
     file_id: str
     user_hashed_id: str
-    encrypted_path: str
+    content_hash: Optional[str] = None
+    storage_backend: Optional[str] = None  # absent on legacy local files
+    storage_key: Optional[str] = None
+    encrypted_path: Optional[str] = None  # legacy local files only
     original_filename: str
     mime_type: str
     retention_until: datetime
     created_at: datetime
 
+# ============== DATA VERSIONS ==============
+
+# How often each process pulls versions bumped by other workers
+VERSION_SYNC_SECONDS = float(os.environ.get("VERSION_SYNC_SECONDS", "5"))
+
+class VersionSource:
+    """Monotonic version number for one kind of read-mostly data.
+    
+    Writers call bump() after changing the data: the shared counter in the
+    `counters` collection is incremented and the new value is adopted locally
+    at once. Other processes pick it up with sync() (every
+    VERSION_SYNC_SECONDS), so reading `value` never costs a query.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+    
+    async def bump(self) -> int:
+        counter = await db.counters.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.value = max(self.value, counter["value"])
+        return counter["value"]
+    
+    async def sync(self):
+        counter = await db.counters.find_one({"_id": self.name})
+        if counter:
+            self.value = max(self.value, counter["value"])
+
+# Journals/publishers (also stamped on the documents for delta sync)
+CATALOG_VERSION = VersionSource("catalog_version")
+# Platform settings (visibility mode, thresholds, overrides)
+SETTINGS_VERSION = VersionSource("settings_version")
+# Submissions feeding the public statistics
+ANALYTICS_VERSION = VersionSource("analytics_version")
+# CNPq area tree
+AREAS_VERSION = VersionSource("areas_version")
+
+VERSION_SOURCES = [CATALOG_VERSION, SETTINGS_VERSION, ANALYTICS_VERSION, AREAS_VERSION]
+
+async def sync_versions():
+    await asyncio.gather(*(source.sync() for source in VERSION_SOURCES))
+
+async def version_sync_loop():
+    """Keep the local data versions in step with the other workers"""
+    while True:
+        await asyncio.sleep(VERSION_SYNC_SECONDS)
+        try:
+            await sync_versions()
+            await refresh_catalog_indexes()
+        except Exception as e:
+            logger.error(f"Version sync error: {e}")
+
 # ============== PLATFORM SETTINGS HELPERS ==============
 
 # Default settings (used when no settings exist in DB)
@@ -529,7 +671,7 @@ async def get_me(request: Request):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     # Busca dados frescos do banco
-    user_doc = await db.users.find_one({"user_id": user.user_id}, {"_id": 0})
+    user_doc = await db.users.find_one({"user_id": user.user_id}, PUBLIC_DOC_PROJECTION)
     
     # APLICA A NOVA LÓGICA: Calcula se tem orcid
     user_doc = enrich_user_data(user_doc)
@@ -647,7 +789,7 @@ async def orcid_callback(request: Request, response: Response):
         )
         
         # Busca usuário atualizado para retornar
-        user_doc = await db.users.find_one({"user_id": current_user.user_id}, {"_id": 0})
+        user_doc = await db.users.find_one({"user_id": current_user.user_id}, PUBLIC_DOC_PROJECTION)
         user_doc = enrich_user_data(user_doc)
         return user_doc
 
@@ -712,7 +854,7 @@ async def orcid_callback(request: Request, response: Response):
             max_age=7 * 24 * 60 * 60
         )
         
-        user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
+        user_doc = await db.users.find_one({"user_id": user_id}, PUBLIC_DOC_PROJECTION)
         user_doc = enrich_user_data(user_doc)
         
         # Redirecionamento
@@ -898,324 +1040,2483 @@ async def update_profile(update: UserProfileUpdate, request: Request):
             {"$set": update_data}
         )
     
-    user_doc = await db.users.find_one({"user_id": user.user_id}, {"_id": 0})
+    user_doc = await db.users.find_one({"user_id": user.user_id}, PUBLIC_DOC_PROJECTION)
     return user_doc
 
-# ============== JOURNALS & PUBLISHERS ==============
-
-@api_router.get("/publishers")
-async def get_publishers():
-    """Get all publishers"""
-    publishers = await db.publishers.find({}, {"_id": 0}).sort("name", 1).to_list(1000)
-    return publishers
+# ============== EVIDENCE STORAGE ==============
 
-@api_router.get("/journals")
-async def get_journals(publisher_id: Optional[str] = None):
-    """Get journals, optionally filtered by publisher"""
-    query = {}
-    if publisher_id:
-        query["publisher_id"] = publisher_id
+class EvidenceIOExecutor:
+    """Bounded thread pool for evidence encryption, decryption and file I/O.
     
-    journals = await db.journals.find(query, {"_id": 0}).sort("name", 1).to_list(1000)
-    return journals
-
-@api_router.post("/journals")
-async def add_journal(request: Request, name: str, publisher_id: str):
-    """Add a new journal (user-submitted, flagged for review)"""
-    user = await require_auth(request)
+    At most `max_pending` jobs are submitted to the pool at once; further
+    callers wait for a slot, so a burst of large uploads applies backpressure
+    instead of growing an unbounded queue. Counters are exposed through
+    stats() for the admin metrics endpoint.
+    """
     
-    journal_id = f"journal_{uuid.uuid4().hex[:12]}"
-    journal = {
-        "journal_id": journal_id,
-        "name": name,
-        "publisher_id": publisher_id,
-        "is_user_added": True,
-        "added_by_hashed_id": user.hashed_id,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.journals.insert_one(journal)
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evidence-io")
+        self._slots = asyncio.Semaphore(max_pending)
+        # Counters are updated from both the event loop and worker threads
+        self._lock = threading.Lock()
+        self.waiting = 0  # waiting for a submission slot
+        self.queued = 0   # submitted, not yet picked up by a worker
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_wait = 0.0
+        self._total_queue_wait = 0.0
+    
+    async def run(self, fn, *args):
+        """Run fn(*args) on the evidence pool and return its result"""
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        
+        submitted_at = time.monotonic()
+        
+        def job():
+            wait = time.monotonic() - submitted_at
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._total_queue_wait += wait
+                self.max_queue_wait = max(self.max_queue_wait, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+        
+        with self._lock:
+            self.queued += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            self._slots.release()
+        with self._lock:
+            self.completed += 1
+        return result
+    
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "waiting_for_slot": self.waiting,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_queue_wait_ms": round(self._total_queue_wait / finished * 1000, 2) if finished else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 2)
+        }
     
-    return {"journal_id": journal_id, "name": name, "publisher_id": publisher_id}
-
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
 
+evidence_io = EvidenceIOExecutor(EVIDENCE_IO_WORKERS, EVIDENCE_IO_MAX_PENDING)
 
-# --- ROTA NOVA: Estrutura para o Frontend (Cascata) ---
-@api_router.get("/journals/structure")
-async def get_journals_structure():
-    """Returns { 'Publisher Name': ['Journal A', 'Journal B'], ... }"""
+class EvidenceStorage(ABC):
+    """Where encrypted evidence objects live.
     
-    structure = {}
+    Objects are opaque encrypted bytes addressed by a key. Implementations
+    must make put() atomic (a failed or oversized upload leaves nothing
+    behind) and support byte-range reads, which ranged downloads rely on.
+    """
     
-    # Busca todos os journals (verificados ou adicionados por usuários)
-    # Otimização: Buscamos apenas o nome e o ID do publisher
-    cursor = db.journals.find({}, {"publisher_id": 1, "name": 1, "_id": 0})
+    name = ""
     
-    # Cache local de nomes de publishers para não consultar o banco mil vezes
-    publisher_names = {}
+    @abstractmethod
+    async def put(self, key: str, chunks) -> int:
+        """Store the async iterable `chunks` under `key`, returning bytes written"""
     
-    async for doc in cursor:
-        pub_id = doc.get("publisher_id")
-        j_name = doc.get("name")
-        
-        if not pub_id or not j_name:
-            continue
-            
-        # Resolve o nome do Publisher
-        if pub_id not in publisher_names:
-            pub = await db.publishers.find_one({"publisher_id": pub_id}, {"name": 1})
-            publisher_names[pub_id] = pub["name"] if pub else "Other"
-            
-        pub_name = publisher_names[pub_id]
+    @abstractmethod
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield the stored bytes start..end (inclusive; None reads to the end).
         
-        if pub_name not in structure:
-            structure[pub_name] = []
+        Implemented as an async generator.
         
-        if j_name not in structure[pub_name]:
-            structure[pub_name].append(j_name)
-            
-    return structure
-
-# ============== SUBMISSIONS ==============
-
-@api_router.post("/submissions")
-async def create_submission(submission: SubmissionCreate, request: Request):
-    """Create a new editorial decision submission with Crowdsourcing Learning"""
+        Raises:
+            FileNotFoundError: if the object does not exist
+        """
     
-    # 1. Autenticação
-    user = await require_auth(request)
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[int]:
+        """Stored size in bytes, or None if the object does not exist"""
     
-    # Guarda de Integridade Científica (ORCID Check)
-    user_doc = await db.users.find_one({"user_id": user.user_id})
-    has_orcid = (
-        user_doc.get("has_orcid") is True or 
-        user_doc.get("orcid_hash") is not None or 
-        user_doc.get("auth_provider") == "orcid"
-    )
+    @abstractmethod
+    async def delete(self, key: str) -> int:
+        """Delete an object, returning the bytes freed (0 if it was already gone)"""
+    
+    async def read_range(self, key: str, start: int, length: int) -> bytes:
+        blocks = [block async for block in self.stream(key, start, start + length - 1)]
+        return b"".join(blocks)
 
-    if not has_orcid:
-        raise HTTPException(
-            status_code=403, 
-            detail="Scientific Integrity Check: You must link your ORCID account in Settings to submit evidence."
+class LocalEvidenceStorage(EvidenceStorage):
+    """Encrypted objects as files under a local directory"""
+    
+    name = "local"
+    STREAM_BLOCK_SIZE = 256 * 1024
+    
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.enc"
+    
+    async def put(self, key: str, chunks) -> int:
+        # Written under a temporary name and moved into place once complete
+        destination = self.path(key)
+        partial = destination.with_name(destination.name + ".part")
+        written = 0
+        out = None
+        try:
+            out = await evidence_io.run(open, partial, "wb")
+            async for chunk in chunks:
+                await evidence_io.run(out.write, chunk)
+                written += len(chunk)
+            await evidence_io.run(out.close)
+            await evidence_io.run(os.replace, partial, destination)
+        except BaseException:
+            if out is not None:
+                out.close()
+            partial.unlink(missing_ok=True)
+            raise
+        return written
+    
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None):
+        f = await evidence_io.run(open, self.path(key), "rb")
+        try:
+            await evidence_io.run(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = self.STREAM_BLOCK_SIZE if remaining is None else min(self.STREAM_BLOCK_SIZE, remaining)
+                block = await evidence_io.run(f.read, size)
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                yield block
+        finally:
+            f.close()
+    
+    async def stat(self, key: str) -> Optional[int]:
+        try:
+            return (await evidence_io.run(self.path(key).stat)).st_size
+        except FileNotFoundError:
+            return None
+    
+    async def delete(self, key: str) -> int:
+        def remove() -> int:
+            target = self.path(key)
+            try:
+                size = target.stat().st_size
+                target.unlink()
+                return size
+            except FileNotFoundError:
+                return 0
+        return await evidence_io.run(remove)
+
+class GridFSEvidenceStorage(EvidenceStorage):
+    """Encrypted objects in a MongoDB GridFS bucket, shared by every API node"""
+    
+    name = "gridfs"
+    
+    def __init__(self, database, bucket_name: str):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+        self.files = database[f"{bucket_name}.files"]
+    
+    async def put(self, key: str, chunks) -> int:
+        # The file document is only written on close, so partial uploads stay invisible
+        upload = self.bucket.open_upload_stream(key)
+        written = 0
+        try:
+            async for chunk in chunks:
+                await upload.write(chunk)
+                written += len(chunk)
+        except BaseException:
+            await upload.abort()
+            raise
+        await upload.close()
+        return written
+    
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None):
+        from gridfs.errors import NoFile
+        try:
+            grid_out = await self.bucket.open_download_stream_by_name(key)
+        except NoFile:
+            raise FileNotFoundError(key)
+        grid_out.seek(start)
+        remaining = (grid_out.length if end is None else end + 1) - start
+        while remaining > 0:
+            block = await grid_out.readchunk()
+            if not block:
+                break
+            block = block[:remaining]
+            remaining -= len(block)
+            yield block
+    
+    async def stat(self, key: str) -> Optional[int]:
+        stored = await self.files.find_one({"filename": key}, {"length": 1}, sort=[("uploadDate", -1)])
+        return stored["length"] if stored else None
+    
+    async def delete(self, key: str) -> int:
+        freed = 0
+        async for stored in self.files.find({"filename": key}, {"length": 1}):
+            await self.bucket.delete(stored["_id"])
+            freed += stored["length"]
+        return freed
+
+class S3EvidenceStorage(EvidenceStorage):
+    """Encrypted objects in an S3-compatible bucket (AWS S3, MinIO, ...).
+    
+    boto3 is synchronous, so every call runs on the evidence I/O pool.
+    Credentials come from the standard AWS environment/config chain.
+    """
+    
+    name = "s3"
+    STREAM_BLOCK_SIZE = 256 * 1024
+    SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+    
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        import boto3
+        from botocore.exceptions import ClientError
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.bucket = bucket
+        self._client_error = ClientError
+    
+    def object_key(self, key: str) -> str:
+        return f"evidence/{key}.enc"
+    
+    def _is_missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+    
+    async def put(self, key: str, chunks) -> int:
+        # S3 needs the whole object (or 5 MiB multipart parts) per request: spool
+        # the encrypted stream, then let boto3's managed transfer upload it.
+        # The object only becomes visible once the upload completes.
+        spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_MEMORY)
+        written = 0
+        try:
+            async for chunk in chunks:
+                await evidence_io.run(spool.write, chunk)
+                written += len(chunk)
+            await evidence_io.run(spool.seek, 0)
+            await evidence_io.run(self.client.upload_fileobj, spool, self.bucket, self.object_key(key))
+        finally:
+            spool.close()
+        return written
+    
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None):
+        request = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if start or end is not None:
+            request["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = await evidence_io.run(functools.partial(self.client.get_object, **request))
+        except self._client_error as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+        body = response["Body"]
+        try:
+            while True:
+                block = await evidence_io.run(body.read, self.STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+        finally:
+            body.close()
+    
+    async def stat(self, key: str) -> Optional[int]:
+        try:
+            head = await evidence_io.run(functools.partial(
+                self.client.head_object, Bucket=self.bucket, Key=self.object_key(key)
+            ))
+        except self._client_error as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return head["ContentLength"]
+    
+    async def delete(self, key: str) -> int:
+        size = await self.stat(key)
+        if size is None:
+            return 0
+        await evidence_io.run(functools.partial(
+            self.client.delete_object, Bucket=self.bucket, Key=self.object_key(key)
+        ))
+        return size
+
+def create_evidence_storage(name: str) -> EvidenceStorage:
+    if name == "local":
+        return LocalEvidenceStorage(UPLOAD_DIR)
+    if name == "gridfs":
+        return GridFSEvidenceStorage(db, GRIDFS_EVIDENCE_BUCKET)
+    if name == "s3":
+        if not S3_EVIDENCE_BUCKET:
+            raise RuntimeError("S3_EVIDENCE_BUCKET must be set to use S3 evidence storage")
+        return S3EvidenceStorage(S3_EVIDENCE_BUCKET, S3_ENDPOINT_URL, S3_REGION)
+    raise ValueError(f"Unknown evidence storage backend: {name}")
+
+_evidence_storages: Dict[str, EvidenceStorage] = {}
+
+def get_evidence_storage(name: Optional[str] = None) -> EvidenceStorage:
+    """Storage backend by name (default: EVIDENCE_STORAGE, used for new uploads)"""
+    name = name or EVIDENCE_STORAGE
+    if name not in _evidence_storages:
+        _evidence_storages[name] = create_evidence_storage(name)
+    return _evidence_storages[name]
+
+# Fields locating (and keying) an evidence object, copied from a blob onto each evidence file
+EVIDENCE_LOCATION_FIELDS = ("storage_backend", "storage_key", "encrypted_path", "key_id")
+
+def evidence_location(doc: dict) -> tuple:
+    """(storage, key) of the object behind an evidence file or blob document.
+    
+    Documents written before pluggable storage only carry a local encrypted_path.
+    """
+    if doc.get("storage_backend"):
+        return get_evidence_storage(doc["storage_backend"]), doc["storage_key"]
+    return get_evidence_storage("local"), Path(doc["encrypted_path"]).stem
+
+async def delete_evidence_object(doc: dict) -> int:
+    """Delete the object behind an evidence file or blob document, returning the bytes freed"""
+    storage, key = evidence_location(doc)
+    return await storage.delete(key)
+
+# ============== EVIDENCE ENCRYPTION ==============
+
+# Streaming format ("stream-v1"), replacing whole-file Fernet tokens:
+#
+#   header:  b"PPE1" | key id (8) | chunk size (uint32) | nonce prefix (8)
+#   chunks:  AES-256-GCM(chunk) + 16-byte tag, one per EVIDENCE_CHUNK_SIZE of plaintext
+#
+# Each chunk's nonce is the random per-file prefix plus the chunk index, and its
+# associated data binds the header, the index and a "final chunk" flag, so chunks
+# cannot be reordered, dropped or the file truncated without failing authentication.
+# Fixed-size chunks also make byte offsets map directly to chunk positions.
+
+EVIDENCE_MAGIC = b"PPE1"
+EVIDENCE_HEADER = struct.Struct(">4s8sI8s")
+EVIDENCE_TAG_SIZE = 16
+EVIDENCE_FORMAT_STREAM = "stream-v1"
+EVIDENCE_FORMAT_FERNET = "fernet"
+
+class EvidenceKey:
+    """AES-256-GCM key for evidence streams, derived from a Fernet-format secret"""
+    
+    def __init__(self, secret: str):
+        material = base64.urlsafe_b64decode(secret.encode() if isinstance(secret, str) else secret)
+        self.key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"pproc-evidence-stream-v1"
+        ).derive(material)
+        self.key_id = hashlib.sha256(self.key).digest()[:8]
+        self.aead = AESGCM(self.key)
+        # Separate key for content addressing, so blob hashes reveal nothing
+        # about the plaintext to anyone without the secret
+        self.hash_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"pproc-evidence-blob-v1"
+        ).derive(material)
+
+def _chunk_aad(header: bytes, index: int, final: bool) -> bytes:
+    return header + struct.pack(">IB", index, 1 if final else 0)
+
+def _chunk_nonce(nonce_prefix: bytes, index: int) -> bytes:
+    return nonce_prefix + struct.pack(">I", index)
+
+class EvidenceEncryptor:
+    """Encrypts one evidence stream chunk by chunk (memory is O(chunk size))"""
+    
+    def __init__(self, evidence_key: EvidenceKey, chunk_size: int = EVIDENCE_CHUNK_SIZE):
+        self.evidence_key = evidence_key
+        self.chunk_size = chunk_size
+        self.nonce_prefix = os.urandom(8)
+        self.header = EVIDENCE_HEADER.pack(EVIDENCE_MAGIC, evidence_key.key_id, chunk_size, self.nonce_prefix)
+        self.index = 0
+    
+    def encrypt_chunk(self, chunk: bytes, final: bool) -> bytes:
+        encrypted = self.evidence_key.aead.encrypt(
+            _chunk_nonce(self.nonce_prefix, self.index),
+            chunk,
+            _chunk_aad(self.header, self.index, final)
+        )
+        self.index += 1
+        return encrypted
+
+class EvidenceStreamInfo:
+    """Parsed stream-v1 header plus the geometry needed for random access"""
+    
+    def __init__(self, header: bytes, encrypted_size: int):
+        magic, self.key_id, self.chunk_size, self.nonce_prefix = EVIDENCE_HEADER.unpack(header)
+        if magic != EVIDENCE_MAGIC:
+            raise ValueError("Not a stream-v1 evidence file")
+        self.header = header
+        self.encrypted_size = encrypted_size
+        self.encrypted_chunk_size = self.chunk_size + EVIDENCE_TAG_SIZE
+        body = encrypted_size - EVIDENCE_HEADER.size
+        self.chunk_count = max(1, -(-body // self.encrypted_chunk_size))
+        self.plaintext_size = body - self.chunk_count * EVIDENCE_TAG_SIZE
+        if self.plaintext_size < 0:
+            raise ValueError("Truncated stream-v1 evidence file")
+    
+    def chunk_offset(self, index: int) -> int:
+        """Byte offset of an encrypted chunk in the file"""
+        return EVIDENCE_HEADER.size + index * self.encrypted_chunk_size
+    
+    def encrypted_chunk_length(self, index: int) -> int:
+        """Stored length of a chunk (only the final one can be short)"""
+        return min(self.encrypted_chunk_size, self.encrypted_size - self.chunk_offset(index))
+    
+    def decrypt_chunk(self, evidence_key: EvidenceKey, index: int, encrypted: bytes) -> bytes:
+        return evidence_key.aead.decrypt(
+            _chunk_nonce(self.nonce_prefix, index),
+            encrypted,
+            _chunk_aad(self.header, index, index == self.chunk_count - 1)
         )
 
-    # =========================================================================
-    # 2. Lógica de "Aprendizado" (Crowdsourcing) - O CORAÇÃO DA MUDANÇA
-    # =========================================================================
+class EvidenceKeyring:
+    """Every configured evidence key: the primary encrypts, any of them decrypts"""
     
-    final_publisher_id = submission.publisher_id
-    final_journal_id = submission.journal_id
+    def __init__(self, secrets: List[str]):
+        self.keys = [EvidenceKey(secret) for secret in secrets]
+        self.primary = self.keys[0]
+        self._by_id = {key.key_id: key for key in self.keys}
     
-    # Se o usuário digitou um Jornal Customizado ("Other")
-    if submission.journal_id == "other" and submission.custom_journal_name:
-        
-        # Normaliza o texto (Remove espaços extras, Título Capitalizado)
-        clean_journal = " ".join(submission.custom_journal_name.split()).title()
-        
-        # Resolve o nome da Editora
-        clean_publisher = "Unknown"
-        if submission.publisher_id == "other" and submission.custom_publisher_name:
-            clean_publisher = " ".join(submission.custom_publisher_name.split()).title()
-        elif submission.publisher_id and submission.publisher_id != "other":
-            pub_doc = await db.publishers.find_one({"publisher_id": submission.publisher_id})
-            if pub_doc:
-                clean_publisher = pub_doc.get("name")
+    def get(self, key_id: bytes) -> EvidenceKey:
+        try:
+            return self._by_id[key_id]
+        except KeyError:
+            raise ValueError(f"Evidence key {key_id.hex()} is not in ENCRYPTION_KEYS")
 
-        # Verifica se esse jornal JÁ EXISTE na lista oficial (evita duplicatas)
-        # As vezes o usuário digita "Nature" mas já existe na lista e ele não viu
-        existing_journal = await db.journals.find_one({
-            "name": clean_journal, 
-            "publisher_id": submission.publisher_id if submission.publisher_id != "other" else {"$exists": True}
-        })
-        
-        if existing_journal:
-            # Se já existe, usa o ID oficial e ignora o "custom"
-            final_journal_id = existing_journal["journal_id"]
-        else:
-            # Se não existe, adiciona aos CANDIDATOS
-            await db.journal_candidates.update_one(
-                { "name": clean_journal, "publisher_name": clean_publisher },
-                { "$inc": { "count": 1 } }, # Incrementa contador
-                upsert=True
-            )
-            
-            # REGRA DO 3: Verifica se merece promoção
-            candidate = await db.journal_candidates.find_one({ "name": clean_journal, "publisher_name": clean_publisher })
-            
-            if candidate and candidate["count"] >= 3:
-                # --- PROMOÇÃO! Vira um jornal oficial ---
-                
-                # 1. Garante/Cria o Publisher primeiro
-                promoted_publisher_id = submission.publisher_id
-                if submission.publisher_id == "other":
-                    # Verifica se o publisher já existe pelo nome
-                    existing_pub = await db.publishers.find_one({"name": clean_publisher})
-                    if existing_pub:
-                        promoted_publisher_id = existing_pub["publisher_id"]
-                    else:
-                        promoted_publisher_id = f"pub_{uuid.uuid4().hex[:12]}"
-                        await db.publishers.insert_one({
-                            "publisher_id": promoted_publisher_id,
-                            "name": clean_publisher,
-                            "is_user_added": False, # Agora é oficial
-                            "is_verified": True,
-                            "created_at": datetime.now(timezone.utc).isoformat()
-                        })
-
-                # 2. Cria o Jornal Oficial
-                new_journal_id = f"journal_{uuid.uuid4().hex[:12]}"
-                await db.journals.insert_one({
-                    "journal_id": new_journal_id,
-                    "name": clean_journal, 
-                    "publisher_id": promoted_publisher_id,
-                    "is_user_added": False, # Agora é oficial
-                    "is_verified": True,
-                    "open_access": submission.custom_journal_open_access,
-                    "added_at": datetime.now(timezone.utc).isoformat(),
-                    "source": "crowdsourced"
-                })
-                
-                # 3. Limpa dos candidatos
-                await db.journal_candidates.delete_one({ "name": clean_journal, "publisher_name": clean_publisher })
-                
-                # Atualiza o ID da submissão atual para usar o novo ID oficial
-                final_journal_id = new_journal_id
-                final_publisher_id = promoted_publisher_id
-            
-            else:
-                # Se ainda não foi promovido, cria um registro temporário "user added" para esta submissão específica
-                # Isso mantém o histórico sem poluir a lista global
-                temp_id = f"journal_user_{uuid.uuid4().hex[:12]}"
-                final_journal_id = temp_id
-                
-                # Opcional: Salvar na collection de journals mas marcado como hidden/unverified
-                # Aqui optamos por não salvar na main list até ser promovido, 
-                # mas salvamos o nome texto na submissão (veja abaixo)
+evidence_keyring = EvidenceKeyring(ENCRYPTION_KEYS)
 
-    # =========================================================================
+class EvidenceTooLarge(Exception):
+    pass
 
-    submission_id = f"sub_{uuid.uuid4().hex[:12]}"
+async def encrypt_stream(blocks, storage: EvidenceStorage, key: str, max_bytes: Optional[int] = None,
+                         digest=None) -> int:
+    """Encrypt an async iterable of plaintext blocks into `storage` as stream-v1.
     
-    # Determina área científica (compatibilidade legado)
-    scientific_area = submission.scientific_area
-    if submission.scientific_area_grande:
-        scientific_area = submission.scientific_area_grande
-        if submission.scientific_area_area:
-            scientific_area = submission.scientific_area_area
-        if submission.scientific_area_subarea:
-            scientific_area = submission.scientific_area_subarea
+    Blocks of any size are re-cut into fixed chunks under the primary key,
+    holding back one chunk so the final one can be flagged. Encryption runs
+    on the evidence I/O pool; the storage backend only makes the object
+    visible once it is complete. An HMAC `digest`, if given, is fed the
+    plaintext along the way.
     
-    # Validação Estatística
-    valid_for_stats, validation_flags = await validate_submission_for_stats(
-        user.hashed_id, final_journal_id, submission
-    )
+    Returns:
+        int: plaintext size in bytes
     
-    submission_doc = {
-        "submission_id": submission_id,
-        "user_hashed_id": user.hashed_id,
-        "scientific_area": scientific_area,
-        "scientific_area_grande": submission.scientific_area_grande,
-        "scientific_area_area": submission.scientific_area_area,
-        "scientific_area_subarea": submission.scientific_area_subarea,
-        "manuscript_type": submission.manuscript_type,
-        
-        # IDs resolvidos (oficiais ou temporários)
-        "journal_id": final_journal_id,
-        "publisher_id": final_publisher_id,
-        
-        # Salva o "snapshot" dos nomes digitados para referência futura
-        "custom_journal_name": submission.custom_journal_name if submission.journal_id == "other" else None,
-        "custom_publisher_name": submission.custom_publisher_name if submission.publisher_id == "other" else None,
-        
-        "decision_type": submission.decision_type,
-        "reviewer_count": submission.reviewer_count,
-        "time_to_decision": submission.time_to_decision,
-        "apc_range": submission.apc_range,
-        "review_comments": submission.review_comments,
-        "editor_comments": submission.editor_comments,
-        "perceived_coherence": submission.perceived_coherence,
-        
-        # Campos de Qualidade
-        "overall_review_quality": getattr(submission, 'overall_review_quality', None),
-        "feedback_clarity": getattr(submission, 'feedback_clarity', None),
-        "decision_fairness": getattr(submission, 'decision_fairness', None),
-        "would_recommend": getattr(submission, 'would_recommend', None),
-        
-        # Condicionais
-        "journal_is_open_access": getattr(submission, 'journal_is_open_access', None),
-        "editor_comments_quality": getattr(submission, 'editor_comments_quality', None),
-        
-        # Metadados
-        "evidence_file_id": None,
-        "status": "pending",
-        "is_sample": False,
-        "valid_for_stats": valid_for_stats,
-        "validation_flags": validation_flags,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
+    Raises:
+        EvidenceTooLarge: as soon as more than `max_bytes` have been read
+    """
+    encryptor = EvidenceEncryptor(evidence_keyring.primary)
+    chunk_size = encryptor.chunk_size
+    total = 0
+    
+    async def encrypted_chunks():
+        nonlocal total
+        yield encryptor.header
+        buffer = bytearray()
+        async for block in blocks:
+            total += len(block)
+            if max_bytes is not None and total > max_bytes:
+                raise EvidenceTooLarge()
+            if digest is not None:
+                await evidence_io.run(digest.update, block)
+            buffer += block
+            while len(buffer) > chunk_size:
+                chunk = bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+                yield await evidence_io.run(encryptor.encrypt_chunk, chunk, False)
+        yield await evidence_io.run(encryptor.encrypt_chunk, bytes(buffer), True)
+    
+    await storage.put(key, encrypted_chunks())
+    return total
+
+async def encrypt_upload(file: UploadFile, storage: EvidenceStorage, key: str, max_bytes: Optional[int] = None) -> int:
+    """Stream an upload into `storage` under `key` as stream-v1, one chunk at a time.
     
-    await db.submissions.insert_one(submission_doc)
+    Returns:
+        int: plaintext size in bytes
     
-    # Atualiza contagem de contribuição do usuário
-    await db.users.update_one(
-        {"user_id": user.user_id},
-        {"$inc": {"contribution_count": 1}}
-    )
+    Raises:
+        EvidenceTooLarge: as soon as more than `max_bytes` (default MAX_EVIDENCE_BYTES) have been read
+    """
+    async def blocks():
+        while True:
+            block = await file.read(EVIDENCE_CHUNK_SIZE)
+            if not block:
+                return
+            yield block
     
-    return {"submission_id": submission_id, "status": "pending", "valid_for_stats": valid_for_stats}
-
+    return await encrypt_stream(blocks(), storage, key, MAX_EVIDENCE_BYTES if max_bytes is None else max_bytes)
 
-async def validate_submission_for_stats(user_hashed_id: str, journal_id: str, submission) -> tuple:
-    """
-    Validate if a submission should be included in aggregated statistics.
+async def hash_upload(file: UploadFile, max_bytes: Optional[int] = None) -> tuple:
+    """Keyed hash (HMAC-SHA256) of an upload's plaintext, rewinding it afterwards.
     
     Returns:
-        tuple: (valid_for_stats: bool, validation_flags: dict)
+        tuple: (content_hash hex digest, size in bytes)
     
-    Checks:
-    1. Completeness - all required fields present
-    2. Logical consistency - no contradictory responses
-    3. Conditional field validation - conditional fields only present when appropriate
-    4. Duplicates - not a duplicate submission (same user + journal within 30 days)
+    Raises:
+        EvidenceTooLarge: as soon as more than `max_bytes` (default MAX_EVIDENCE_BYTES) have been read
     """
-    flags = {
-        "is_complete": True,
-        "is_consistent": True,
-        "is_unique": True,
-        "issues": []
-    }
+    max_bytes = MAX_EVIDENCE_BYTES if max_bytes is None else max_bytes
+    digest = hmac.new(evidence_keyring.primary.hash_key, digestmod=hashlib.sha256)
+    total = 0
+    while True:
+        chunk = await file.read(EVIDENCE_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise EvidenceTooLarge()
+        await evidence_io.run(digest.update, chunk)
+    await file.seek(0)
+    return digest.hexdigest(), total
+
+async def store_evidence_blob(file: UploadFile) -> dict:
+    """Store an upload in the content-addressed blob store and take a reference.
+    
+    Blobs are keyed by the HMAC of their plaintext. If the same content is
+    already stored, only its ref_count is incremented and nothing is written.
+    Otherwise the upload is encrypted under a fresh storage_key; if a
+    concurrent upload of the same content wins the race, our copy is
+    discarded and we reference theirs instead.
+    
+    Each stored generation of a blob gets its own storage_key, and the blob
+    document is removed before its file, so a blob being reclaimed at zero
+    references can never be resurrected pointing at a deleted file.
+    
+    Whether the content was already stored is deliberately not reported:
+    uploaders must not learn that someone else holds the same file.
     
-    # 1. Check completeness (required fields)
-    # Note: scientific_area can be the legacy field OR the hierarchical fields
-    has_scientific_area = (
-        getattr(submission, 'scientific_area', None) or 
-        getattr(submission, 'scientific_area_grande', None)
-    )
+    Returns:
+        dict: the blob document
+    """
+    content_hash, size_bytes = await hash_upload(file)
     
-    if not has_scientific_area:
-        flags["is_complete"] = False
-        flags["issues"].append("missing_scientific_area")
+    blob = await db.evidence_blobs.find_one_and_update(
+        {"content_hash": content_hash},
+        {"$inc": {"ref_count": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if blob:
+        return blob
     
-    required_fields = ['manuscript_type', 'decision_type', 'reviewer_count', 
-                       'time_to_decision', 'editor_comments', 'perceived_coherence']
+    storage = get_evidence_storage()
+    storage_key = f"blob_{uuid.uuid4().hex}"
+    await encrypt_upload(file, storage, storage_key)
     
-    for field in required_fields:
-        value = getattr(submission, field, None)
-        if value is None or (isinstance(value, str) and not value.strip()):
-            flags["is_complete"] = False
-            flags["issues"].append(f"missing_{field}")
+    blob = await upsert_on_unique(
+        db.evidence_blobs,
+        {"content_hash": content_hash},
+        {
+            "$inc": {"ref_count": 1},
+            "$setOnInsert": {
+                "storage_backend": storage.name,
+                "storage_key": storage_key,
+                "key_id": evidence_keyring.primary.key_id.hex(),
+                "encryption": EVIDENCE_FORMAT_STREAM,
+                "size_bytes": size_bytes,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }
+        }
+    )
+    if blob["storage_key"] != storage_key:
+        await storage.delete(storage_key)
+    return blob
+
+async def read_evidence_plaintext(evidence: dict) -> bytes:
+    """Decrypt a whole evidence file (stream-v1 or legacy Fernet) into memory"""
+    source = await open_evidence_source(evidence)
+    return b"".join([chunk async for chunk in source.iter_all()])
+
+class EvidenceSource:
+    """Random-access plaintext view over an encrypted evidence object.
     
-    # Review comments can be empty for desk rejects
-    decision_type = getattr(submission, 'decision_type', '')
-    review_comments = getattr(submission, 'review_comments', [])
-    if decision_type != 'desk_reject' and (not review_comments or len(review_comments) == 0):
-        flags["is_complete"] = False
-        flags["issues"].append("missing_review_comments")
+    stream-v1 objects are decrypted chunk by chunk, fetching only the chunks
+    that overlap the requested byte range. Legacy Fernet files have no chunk
+    structure and are decrypted whole.
+    """
     
-    # 2. Check logical consistency
-    reviewer_count = getattr(submission, 'reviewer_count', '')
-    editor_comments = getattr(submission, 'editor_comments', '')
+    def __init__(self, storage: EvidenceStorage, key: str, info: Optional[EvidenceStreamInfo] = None,
+                 legacy_plaintext: Optional[bytes] = None):
+        self.storage = storage
+        self.key = key
+        self.info = info
+        self._legacy_plaintext = legacy_plaintext
+        self.size = info.plaintext_size if info else len(legacy_plaintext)
+    
+    async def iter_range(self, start: int, end: int):
+        """Yield the plaintext bytes start..end (inclusive), one chunk at a time"""
+        if self._legacy_plaintext is not None:
+            yield self._legacy_plaintext[start:end + 1]
+            return
+        
+        info = self.info
+        key = evidence_keyring.get(info.key_id)
+        first, last = start // info.chunk_size, end // info.chunk_size
+        stream_end = info.chunk_offset(last) + info.encrypted_chunk_length(last) - 1
+        buffer = bytearray()
+        index = first
+        async for block in self.storage.stream(self.key, info.chunk_offset(first), stream_end):
+            buffer += block
+            while index <= last and len(buffer) >= info.encrypted_chunk_length(index):
+                length = info.encrypted_chunk_length(index)
+                encrypted = bytes(buffer[:length])
+                del buffer[:length]
+                chunk = await evidence_io.run(info.decrypt_chunk, key, index, encrypted)
+                chunk_start = index * info.chunk_size
+                yield chunk[max(start - chunk_start, 0):end - chunk_start + 1]
+                index += 1
+        if index <= last:
+            raise InvalidTag()  # object shorter than its header promises
+    
+    async def iter_all(self):
+        """Yield the whole plaintext, one chunk at a time"""
+        if self.size:
+            async for chunk in self.iter_range(0, self.size - 1):
+                yield chunk
+
+async def open_evidence_source(evidence: dict) -> EvidenceSource:
+    """Open an evidence object for (ranged) plaintext reads.
+    
+    Raises:
+        FileNotFoundError: if the object is missing from its storage backend
+    """
+    storage, key = evidence_location(evidence)
+    stored_size = await storage.stat(key)
+    if stored_size is None:
+        raise FileNotFoundError(key)
+    
+    if evidence.get("encryption") == EVIDENCE_FORMAT_STREAM:
+        header = await storage.read_range(key, 0, EVIDENCE_HEADER.size)
+        info = EvidenceStreamInfo(header, stored_size)
+        evidence_key = evidence_keyring.get(info.key_id)  # fail before streaming if the key was retired
+        if info.plaintext_size == 0:
+            # Nothing will be streamed: authenticate the lone (empty) final chunk now
+            encrypted = await storage.read_range(key, info.chunk_offset(0), info.encrypted_chunk_length(0))
+            await evidence_io.run(info.decrypt_chunk, evidence_key, 0, encrypted)
+        return EvidenceSource(storage, key, info=info)
+    
+    encrypted = await storage.read_range(key, 0, stored_size)
+    return EvidenceSource(storage, key, legacy_plaintext=await evidence_io.run(fernet.decrypt, encrypted))
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[tuple]:
+    """Parse a single-range "bytes=" header into an inclusive (start, end).
+    
+    Returns None when the whole file should be served (no header, malformed or
+    multi-range requests, which RFC 9110 allows a server to ignore).
+    
+    Raises:
+        HTTPException 416 if the range cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
     
-    # Inconsistency: detailed review comments but 0 reviewers
+    if start < 0 or start >= size or end < start:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+# ============== EVIDENCE PREVIEWS ==============
+
+# Small encrypted JPEG previews, rendered in the background after upload and
+# stored per blob next to the original, so moderators can browse evidence
+# without fetching and decrypting full files. Pillow has no PDF rasterizer,
+# so only image evidence gets a preview.
+
+EVIDENCE_PREVIEW_MIME_TYPE = "image/jpeg"
+
+def is_previewable(mime_type: Optional[str]) -> bool:
+    return bool(mime_type) and mime_type.startswith("image/")
+
+def render_preview(data: bytes) -> tuple:
+    """Downscale an image to a JPEG thumbnail.
+    
+    Returns:
+        tuple: (jpeg bytes, width, height)
+    """
+    bounds = (EVIDENCE_PREVIEW_MAX_SIZE, EVIDENCE_PREVIEW_MAX_SIZE)
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", bounds)  # JPEG sources decode directly at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(bounds)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=80, optimize=True)
+        return out.getvalue(), image.width, image.height
+
+async def encrypt_bytes(data: bytes, storage: EvidenceStorage, key: str) -> int:
+    """Store an in-memory payload in `storage` as stream-v1"""
+    async def blocks():
+        yield data
+    return await encrypt_stream(blocks(), storage, key)
+
+def preview_claimable(preview: Optional[dict], now: datetime) -> bool:
+    """Whether a blob's preview should be (re)rendered: never tried, a stale claim, or a failure due for retry"""
+    if preview is None:
+        return True
+    if preview["status"] == "pending":
+        claimed_at = preview.get("claimed_at")
+        return claimed_at is None or _as_datetime(claimed_at) <= now - timedelta(seconds=EVIDENCE_PREVIEW_LEASE_SECONDS)
+    if preview["status"] == "failed":
+        retry_at = preview.get("retry_at")
+        return retry_at is None or _as_datetime(retry_at) <= now
+    return False
+
+def claimable_preview_filter(now: datetime) -> dict:
+    """Query form of preview_claimable"""
+    return {"$or": [
+        {"preview": {"$exists": False}},
+        {"preview.status": "pending", "$or": [
+            {"preview.claimed_at": {"$exists": False}},
+            {"preview.claimed_at": {"$lte": now - timedelta(seconds=EVIDENCE_PREVIEW_LEASE_SECONDS)}}
+        ]},
+        {"preview.status": "failed", "$or": [
+            {"preview.retry_at": {"$exists": False}},
+            {"preview.retry_at": {"$lte": now}}
+        ]}
+    ]}
+
+async def generate_evidence_preview(content_hash: str):
+    """Render, encrypt and store the preview of a blob.
+    
+    The render is claimed for EVIDENCE_PREVIEW_LEASE_SECONDS: a worker that
+    dies mid-render leaves a claim the next request re-claims, and only the
+    current claim holder may record its result. Transient failures are
+    retried with backoff (see preview_claimable).
+    """
+    now = datetime.now(timezone.utc)
+    claim_id = uuid.uuid4().hex[:12]
+    blob = await db.evidence_blobs.find_one_and_update(
+        {"content_hash": content_hash, **claimable_preview_filter(now)},
+        {"$set": {"preview.status": "pending", "preview.claim_id": claim_id, "preview.claimed_at": now}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not blob:
+        return  # already generated, in progress, or the blob is gone
+    attempts = (blob.get("preview") or {}).get("attempts", 0) + 1
+    
+    try:
+        plaintext = await read_evidence_plaintext(blob)
+        rendered, width, height = await evidence_io.run(render_preview, plaintext)
+        storage = get_evidence_storage()
+        # Per attempt: a stale worker finishing late never overwrites a newer preview
+        storage_key = f"{blob['storage_key']}_preview_{claim_id}"
+        await encrypt_bytes(rendered, storage, storage_key)
+        preview = {
+            "status": "ready",
+            "storage_backend": storage.name,
+            "storage_key": storage_key,
+            "key_id": evidence_keyring.primary.key_id.hex(),
+            "encryption": EVIDENCE_FORMAT_STREAM,
+            "mime_type": EVIDENCE_PREVIEW_MIME_TYPE,
+            "width": width,
+            "height": height,
+            "size_bytes": len(rendered)
+        }
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError):
+        preview, storage_key = {"status": "unsupported"}, None
+    except Exception as e:
+        logger.error(f"Preview generation failed for blob {blob['storage_key']} (attempt {attempts}): {e}")
+        delay = min(EVIDENCE_PREVIEW_RETRY_SECONDS * 2 ** (attempts - 1), 86400)
+        preview, storage_key = {
+            "status": "failed",
+            "attempts": attempts,
+            "retry_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+        }, None
+    
+    result = await db.evidence_blobs.update_one(
+        {"content_hash": content_hash, "storage_key": blob["storage_key"], "preview.claim_id": claim_id},
+        {"$set": {"preview": preview}}
+    )
+    if not result.matched_count and storage_key:
+        # The blob was reclaimed, or our claim expired and was taken over; don't leave an orphaned preview
+        await storage.delete(storage_key)
+
+def schedule_evidence_preview(content_hash: str):
+    task = asyncio.create_task(generate_evidence_preview(content_hash))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+# ============== JOURNAL NAME MATCHING ==============
+
+def normalize_name_key(name: str) -> str:
+    """Build the matching key for a journal/publisher name.
+    
+    Casefolded, accents and punctuation stripped, whitespace collapsed, so
+    "PLoS One", "PLOS ONE" and "Plos  One" all map to "plos one".
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    without_punctuation = re.sub(r"[\W_]+", " ", without_accents.casefold())
+    return " ".join(without_punctuation.split())
+
+class TrigramIndex:
+    """In-memory character-trigram index for fuzzy name matching.
+    
+    Entries are keyed by an ID and carry an arbitrary payload; similarity is
+    the Jaccard coefficient between the trigram sets of two normalized keys.
+    """
+    
+    def __init__(self):
+        self._postings = defaultdict(set)  # trigram -> entry IDs
+        self._entries = {}  # entry ID -> (trigrams, payload)
+    
+    @staticmethod
+    def trigrams(key: str) -> set:
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def add(self, entry_id: str, key: str, payload: Any = None):
+        self.remove(entry_id)
+        grams = self.trigrams(key)
+        self._entries[entry_id] = (grams, payload)
+        for gram in grams:
+            self._postings[gram].add(entry_id)
+    
+    def remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if not entry:
+            return
+        for gram in entry[0]:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._postings[gram]
+    
+    def search(self, key: str, limit: int = 5, min_similarity: float = 0.4) -> List[tuple]:
+        """Return up to `limit` (similarity, entry_id, payload) tuples, best first"""
+        grams = self.trigrams(key)
+        if not key or not grams:
+            return []
+        
+        overlaps = defaultdict(int)
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                overlaps[entry_id] += 1
+        
+        matches = []
+        for entry_id, shared in overlaps.items():
+            entry_grams, payload = self._entries[entry_id]
+            similarity = shared / (len(grams) + len(entry_grams) - shared)
+            if similarity >= min_similarity:
+                matches.append((round(similarity, 3), entry_id, payload))
+        
+        matches.sort(key=lambda m: (-m[0], m[1]))
+        return matches[:limit]
+
+class PrefixIndex:
+    """In-memory prefix index over normalized names.
+    
+    Every word-boundary suffix of a key ("journal of physics", "of physics",
+    "physics") is kept in one sorted list, so both whole-name and word
+    prefixes are a bisect plus a scan over the matching range: the lookups
+    of a trie at a fraction of its memory.
+    """
+    
+    # Ranks, best first
+    EXACT, PREFIX, WORD_PREFIX = 0, 1, 2
+    # add_many batches up to this size are inserted in place (bisect) instead of re-sorting the index
+    INSORT_MAX_BATCH = 256
+    
+    def __init__(self):
+        self._suffixes = []  # sorted (suffix, word position, entry ID)
+        self._entries = {}  # entry ID -> (key, payload, suffix tuples)
+    
+    @staticmethod
+    def _suffixes_of(key: str, entry_id: str) -> List[tuple]:
+        words = key.split(" ")
+        return [(" ".join(words[i:]), i, entry_id) for i in range(len(words))]
+    
+    def add(self, entry_id: str, key: str, payload: Any = None):
+        self.remove(entry_id)
+        suffixes = self._suffixes_of(key, entry_id)
+        self._entries[entry_id] = (key, payload, suffixes)
+        for item in suffixes:
+            bisect.insort(self._suffixes, item)
+    
+    def add_many(self, items: Iterable[tuple]):
+        """Add or replace (entry_id, key, payload) tuples.
+        
+        Small batches (request paths) are inserted in place; bulk loads are
+        appended and sorted once instead of paying an insort per suffix.
+        """
+        latest = {entry_id: (key, payload) for entry_id, key, payload in items}
+        if len(latest) <= self.INSORT_MAX_BATCH:
+            for entry_id, (key, payload) in latest.items():
+                self.add(entry_id, key, payload)
+            return
+        stale, added = set(), []
+        for entry_id, (key, payload) in latest.items():
+            previous = self._entries.get(entry_id)
+            if previous:
+                stale.update(previous[2])
+            suffixes = self._suffixes_of(key, entry_id)
+            self._entries[entry_id] = (key, payload, suffixes)
+            added.extend(suffixes)
+        if stale:
+            self._suffixes = [item for item in self._suffixes if item not in stale]
+        self._suffixes.extend(added)
+        self._suffixes.sort()
+    
+    def remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if not entry:
+            return
+        for item in entry[2]:
+            position = bisect.bisect_left(self._suffixes, item)
+            if position < len(self._suffixes) and self._suffixes[position] == item:
+                del self._suffixes[position]
+    
+    def search(self, prefix: str, limit: int = 10, max_scan: int = 2000, accept=None) -> List[tuple]:
+        """Return up to `limit` (rank, entry_id, payload) tuples, best rank first.
+        
+        Ties keep alphabetical order. At most `max_scan` suffixes are examined,
+        which bounds latency for very short prefixes. `accept(payload)` can
+        filter entries.
+        """
+        if not prefix:
+            return []
+        best = {}
+        position = bisect.bisect_left(self._suffixes, (prefix,))
+        for suffix, word_position, entry_id in self._suffixes[position:position + max_scan]:
+            if not suffix.startswith(prefix):
+                break
+            key, payload, _ = self._entries[entry_id]
+            if accept is not None and not accept(payload):
+                continue
+            if word_position:
+                rank = self.WORD_PREFIX
+            else:
+                rank = self.EXACT if key == prefix else self.PREFIX
+            if entry_id not in best or rank < best[entry_id][0]:
+                best[entry_id] = (rank, key, payload)
+        ranked = sorted(best.items(), key=lambda item: (item[1][0], item[1][1]))
+        return [(rank, entry_id, payload) for entry_id, (rank, _, payload) in ranked[:limit]]
+
+# Process-wide indexes over the journal catalog (loaded at startup)
+journal_name_index = TrigramIndex()
+journal_prefix_index = PrefixIndex()
+
+def index_journal_names(journals: Iterable[dict]):
+    """Add or refresh journals in the in-memory fuzzy and prefix indexes"""
+    prefix_items = []
+    for journal in journals:
+        key = journal.get("name_key") or normalize_name_key(journal["name"])
+        payload = {"journal_id": journal["journal_id"], "name": journal["name"], "publisher_id": journal.get("publisher_id")}
+        journal_name_index.add(journal["journal_id"], key, payload)
+        prefix_items.append((journal["journal_id"], key, payload))
+    journal_prefix_index.add_many(prefix_items)
+
+def index_journal_name(journal: dict):
+    """Add or refresh one journal in the in-memory fuzzy and prefix indexes"""
+    index_journal_names([journal])
+
+async def load_journal_name_index():
+    """Bulk-load the fuzzy journal index from the catalog"""
+    journals = await db.journals.find({}, {"_id": 0, "journal_id": 1, "name": 1, "name_key": 1, "publisher_id": 1}).to_list(None)
+    index_journal_names(journal for journal in journals if journal.get("journal_id") and journal.get("name"))
+    logger.info(f"Journal name index loaded with {len(journal_name_index)} journals")
+
+JOURNAL_MATCH_TYPES = {
+    PrefixIndex.EXACT: "exact",
+    PrefixIndex.PREFIX: "prefix",
+    PrefixIndex.WORD_PREFIX: "word_prefix"
+}
+
+def search_journals(query: str, limit: int = 10, publisher_id: Optional[str] = None) -> List[dict]:
+    """Rank journals for a search box: exact > name prefix > word prefix > trigram similarity"""
+    key = normalize_name_key(query)
+    accept = (lambda payload: payload["publisher_id"] == publisher_id) if publisher_id else None
+    
+    results = [
+        {**payload, "match": JOURNAL_MATCH_TYPES[rank]}
+        for rank, _, payload in journal_prefix_index.search(key, limit=limit, accept=accept)
+    ]
+    if len(results) < limit and len(key) >= 3:
+        # Typos and word-order differences: fill up with fuzzy matches
+        seen = {result["journal_id"] for result in results}
+        fuzzy_limit = limit * 10 if publisher_id else limit + len(seen)
+        for similarity, journal_id, payload in journal_name_index.search(key, limit=fuzzy_limit, min_similarity=0.3):
+            if journal_id in seen or (accept is not None and not accept(payload)):
+                continue
+            results.append({**payload, "match": "fuzzy", "similarity": similarity})
+            if len(results) >= limit:
+                break
+    return results
+
+def suggest_journals(name: str, limit: int = 3) -> List[dict]:
+    """Near-match suggestions for a custom journal name"""
+    return [
+        {**payload, "similarity": similarity}
+        for similarity, _, payload in journal_name_index.search(normalize_name_key(name), limit=limit, min_similarity=0.5)
+    ]
+
+# ============== CATALOG INDEX ==============
+
+# Other worker processes only see this process's catalog writes after a reload
+CATALOG_INDEX_REFRESH_SECONDS = float(os.environ.get("CATALOG_INDEX_REFRESH_SECONDS", "300"))
+
+def _catalog_verified(doc: dict) -> bool:
+    # Same rule as the analytics filters: verified, or predating the flag
+    return doc["is_verified"] is True if "is_verified" in doc else True
+
+class CatalogIndex:
+    """Process-wide journal_id/publisher_id → name, verification and OA flags.
+    
+    Loaded in bulk at startup and updated in place on catalog writes, so
+    name enrichment is a dict lookup. Ids missing from the index (written by
+    another process) are fetched with one batched $in query and cached.
+    """
+    
+    JOURNAL_PROJECTION = {"_id": 0, "journal_id": 1, "name": 1, "publisher_id": 1,
+                          "is_verified": 1, "is_user_added": 1, "open_access": 1}
+    PUBLISHER_PROJECTION = {"_id": 0, "publisher_id": 1, "name": 1, "is_verified": 1, "is_user_added": 1}
+    
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.journals: Dict[str, dict] = {}
+        self.publishers: Dict[str, dict] = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+    
+    @staticmethod
+    def _journal_entry(doc: dict) -> dict:
+        return {
+            "journal_id": doc["journal_id"],
+            "name": doc.get("name"),
+            "publisher_id": doc.get("publisher_id"),
+            "is_verified": _catalog_verified(doc),
+            "is_user_added": doc.get("is_user_added", False),
+            "open_access": doc.get("open_access")
+        }
+    
+    @staticmethod
+    def _publisher_entry(doc: dict) -> dict:
+        return {
+            "publisher_id": doc["publisher_id"],
+            "name": doc.get("name"),
+            "is_verified": _catalog_verified(doc),
+            "is_user_added": doc.get("is_user_added", False)
+        }
+    
+    async def load(self):
+        journals, publishers = await asyncio.gather(
+            db.journals.find({"journal_id": {"$exists": True}}, self.JOURNAL_PROJECTION).to_list(None),
+            db.publishers.find({"publisher_id": {"$exists": True}}, self.PUBLISHER_PROJECTION).to_list(None)
+        )
+        self.journals = {doc["journal_id"]: self._journal_entry(doc) for doc in journals}
+        self.publishers = {doc["publisher_id"]: self._publisher_entry(doc) for doc in publishers}
+        self._loaded_at = time.monotonic()
+        logger.info(f"Catalog index loaded: {len(self.journals)} journals, {len(self.publishers)} publishers")
+    
+    async def ensure_fresh(self):
+        """Reload when the index is older than CATALOG_INDEX_REFRESH_SECONDS"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                await self.load()
+    
+    def put_journal(self, doc: dict):
+        self.journals[doc["journal_id"]] = self._journal_entry(doc)
+    
+    def put_publisher(self, doc: dict):
+        self.publishers[doc["publisher_id"]] = self._publisher_entry(doc)
+    
+    def mark_verified(self, entries: Dict[str, dict], ids: List[str]):
+        for entity_id in ids:
+            if entity_id in entries:
+                entries[entity_id]["is_verified"] = True
+    
+    async def _resolve(self, entries: Dict[str, dict], collection, id_field: str, projection: dict,
+                       make_entry, ids) -> Dict[str, dict]:
+        await self.ensure_fresh()
+        wanted = {entity_id for entity_id in ids if entity_id}
+        missing = [entity_id for entity_id in wanted if entity_id not in entries]
+        if missing:
+            async for doc in collection.find({id_field: {"$in": missing}}, projection):
+                entries[doc[id_field]] = make_entry(doc)
+        return {entity_id: entries[entity_id] for entity_id in wanted if entity_id in entries}
+    
+    async def get_journals(self, journal_ids) -> Dict[str, dict]:
+        """Index entries for `journal_ids` (unknown ids are left out)"""
+        return await self._resolve(self.journals, db.journals, "journal_id",
+                                   self.JOURNAL_PROJECTION, self._journal_entry, journal_ids)
+    
+    async def get_publishers(self, publisher_ids) -> Dict[str, dict]:
+        """Index entries for `publisher_ids` (unknown ids are left out)"""
+        return await self._resolve(self.publishers, db.publishers, "publisher_id",
+                                   self.PUBLISHER_PROJECTION, self._publisher_entry, publisher_ids)
+    
+    async def verified_journal_ids(self, publisher_id: Optional[str] = None) -> List[str]:
+        await self.ensure_fresh()
+        return [
+            journal_id for journal_id, entry in self.journals.items()
+            if entry["is_verified"] and (not publisher_id or entry["publisher_id"] == publisher_id)
+        ]
+    
+    async def verified_publisher_ids(self) -> List[str]:
+        await self.ensure_fresh()
+        return [publisher_id for publisher_id, entry in self.publishers.items() if entry["is_verified"]]
+
+catalog_index = CatalogIndex(CATALOG_INDEX_REFRESH_SECONDS)
+
+# Catalog version the in-memory indexes reflect (see refresh_catalog_indexes)
+_catalog_indexes_version = 0
+
+async def load_catalog_indexes():
+    """(Re)load the journal name indexes and the catalog index from the database"""
+    global _catalog_indexes_version
+    version = await catalog_watermark()
+    await load_journal_name_index()
+    await catalog_index.load()
+    _catalog_indexes_version = version
+
+async def refresh_catalog_indexes():
+    """Apply catalog writes made by other processes (e.g. a CLI import) to the in-memory indexes.
+    
+    Only documents stamped with a newer catalog version are read, so a
+    catch-up costs one indexed query per collection.
+    """
+    global _catalog_indexes_version
+    if CATALOG_VERSION.value <= _catalog_indexes_version:
+        return
+    # Everything at or below the watermark has landed; writes above it are
+    # read again next time
+    version = await catalog_watermark()
+    changed = {"catalog_version": {"$gt": _catalog_indexes_version}}
+    publishers, journals = await asyncio.gather(
+        db.publishers.find(changed, CatalogIndex.PUBLISHER_PROJECTION).to_list(None),
+        db.journals.find(changed, {**CatalogIndex.JOURNAL_PROJECTION, "name_key": 1}).to_list(None)
+    )
+    for publisher in publishers:
+        catalog_index.put_publisher(publisher)
+    for journal in journals:
+        catalog_index.put_journal(journal)
+    index_journal_names(journal for journal in journals if journal.get("name"))
+    if publishers or journals:
+        invalidate_catalog_payloads()
+    _catalog_indexes_version = version
+
+async def add_catalog_names(rows: List[dict]):
+    """Set journal_name/publisher_name on submission-like rows from the catalog index"""
+    journals, publishers = await asyncio.gather(
+        catalog_index.get_journals(row.get("journal_id") for row in rows),
+        catalog_index.get_publishers(row.get("publisher_id") for row in rows)
+    )
+    for row in rows:
+        journal = journals.get(row.get("journal_id"))
+        publisher = publishers.get(row.get("publisher_id"))
+        row["journal_name"] = journal["name"] if journal else "Unknown"
+        row["publisher_name"] = publisher["name"] if publisher else "Unknown"
+
+# ============== JOURNALS & PUBLISHERS ==============
+
+# --- Catalog version (delta sync) ---
+# Every journal/publisher write is stamped with the next value of a global
+# counter, so clients holding a copy of the catalog can ask for what changed
+# since the version they last saw. Documents written before versioning have
+# no stamp and only reach clients through a full (paginated) download.
+#
+# A version is taken before the documents carrying it are written, so readers
+# report a watermark instead of the counter: the highest version whose writes
+# have all landed. Each write holds a reservation (catalog_reservations) that
+# keeps the watermark below its version until the write is done.
+
+# A writer that dies holds the watermark back at most this long
+CATALOG_WRITE_LEASE_SECONDS = float(os.environ.get("CATALOG_WRITE_LEASE_SECONDS", "600"))
+
+@asynccontextmanager
+async def catalog_write():
+    """Reserve the catalog version for a write; yields the version to stamp.
+    
+    The reservation stores the counter value seen before the version is taken
+    (its floor), so a reader that finds it stays below the reserved version
+    even if it reads the counter after the bump.
+    """
+    counter = await db.counters.find_one({"_id": CATALOG_VERSION.name})
+    reservation_id = f"catres_{uuid.uuid4().hex[:12]}"
+    await db.catalog_reservations.insert_one({
+        "reservation_id": reservation_id,
+        "floor": counter["value"] if counter else 0,
+        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=CATALOG_WRITE_LEASE_SECONDS)
+    })
+    try:
+        yield await CATALOG_VERSION.bump()
+    finally:
+        await db.catalog_reservations.delete_one({"reservation_id": reservation_id})
+
+async def catalog_watermark() -> int:
+    """Highest catalog version whose writes have all landed.
+    
+    A client that syncs `since` this value later misses nothing: every write
+    stamped at or below it is visible now.
+    """
+    # The counter is read first: a write whose version is at or below it
+    # registered its reservation before that read
+    counter = await db.counters.find_one({"_id": CATALOG_VERSION.name})
+    value = counter["value"] if counter else 0
+    CATALOG_VERSION.value = max(CATALOG_VERSION.value, value)
+    oldest = await db.catalog_reservations.find_one(
+        {"expires_at": {"$gt": datetime.now(timezone.utc)}},
+        sort=[("floor", 1)]
+    )
+    if oldest:
+        value = min(value, oldest["floor"])
+    return value
+
+# --- Keyset pagination ---
+
+DEFAULT_CATALOG_PAGE_SIZE = 200
+MAX_CATALOG_PAGE_SIZE = 1000
+
+def encode_page_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_page_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+async def list_catalog_page(collection, id_field: str, query: dict, limit: Optional[int],
+                            cursor: Optional[str], since: Optional[int]) -> dict:
+    """One page of a catalog collection in (name, id) order.
+    
+    Served from the (name, id) compound indexes; `since` restricts the page
+    to documents stamped with a newer catalog version.
+    """
+    limit = max(1, min(limit or DEFAULT_CATALOG_PAGE_SIZE, MAX_CATALOG_PAGE_SIZE))
+    # Taken before the page is read: writes above it may or may not show up
+    # here, and are read again by the next `since` sync
+    version = await catalog_watermark()
+    
+    conditions = [query] if query else []
+    if since is not None:
+        conditions.append({"catalog_version": {"$gt": since}})
+    if cursor:
+        name, last_id = decode_page_cursor(cursor, 2)
+        conditions.append({"$or": [
+            {"name": {"$gt": name}},
+            {"name": name, id_field: {"$gt": last_id}}
+        ]})
+    filters = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+    
+    items = await collection.find(filters, PUBLIC_DOC_PROJECTION).sort([("name", 1), (id_field, 1)]).to_list(limit + 1)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_page_cursor(items[-1]["name"], items[-1][id_field])
+    return {"items": items, "next_cursor": next_cursor, "catalog_version": version}
+
+async def plain_catalog_list(response: Response, collection, id_field: str, query: dict) -> List[dict]:
+    """First page as a bare list, for clients predating pagination.
+    
+    A longer list is cut at MAX_CATALOG_PAGE_SIZE; the X-Next-Cursor header
+    then carries the cursor to continue with (?cursor=...).
+    """
+    page = await list_catalog_page(collection, id_field, query, MAX_CATALOG_PAGE_SIZE, None, None)
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["items"]
+
+@api_router.get("/publishers")
+async def get_publishers(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         since: Optional[int] = None):
+    """Get publishers.
+    
+    Without parameters: a plain list (see plain_catalog_list). With `limit`,
+    `cursor` or `since`: {items, next_cursor, catalog_version}, where `since`
+    returns only publishers changed after that catalog version.
+    """
+    if limit is None and cursor is None and since is None:
+        return await plain_catalog_list(response, db.publishers, "publisher_id", {})
+    return await list_catalog_page(db.publishers, "publisher_id", {}, limit, cursor, since)
+
+@api_router.get("/journals")
+async def get_journals(response: Response, publisher_id: Optional[str] = None, limit: Optional[int] = None,
+                       cursor: Optional[str] = None, since: Optional[int] = None):
+    """Get journals, optionally filtered by publisher (paginated/delta mode as in /publishers)"""
+    query = {}
+    if publisher_id:
+        query["publisher_id"] = publisher_id
+    
+    if limit is None and cursor is None and since is None:
+        return await plain_catalog_list(response, db.journals, "journal_id", query)
+    return await list_catalog_page(db.journals, "journal_id", query, limit, cursor, since)
+
+@api_router.post("/journals")
+async def add_journal(request: Request, name: str, publisher_id: str):
+    """Add a new journal (user-submitted, flagged for review)"""
+    user = await require_auth(request)
+    
+    # Journal names are unique per publisher (by normalized key): re-adding an existing name returns it
+    async with catalog_write() as catalog_version:
+        journal = await upsert_on_unique(
+            db.journals,
+            {"publisher_id": publisher_id, "name_key": normalize_name_key(name)},
+            {"$setOnInsert": {
+                "journal_id": f"journal_{uuid.uuid4().hex[:12]}",
+                "name": name,
+                "is_user_added": True,
+                "added_by_hashed_id": user.hashed_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "catalog_version": catalog_version
+            }}
+        )
+    
+    index_journal_name(journal)
+    catalog_index.put_journal(journal)
+    invalidate_catalog_payloads()
+    
+    return {"journal_id": journal["journal_id"], "name": journal["name"], "publisher_id": publisher_id}
+
+
+
+MAX_JOURNAL_SEARCH_RESULTS = 50
+
+@api_router.get("/journals/search")
+async def search_journal_catalog(q: str = "", limit: int = 10, publisher_id: Optional[str] = None):
+    """Search journals by name across publishers (served from the in-memory indexes)"""
+    results = search_journals(q, limit=max(1, min(limit, MAX_JOURNAL_SEARCH_RESULTS)), publisher_id=publisher_id)
+    publishers = await catalog_index.get_publishers(result["publisher_id"] for result in results)
+    for result in results:
+        publisher = publishers.get(result["publisher_id"])
+        result["publisher_name"] = publisher["name"] if publisher else None
+    return results
+
+# --- ROTA NOVA: Estrutura para o Frontend (Cascata) ---
+
+# Safety net for multi-worker deployments: writes only invalidate the local cache
+JOURNAL_STRUCTURE_TTL_SECONDS = float(os.environ.get("JOURNAL_STRUCTURE_TTL_SECONDS", "60"))
+
+async def build_journal_structure() -> dict:
+    """{ 'Publisher Name': ['Journal A', 'Journal B'], ... } from two bulk queries"""
+    publishers, journals = await asyncio.gather(
+        db.publishers.find({}, {"_id": 0, "publisher_id": 1, "name": 1}).to_list(None),
+        db.journals.find({}, {"_id": 0, "publisher_id": 1, "name": 1}).to_list(None)
+    )
+    publisher_names = {pub["publisher_id"]: pub["name"] for pub in publishers if pub.get("publisher_id")}
+    
+    structure = {}
+    seen = defaultdict(set)
+    for doc in journals:
+        pub_id = doc.get("publisher_id")
+        j_name = doc.get("name")
+        if not pub_id or not j_name:
+            continue
+        
+        pub_name = publisher_names.get(pub_id, "Other")
+        if j_name not in seen[pub_name]:
+            seen[pub_name].add(j_name)
+            structure.setdefault(pub_name, []).append(j_name)
+    return structure
+
+class SerializedPayloadCache:
+    """JSON payload serialized once with its ETag, rebuilt on demand after invalidation"""
+    
+    def __init__(self, builder, ttl_seconds: float):
+        self.builder = builder
+        self.ttl_seconds = ttl_seconds
+        self._body = None
+        self._etag = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+    
+    def invalidate(self):
+        self._generation += 1
+        self._body = None
+    
+    def _fresh(self) -> bool:
+        return self._body is not None and time.monotonic() - self._built_at < self.ttl_seconds
+    
+    async def get(self) -> tuple:
+        """Returns (JSON body bytes, ETag)"""
+        if self._fresh():
+            return self._body, self._etag
+        async with self._lock:
+            if self._fresh():
+                return self._body, self._etag
+            generation = self._generation
+            body = json.dumps(await self.builder(), ensure_ascii=False, separators=(",", ":")).encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            # A write during the rebuild leaves the result uncached (served once, rebuilt next time)
+            if generation == self._generation:
+                self._body, self._etag, self._built_at = body, etag, time.monotonic()
+            return body, etag
+
+def invalidate_catalog_payloads():
+    """Drop the serialized payloads derived from the journal/publisher catalog"""
+    journal_structure_cache.invalidate()
+    options_bundle_cache.invalidate()
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: a W/ prefix (e.g. added on compression) is ignored"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def etag_response(request: Request, body: bytes, etag: str, cache_control: str = "no-cache") -> Response:
+    """JSON body with its ETag, or 304 when the client already holds it"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+journal_structure_cache = SerializedPayloadCache(build_journal_structure, JOURNAL_STRUCTURE_TTL_SECONDS)
+
+@api_router.get("/journals/structure")
+async def get_journals_structure(request: Request):
+    """Returns { 'Publisher Name': ['Journal A', 'Journal B'], ... } (cached, ETag/304)"""
+    body, etag = await journal_structure_cache.get()
+    return etag_response(request, body, etag)
+
+# ============== CATALOG IMPORT ==============
+
+CATALOG_IMPORT_BATCH_SIZE = int(os.environ.get("CATALOG_IMPORT_BATCH_SIZE", "5000"))
+CATALOG_DUMP_FORMATS = ("jsonl", "csv")
+
+# Field names used by OpenAlex sources, DOAJ (JSON and CSV exports) and plain
+# CSV files, matched case-insensitively; the first non-empty one wins
+CATALOG_FIELD_ALIASES = {
+    "name": ("name", "title", "display_name", "journal_title", "journal title", "journal"),
+    "publisher_name": ("publisher_name", "publisher", "host_organization_name"),
+    "open_access": ("open_access", "is_oa"),
+    "issn": ("issn_l", "issn", "eissn", "pissn", "journal eissn (online version)", "journal issn (print version)")
+}
+
+def catalog_dump_format(filename: str, fmt: Optional[str] = None) -> str:
+    """Dump format from an explicit value or the file extension (a .gz suffix is ignored)"""
+    if fmt:
+        if fmt not in CATALOG_DUMP_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}' (expected one of {', '.join(CATALOG_DUMP_FORMATS)})")
+        return fmt
+    suffixes = [suffix.lower() for suffix in Path(filename).suffixes if suffix.lower() != ".gz"]
+    if suffixes and suffixes[-1] in (".csv", ".tsv"):
+        return "csv"
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of '{filename}': pass jsonl or csv explicitly")
+
+def open_catalog_dump(binary, filename: str) -> io.TextIOWrapper:
+    """Text lines of a (possibly gzip-compressed) dump file object"""
+    if filename.lower().endswith(".gz"):
+        binary = gzip.GzipFile(fileobj=binary, mode="rb")
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+def iter_catalog_dump(lines: Iterable[str], fmt: str, filename: str = "") -> Iterator[Optional[dict]]:
+    """Raw records of a JSONL or CSV dump (None for lines that do not parse)"""
+    if fmt == "csv":
+        delimiter = "\t" if filename.lower().removesuffix(".gz").endswith(".tsv") else ","
+        yield from csv.DictReader(lines, delimiter=delimiter)
+        return
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else None
+
+def _parse_open_access(value) -> Optional[bool]:
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "yes", "y", "1"):
+        return True
+    if text in ("false", "no", "n", "0"):
+        return False
+    return None
+
+def normalize_catalog_record(raw: Optional[dict], open_access_default: Optional[bool] = None) -> Optional[dict]:
+    """{name, publisher_name, open_access, issn} from a dump record, or None if unusable"""
+    if not raw:
+        return None
+    if isinstance(raw.get("bibjson"), dict):
+        # DOAJ JSON: everything listed is open access
+        bibjson = raw["bibjson"]
+        publisher = bibjson.get("publisher")
+        raw = {
+            "title": bibjson.get("title"),
+            "publisher": publisher.get("name") if isinstance(publisher, dict) else publisher,
+            "issn": bibjson.get("eissn") or bibjson.get("pissn"),
+            "open_access": True
+        }
+    elif raw.get("type") not in (None, "", "journal"):
+        # OpenAlex sources also list repositories, conferences and book series
+        return None
+    
+    fields = {str(key).strip().lower(): value for key, value in raw.items()}
+    record = {}
+    for field, aliases in CATALOG_FIELD_ALIASES.items():
+        value = next((fields[alias] for alias in aliases if fields.get(alias) not in (None, "", [])), None)
+        if isinstance(value, list):
+            value = value[0]
+        record[field] = value
+    
+    name = " ".join(str(record["name"] or "").split())
+    publisher_name = " ".join(str(record["publisher_name"] or "").split())
+    if not name or not publisher_name or len(name) > 300 or len(publisher_name) > 300:
+        return None
+    if not normalize_name_key(name) or not normalize_name_key(publisher_name):
+        return None
+    
+    open_access = _parse_open_access(record["open_access"])
+    return {
+        "name": name,
+        "publisher_name": publisher_name,
+        "open_access": open_access if open_access is not None else open_access_default,
+        "issn": str(record["issn"]).strip().upper() if record["issn"] else None
+    }
+
+async def _bulk_write_unique(collection, operations: list) -> tuple:
+    """Unordered bulk_write where losing a unique-key race to a concurrent writer is not an error.
+    
+    Returns:
+        tuple: (bulk API result, number of operations that hit a duplicate key)
+    """
+    try:
+        return (await collection.bulk_write(operations, ordered=False)).bulk_api_result, 0
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        return e.details, len(errors)
+
+def _read_catalog_chunk(raw_records: Iterator, size: int, open_access_default: Optional[bool]) -> List[Optional[dict]]:
+    """Read and normalize up to `size` dump records (blocking: runs in a worker thread)"""
+    chunk = []
+    for raw in itertools.islice(raw_records, size):
+        record = normalize_catalog_record(raw, open_access_default)
+        if record is not None:
+            record["name_key"] = normalize_name_key(record["name"])
+            record["publisher_key"] = normalize_name_key(record["publisher_name"])
+        chunk.append(record)
+    return chunk
+
+async def import_catalog(raw_records: Iterable[Optional[dict]], source: str,
+                         open_access_default: Optional[bool] = None) -> dict:
+    """Upsert journals and publishers from dump records in unordered bulk batches.
+    
+    Publishers are matched on name_key, journals on (publisher_id, name_key).
+    Existing journals only have verification, open access and ISSN updated
+    (and only when they differ), so re-running an import reports them as
+    unchanged. Every batch is stamped with its own catalog version. Reading
+    and parsing the dump runs in a worker thread, off the event loop.
+    
+    Returns:
+        Counts: records, inserted/updated/unchanged journals, inserted
+        publishers, skipped (unusable) records, in-file duplicates and
+        conflicts (journals another writer created while the batch was written)
+    """
+    report = {"records": 0, "inserted": 0, "updated": 0, "unchanged": 0, "conflicts": 0,
+              "publishers_inserted": 0, "skipped": 0, "duplicates": 0}
+    started = time.monotonic()
+    publisher_ids = {
+        doc["name_key"]: doc["publisher_id"]
+        async for doc in db.publishers.find({"name_key": {"$exists": True}}, {"_id": 0, "name_key": 1, "publisher_id": 1})
+    }
+    seen = set()
+    batch = []
+    
+    async def write_batch(records: List[dict]):
+        async with catalog_write() as version:
+            now = datetime.now(timezone.utc).isoformat()
+            
+            # 1. Publishers not seen before (one upsert per new name)
+            new_publishers = {}
+            for record in records:
+                if record["publisher_key"] not in publisher_ids:
+                    new_publishers.setdefault(record["publisher_key"], record["publisher_name"])
+            if new_publishers:
+                # A publisher created concurrently is simply read back below
+                result, _ = await _bulk_write_unique(db.publishers, [
+                    UpdateOne({"name_key": key}, {"$setOnInsert": {
+                        "publisher_id": f"pub_{uuid.uuid4().hex[:12]}",
+                        "name": name,
+                        "is_user_added": False,
+                        "is_verified": True,
+                        "validated_submission_count": 0,
+                        "created_at": now,
+                        "source": source,
+                        "catalog_version": version
+                    }}, upsert=True)
+                    for key, name in new_publishers.items()
+                ])
+                report["publishers_inserted"] += result.get("nUpserted", 0)
+                async for doc in db.publishers.find({"name_key": {"$in": list(new_publishers)}}, {"_id": 0, "name_key": 1, "publisher_id": 1}):
+                    publisher_ids[doc["name_key"]] = doc["publisher_id"]
+            
+            # 2. Journals: insert the missing ones, update only the fields that differ on the others
+            existing = {
+                (doc["publisher_id"], doc["name_key"])
+                async for doc in db.journals.find(
+                    {"name_key": {"$in": list({record["name_key"] for record in records})}},
+                    {"_id": 0, "publisher_id": 1, "name_key": 1}
+                )
+            }
+            inserts, updates = [], []
+            for record in records:
+                key = {"publisher_id": publisher_ids[record["publisher_key"]], "name_key": record["name_key"]}
+                fields = {"is_verified": True}
+                if record["open_access"] is not None:
+                    fields["open_access"] = record["open_access"]
+                if record["issn"]:
+                    fields["issn"] = record["issn"]
+                if (key["publisher_id"], key["name_key"]) in existing:
+                    updates.append(UpdateOne(
+                        {**key, "$or": [{field: {"$ne": value}} for field, value in fields.items()]},
+                        {"$set": {**fields, "catalog_version": version}}
+                    ))
+                    continue
+                inserts.append(InsertOne({
+                    "journal_id": f"journal_{uuid.uuid4().hex[:12]}",
+                    "name": record["name"],
+                    "is_user_added": False,
+                    "open_access": None,
+                    "validated_submission_count": 0,
+                    "created_at": now,
+                    "source": source,
+                    "catalog_version": version,
+                    **key,
+                    **fields
+                }))
+            # Inserts that hit the unique key lost a race to another writer (reported as conflicts)
+            result, conflicts = await _bulk_write_unique(db.journals, inserts + updates) if records else ({}, 0)
+            updated = result.get("nModified", 0)
+            report["inserted"] += result.get("nInserted", 0)
+            report["conflicts"] += conflicts
+            report["updated"] += updated
+            report["unchanged"] += len(updates) - updated
+    
+    records = iter(raw_records)
+    while True:
+        chunk = await asyncio.to_thread(_read_catalog_chunk, records, CATALOG_IMPORT_BATCH_SIZE, open_access_default)
+        if not chunk:
+            break
+        for record in chunk:
+            report["records"] += 1
+            if record is None:
+                report["skipped"] += 1
+                continue
+            identity = (record["publisher_key"], record["name_key"])
+            if identity in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(identity)
+            batch.append(record)
+            if len(batch) >= CATALOG_IMPORT_BATCH_SIZE:
+                await write_batch(batch)
+                batch = []
+    if batch:
+        await write_batch(batch)
+    
+    report["seconds"] = round(time.monotonic() - started, 2)
+    logger.info(f"Catalog import ({source}): {report}")
+    return report
+
+@api_router.post("/admin/catalog/import")
+async def import_catalog_dump(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    source: Optional[str] = None,
+    open_access: Optional[bool] = None
+):
+    """Import journals/publishers from an uploaded JSONL or CSV dump (optionally .gz).
+    
+    `open_access` sets the flag for records that do not carry it (e.g. true
+    for a DOAJ CSV export).
+    """
+    await require_admin(request)
+    
+    filename = file.filename or ""
+    try:
+        fmt = catalog_dump_format(filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    lines = open_catalog_dump(file.file, filename)
+    try:
+        report = await import_catalog(iter_catalog_dump(lines, fmt, filename), source or filename.split(".")[0] or "upload", open_access)
+    except (UnicodeDecodeError, gzip.BadGzipFile, EOFError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the dump: {e}")
+    finally:
+        lines.detach()
+    
+    # This process serves the new catalog right away; others catch up on their next version sync
+    await load_catalog_indexes()
+    invalidate_catalog_payloads()
+    await CATALOG_VERSION.bump()
+    return report
+
+# ============== WRITE-BEHIND SIDE EFFECTS ==============
+
+# Increments on these fields are clamped to (min, max) by each op as it is applied
+COUNTER_CLAMPS = {
+    "users": {"trust_score": (0, 100)}
+}
+
+# Ids of counter ops whose outcome is not settled yet are kept on the target
+# document, so a retried op is applied at most once (see write_counter_ops)
+COUNTER_OPS_FIELD = "pending_counter_ops"
+
+# Projection for user and catalog documents returned by the API (hides the op ids)
+PUBLIC_DOC_PROJECTION = {"_id": 0, COUNTER_OPS_FIELD: 0}
+
+# How long a drain owns the outbox entries it claimed before others may retry them
+OUTBOX_CLAIM_SECONDS = 60
+
+def build_counter_update(collection_name: str, increments: Dict[str, int], op_id: Optional[str] = None):
+    """Build the update for one op's increments, clamping fields listed in COUNTER_CLAMPS.
+    
+    Clamped fields need the post-increment value, so they use a pipeline update
+    instead of $inc (still a single write, no follow-up clamp queries). With
+    `op_id`, the same write records the op id in COUNTER_OPS_FIELD.
+    """
+    clamps = COUNTER_CLAMPS.get(collection_name, {})
+    if not any(field in clamps for field in increments):
+        update = {"$inc": increments}
+        if op_id:
+            update["$push"] = {COUNTER_OPS_FIELD: op_id}
+        return update
+    
+    new_values = {}
+    for field, delta in increments.items():
+        value = {"$add": [{"$ifNull": [f"${field}", 0]}, delta]}
+        if field in clamps:
+            low, high = clamps[field]
+            value = {"$min": [high, {"$max": [low, value]}]}
+        new_values[field] = value
+    if op_id:
+        new_values[COUNTER_OPS_FIELD] = {"$concatArrays": [{"$ifNull": [f"${COUNTER_OPS_FIELD}", []]}, [op_id]]}
+    return [{"$set": new_values}]
+
+def counter_op(collection_name: str, match_field: str, match_value: str, **increments: int) -> Optional[dict]:
+    """Outbox entry for one document's increments (None when they are all zero)"""
+    increments = {field: delta for field, delta in increments.items() if delta}
+    if not increments:
+        return None
+    now = datetime.now(timezone.utc)
+    return {
+        "op_id": f"op_{uuid.uuid4().hex}",
+        "collection": collection_name,
+        "match_field": match_field,
+        "match_value": match_value,
+        "increments": increments,
+        "attempts": 0,
+        "last_error": None,
+        "next_attempt_at": now,
+        "created_at": now
+    }
+
+async def write_counter_ops(collection_name: str, match_field: str, ops: List[dict]) -> tuple:
+    """Apply counter ops in order with one ordered bulk_write (one update per op).
+    
+    Each update only matches while the document does not carry the op id and
+    records it in the same write, so re-applying an op whose earlier attempt
+    did land (lost acknowledgement, crash before clean-up) is a no-op. Ops are
+    never merged, so clamped fields are clamped after every op.
+    
+    Returns:
+        tuple: (applied ops, {op_id: error} for the op the server rejected).
+        Ops after a rejected one were not attempted and are in neither.
+        Raises when the outcome of the batch is unknown (network error, write concern).
+    """
+    if not ops:
+        return [], {}
+    operations = [
+        UpdateOne(
+            {match_field: op["match_value"], COUNTER_OPS_FIELD: {"$ne": op["op_id"]}},
+            build_counter_update(collection_name, op["increments"], op["op_id"])
+        )
+        for op in ops
+    ]
+    try:
+        await db[collection_name].bulk_write(operations, ordered=True)
+    except BulkWriteError as e:
+        if e.details.get("writeConcernErrors"):
+            raise
+        error = e.details["writeErrors"][0]
+        return ops[:error["index"]], {ops[error["index"]]["op_id"]: error.get("errmsg", "write error")}
+    return ops, {}
+
+async def clear_counter_op_ids(collection_name: str, match_field: str, ops: List[dict]):
+    """Drop the ids of settled ops from their documents"""
+    op_ids = defaultdict(list)
+    for op in ops:
+        op_ids[op["match_value"]].append(op["op_id"])
+    operations = []
+    for value, ids in op_ids.items():
+        operations.append(UpdateOne({match_field: value}, {"$pull": {COUNTER_OPS_FIELD: {"$in": ids}}}))
+        operations.append(UpdateOne({match_field: value, COUNTER_OPS_FIELD: {"$size": 0}}, {"$unset": {COUNTER_OPS_FIELD: ""}}))
+    await db[collection_name].bulk_write(operations)
+
+async def counters_applied(collection_name: str, ops: List[dict]):
+    """Follow-ups of applied increments: catalog version bump and promotion checks"""
+    if collection_name in ("journals", "publishers"):
+        await CATALOG_VERSION.bump()
+    
+    # Only entities that gained validated submissions can cross the promotion threshold
+    gained = list({op["match_value"] for op in ops if op["increments"].get("validated_submission_count", 0) > 0})
+    if gained and collection_name == "journals":
+        await check_and_promote_journals(gained)
+    elif gained and collection_name == "publishers":
+        await check_and_promote_publishers(gained)
+
+class SideEffectQueue:
+    """Durable write-behind queue for secondary counter updates.
+    
+    Request handlers record their counter ops in the side_effect_outbox
+    collection right after the primary write (one insert_many), and a
+    background worker drains the outbox: due entries are claimed for
+    OUTBOX_CLAIM_SECONDS, applied in creation order with one ordered
+    bulk_write per collection, and deleted. Every op carries an id (see
+    write_counter_ops), so an entry retried after a lost acknowledgement or a
+    crash is applied at most once; rejected entries are retried with
+    exponential backoff. Nothing is kept in process memory, so a process that
+    dies only delays its side effects until another drain picks them up.
+    """
+    
+    def __init__(self, flush_interval: float = 0.5, batch_size: int = 500, retry_base_seconds: float = 5.0,
+                 stop_timeout: float = 10.0):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retry_base_seconds = retry_base_seconds
+        self.stop_timeout = stop_timeout
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = None
+    
+    async def record(self, ops: List[Optional[dict]]):
+        """Persist counter ops (from counter_op) for the worker; None entries are skipped"""
+        ops = [op for op in ops if op]
+        if ops:
+            await db.side_effect_outbox.insert_many(ops)
+            self._wakeup.set()
+    
+    async def _claim(self) -> List[dict]:
+        now = datetime.now(timezone.utc)
+        due = await db.side_effect_outbox.find(
+            {"next_attempt_at": {"$lte": now}}, {"_id": 1}
+        ).sort("next_attempt_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not due:
+            return []
+        claim_id = f"claim_{uuid.uuid4().hex[:12]}"
+        await db.side_effect_outbox.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in due]}, "next_attempt_at": {"$lte": now}},
+            {"$set": {"claimed_by": claim_id, "next_attempt_at": now + timedelta(seconds=OUTBOX_CLAIM_SECONDS)}}
+        )
+        return await db.side_effect_outbox.find(
+            {"_id": {"$in": [doc["_id"] for doc in due]}, "claimed_by": claim_id}
+        ).sort([("created_at", 1), ("_id", 1)]).to_list(None)
+    
+    async def drain(self) -> int:
+        """Apply one batch of due outbox entries; returns how many were claimed"""
+        entries = await self._claim()
+        batches = defaultdict(list)
+        for entry in entries:
+            batches[(entry["collection"], entry["match_field"])].append(entry)
+        for (collection_name, match_field), ops in batches.items():
+            await self._apply(collection_name, match_field, ops)
+        return len(entries)
+    
+    async def _apply(self, collection_name: str, match_field: str, ops: List[dict]):
+        try:
+            applied, failed = await write_counter_ops(collection_name, match_field, ops)
+        except Exception as e:
+            logger.warning(f"Side-effect batch on {collection_name} failed, will retry: {e}")
+            applied, failed = [], {op["op_id"]: str(e) for op in ops}
+        
+        if applied:
+            try:
+                await db.side_effect_outbox.delete_many({"_id": {"$in": [op["_id"] for op in applied]}})
+            except Exception as e:
+                # The op ids stay on the documents, so retrying these entries once the claim expires is a no-op
+                logger.warning(f"Could not remove applied outbox entries on {collection_name}: {e}")
+            else:
+                await self._settle(collection_name, match_field, applied)
+        
+        now = datetime.now(timezone.utc)
+        settled = {op["op_id"] for op in applied}
+        updates = []
+        for op in ops:
+            if op["op_id"] in failed:
+                delay = min(self.retry_base_seconds * (2 ** op["attempts"]), 3600)
+                updates.append(UpdateOne({"_id": op["_id"]}, {
+                    "$inc": {"attempts": 1},
+                    "$set": {"last_error": failed[op["op_id"]], "next_attempt_at": now + timedelta(seconds=delay)},
+                    "$unset": {"claimed_by": ""}
+                }))
+            elif op["op_id"] not in settled:
+                # Not attempted (behind a rejected op): due again right away
+                updates.append(UpdateOne({"_id": op["_id"]}, {"$set": {"next_attempt_at": now}, "$unset": {"claimed_by": ""}}))
+        if updates:
+            await db.side_effect_outbox.bulk_write(updates, ordered=False)
+        if failed:
+            logger.warning(f"Side effects on {collection_name} failed ({len(failed)} ops): {next(iter(failed.values()))}")
+    
+    async def _settle(self, collection_name: str, match_field: str, ops: List[dict]):
+        # Best effort: the increments are in, a failure here must not re-apply them
+        try:
+            await clear_counter_op_ids(collection_name, match_field, ops)
+        except Exception as e:
+            logger.warning(f"Could not clear applied op ids on {collection_name}: {e}")
+        try:
+            await counters_applied(collection_name, ops)
+        except Exception as e:
+            logger.error(f"Follow-up of applied increments on {collection_name} failed: {e}")
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                # Keep going while full batches come back
+                while not self._stopping and await self.drain() >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Side-effect worker error: {e}")
+    
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the worker after its current batch, then drain what is due once more"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=self.stop_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+        # Whatever is left stays in the outbox for the next process
+        try:
+            await asyncio.wait_for(self.drain(), timeout=self.stop_timeout)
+        except Exception as e:
+            logger.warning(f"Final side-effect drain did not finish, left in outbox: {e}")
+
+side_effects = SideEffectQueue(
+    flush_interval=float(os.environ.get("SIDE_EFFECT_FLUSH_SECONDS", "0.5"))
+)
+
+def moderation_effects(old_status: str, new_status: str, has_evidence: bool) -> tuple:
+    """Compute the counter changes caused by a moderation status transition.
+    
+    Trust Score Rules: +20 per validated, +10 per validated with evidence, -15 per flagged
+    
+    Returns:
+        tuple: (user increments dict, journal/publisher validated_submission_count delta)
+    """
+    validated_points = 20 + (10 if has_evidence else 0)
+    user_increments = {}
+    catalog_delta = 0
+    
+    if new_status == "validated" and old_status != "validated":
+        # Validated: +20 points, +10 if has evidence
+        user_increments = {"validated_count": 1, "trust_score": validated_points}
+        if has_evidence:
+            user_increments["validated_with_evidence_count"] = 1
+        catalog_delta = 1
+    elif new_status == "flagged" and old_status != "flagged":
+        # Flagged: -15 points
+        user_increments = {"flagged_count": 1, "trust_score": -15}
+    elif old_status == "validated" and new_status != "validated":
+        # Reverting from validated: remove the points
+        user_increments = {"validated_count": -1, "trust_score": -validated_points}
+        if has_evidence:
+            user_increments["validated_with_evidence_count"] = -1
+        catalog_delta = -1
+    elif old_status == "flagged" and new_status != "flagged":
+        # Reverting from flagged: restore points
+        user_increments = {"flagged_count": -1, "trust_score": 15}
+    
+    return user_increments, catalog_delta
+
+def moderation_effect_ops(submission: dict, user_increments: dict, catalog_delta: int) -> List[Optional[dict]]:
+    """Counter ops (for side_effects.record) of one moderation's user/journal/publisher updates"""
+    return [
+        counter_op("users", "hashed_id", submission["user_hashed_id"], **user_increments),
+        # Journal/publisher validated count drives promotion to verified
+        counter_op("journals", "journal_id", submission["journal_id"], validated_submission_count=catalog_delta),
+        counter_op("publishers", "publisher_id", submission["publisher_id"], validated_submission_count=catalog_delta)
+    ]
+
+# ============== SUBMISSIONS ==============
+
+# Number of identical custom-journal submissions before a candidate becomes an official journal
+CANDIDATE_PROMOTION_THRESHOLD = 3
+
+async def upsert_on_unique(collection, key: dict, update: dict) -> dict:
+    """Atomically upsert a document matched by a unique key and return it (after update).
+    
+    Concurrent upserts on the same key can race on the unique index; the loser
+    simply retries, which then matches the winner's document.
+    """
+    for attempt in range(2):
+        try:
+            return await collection.find_one_and_update(
+                key,
+                update,
+                upsert=True,
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            if attempt:
+                raise
+
+async def promote_journal_candidate(candidate: dict, publisher_id: Optional[str], open_access: Optional[bool]) -> tuple:
+    """Promote a crowdsourced journal candidate to the official catalog.
+    
+    Idempotent: publisher and journal are upserted on their unique normalized
+    keys, so concurrent promoters all resolve to the same documents.
+    
+    Returns:
+        tuple: (journal_id, publisher_id)
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    
+    async with catalog_write() as catalog_version:
+        # 1. Garante/Cria o Publisher primeiro
+        promoted_publisher_id = publisher_id
+        if not promoted_publisher_id:
+            publisher = await upsert_on_unique(
+                db.publishers,
+                {"name_key": candidate["publisher_key"]},
+                {"$setOnInsert": {
+                    "publisher_id": f"pub_{uuid.uuid4().hex[:12]}",
+                    "name": candidate["publisher_name"],
+                    "is_user_added": False,  # Agora é oficial
+                    "is_verified": True,
+                    "created_at": now,
+                    "catalog_version": catalog_version
+                }}
+            )
+            promoted_publisher_id = publisher["publisher_id"]
+            catalog_index.put_publisher(publisher)
+        
+        # 2. Cria o Jornal Oficial (ou reaproveita o criado por um promotor concorrente)
+        journal = await upsert_on_unique(
+            db.journals,
+            {"publisher_id": promoted_publisher_id, "name_key": candidate["name_key"]},
+            {"$setOnInsert": {
+                "journal_id": f"journal_{uuid.uuid4().hex[:12]}",
+                "name": candidate["name"],
+                "is_user_added": False,  # Agora é oficial
+                "is_verified": True,
+                "open_access": open_access,
+                "added_at": now,
+                "source": "crowdsourced",
+                "catalog_version": catalog_version
+            }}
+        )
+    index_journal_name(journal)
+    catalog_index.put_journal(journal)
+    invalidate_catalog_payloads()
+    
+    # 3. Marca o candidato como promovido (as próximas submissões reutilizam os IDs oficiais)
+    await db.journal_candidates.update_one(
+        {"name_key": candidate["name_key"], "publisher_key": candidate["publisher_key"]},
+        {"$set": {
+            "promoted_journal_id": journal["journal_id"],
+            "promoted_publisher_id": promoted_publisher_id,
+            "promoted_at": now
+        }}
+    )
+    
+    logger.info(f"Journal candidate '{candidate['name']}' ({candidate['publisher_name']}) promoted to official catalog")
+    return journal["journal_id"], promoted_publisher_id
+
+# --- Idempotent submission creation ---
+
+# Stored responses for Idempotency-Key retries expire after this long (TTL index)
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24"))
+# A reservation whose request has not finished after this long (crashed worker,
+# lost connection to MongoDB) can be taken over by a retry
+IDEMPOTENCY_LEASE_SECONDS = float(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+async def get_idempotent_response(scope: str, idempotency_key: str, fingerprint: str, lease_id: str) -> Optional[dict]:
+    """Return the stored response for a retried request, or reserve the key for a new one.
+    
+    The reservation is held under `lease_id` until in_progress_until; once
+    that has passed, a retry takes the reservation over and runs the request
+    itself instead of waiting for the TTL to drop the key.
+    
+    Raises:
+        HTTPException 422 if the key was used with a different payload,
+        HTTPException 409 if the original request is still being processed
+    """
+    key = f"{scope}:{idempotency_key}"
+    now = datetime.now(timezone.utc)
+    lease_until = now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+    record = await db.idempotency_keys.find_one({"key": key}, {"_id": 0})
+    
+    if record is None:
+        try:
+            await db.idempotency_keys.insert_one({
+                "key": key,
+                "fingerprint": fingerprint,
+                "status": "in_progress",
+                "lease_id": lease_id,
+                "in_progress_until": lease_until,
+                "created_at": now  # BSON date, required by the TTL index
+            })
+            return None
+        except DuplicateKeyError:
+            # A concurrent retry reserved it first
+            record = await db.idempotency_keys.find_one({"key": key}, {"_id": 0})
+    
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    if record["status"] == "completed":
+        return record["response"]
+    
+    # Reservations made before leases existed carry no in_progress_until
+    taken_over = await db.idempotency_keys.update_one(
+        {"key": key, "status": "in_progress", "$or": [
+            {"in_progress_until": {"$lt": now}},
+            {"in_progress_until": {"$exists": False}}
+        ]},
+        {"$set": {"lease_id": lease_id, "in_progress_until": lease_until}}
+    )
+    if taken_over.modified_count:
+        logger.warning(f"Idempotency-Key {key} taken over after its reservation expired")
+        return None
+    
+    # Completed or still leased since we read it
+    record = await db.idempotency_keys.find_one({"key": key}, {"_id": 0})
+    if record and record["status"] == "completed":
+        return record["response"]
+    raise HTTPException(
+        status_code=409,
+        detail="A request with this Idempotency-Key is still being processed",
+        headers={"Retry-After": str(int(IDEMPOTENCY_LEASE_SECONDS))}
+    )
+
+async def save_idempotent_response(scope: str, idempotency_key: str, lease_id: str, response: dict):
+    """Store the first response so retries can replay it (unless the lease was taken over)"""
+    await db.idempotency_keys.update_one(
+        {"key": f"{scope}:{idempotency_key}", "lease_id": lease_id},
+        {"$set": {"status": "completed", "response": response}, "$unset": {"in_progress_until": ""}}
+    )
+
+async def release_idempotency_key(scope: str, idempotency_key: str, lease_id: str):
+    """Forget a reservation whose request failed, so the client can retry"""
+    await db.idempotency_keys.delete_one({
+        "key": f"{scope}:{idempotency_key}", "status": "in_progress", "lease_id": lease_id
+    })
+
+@api_router.post("/submissions")
+async def create_submission(submission: SubmissionCreate, request: Request):
+    """Create a new editorial decision submission with Crowdsourcing Learning
+    
+    Honors an optional Idempotency-Key header: a retry with the same key and
+    payload returns the first response without re-running the create path.
+    """
+    
+    # 1. Autenticação
+    user = await require_auth(request)
+    
+    # Retentativas (conexões móveis instáveis) recebem a resposta original
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if idempotency_key:
+        fingerprint = hashlib.sha256(submission.model_dump_json().encode()).hexdigest()
+        lease_id = uuid.uuid4().hex
+        cached = await get_idempotent_response(user.user_id, idempotency_key, fingerprint, lease_id)
+        if cached is not None:
+            return cached
+        try:
+            response = await _create_submission(submission, user)
+        except Exception:
+            await release_idempotency_key(user.user_id, idempotency_key, lease_id)
+            raise
+        await save_idempotent_response(user.user_id, idempotency_key, lease_id, response)
+        return response
+    
+    return await _create_submission(submission, user)
+
+async def _create_submission(submission: SubmissionCreate, user: User) -> dict:
+    """Validation, crowdsourcing resolution and insert for an authenticated user"""
+    
+    # Guarda de Integridade Científica (ORCID Check)
+    user_doc = await db.users.find_one({"user_id": user.user_id})
+    has_orcid = (
+        user_doc.get("has_orcid") is True or 
+        user_doc.get("orcid_hash") is not None or 
+        user_doc.get("auth_provider") == "orcid"
+    )
+
+    if not has_orcid:
+        raise HTTPException(
+            status_code=403, 
+            detail="Scientific Integrity Check: You must link your ORCID account in Settings to submit evidence."
+        )
+
+    # =========================================================================
+    # 2. Lógica de "Aprendizado" (Crowdsourcing) - O CORAÇÃO DA MUDANÇA
+    # =========================================================================
+    
+    final_publisher_id = submission.publisher_id
+    final_journal_id = submission.journal_id
+    journal_suggestions = []
+    
+    # Se o usuário digitou um Jornal Customizado ("Other")
+    if submission.journal_id == "other" and submission.custom_journal_name:
+        
+        # Normaliza o texto (Remove espaços extras, Título Capitalizado)
+        clean_journal = " ".join(submission.custom_journal_name.split()).title()
+        journal_key = normalize_name_key(clean_journal)
+        
+        # Resolve o nome da Editora (pela chave normalizada, "Springer-Nature" == "Springer Nature")
+        clean_publisher = "Unknown"
+        known_publisher_id = None
+        if submission.publisher_id == "other" and submission.custom_publisher_name:
+            clean_publisher = " ".join(submission.custom_publisher_name.split()).title()
+            pub_doc = await db.publishers.find_one({"name_key": normalize_name_key(clean_publisher)})
+            if pub_doc:
+                clean_publisher = pub_doc["name"]
+                known_publisher_id = final_publisher_id = pub_doc["publisher_id"]
+        elif submission.publisher_id and submission.publisher_id != "other":
+            pub_doc = await db.publishers.find_one({"publisher_id": submission.publisher_id})
+            if pub_doc:
+                clean_publisher = pub_doc.get("name")
+            known_publisher_id = submission.publisher_id
+        publisher_key = normalize_name_key(clean_publisher)
+
+        # Verifica se esse jornal JÁ EXISTE na lista oficial (evita duplicatas)
+        # As vezes o usuário digita "Nature" ou "PLoS One" mas já existe na lista e ele não viu
+        existing_journal = await db.journals.find_one({
+            "name_key": journal_key,
+            "publisher_id": known_publisher_id if known_publisher_id else {"$exists": True}
+        })
+        
+        if existing_journal:
+            # Se já existe, usa o ID oficial e ignora o "custom"
+            final_journal_id = existing_journal["journal_id"]
+            final_publisher_id = existing_journal["publisher_id"]
+        else:
+            # Se não existe, adiciona aos CANDIDATOS: incrementa e lê o contador
+            # numa única ida ao banco (sem update_one + find_one separados)
+            candidate = await upsert_on_unique(
+                db.journal_candidates,
+                {"name_key": journal_key, "publisher_key": publisher_key},
+                {
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {"name": clean_journal, "publisher_name": clean_publisher}
+                }
+            )
+            
+            if candidate.get("promoted_journal_id"):
+                # Outra submissão (possivelmente concorrente) já promoveu este candidato
+                final_journal_id = candidate["promoted_journal_id"]
+                final_publisher_id = candidate["promoted_publisher_id"]
+            
+            elif candidate["count"] >= CANDIDATE_PROMOTION_THRESHOLD:
+                # REGRA DO 3: PROMOÇÃO! Vira um jornal oficial.
+                # Os upserts sobre índices únicos garantem que submissões concorrentes
+                # convergem para o mesmo publisher/jornal (promoção exactly-once)
+                final_journal_id, final_publisher_id = await promote_journal_candidate(
+                    candidate, known_publisher_id, submission.custom_journal_open_access
+                )
+            
+            else:
+                # Se ainda não foi promovido, cria um registro temporário "user added" para esta submissão específica
+                # Isso mantém o histórico sem poluir a lista global
+                temp_id = f"journal_user_{uuid.uuid4().hex[:12]}"
+                final_journal_id = temp_id
+                
+                # Opcional: Salvar na collection de journals mas marcado como hidden/unverified
+                # Aqui optamos por não salvar na main list até ser promovido, 
+                # mas salvamos o nome texto na submissão (veja abaixo)
+                
+                # Sugestões aproximadas ("Jornal of Ecology" -> "Journal of Ecology") para o frontend
+                journal_suggestions = suggest_journals(clean_journal)
+
+    # =========================================================================
+
+    submission_id = f"sub_{uuid.uuid4().hex[:12]}"
+    
+    # Determina área científica (compatibilidade legado)
+    scientific_area = submission.scientific_area
+    if submission.scientific_area_grande:
+        scientific_area = submission.scientific_area_grande
+        if submission.scientific_area_area:
+            scientific_area = submission.scientific_area_area
+        if submission.scientific_area_subarea:
+            scientific_area = submission.scientific_area_subarea
+    
+    # Validação Estatística
+    valid_for_stats, validation_flags = await validate_submission_for_stats(
+        user.hashed_id, final_journal_id, submission
+    )
+    
+    submission_doc = {
+        "submission_id": submission_id,
+        "user_hashed_id": user.hashed_id,
+        "scientific_area": scientific_area,
+        "scientific_area_grande": submission.scientific_area_grande,
+        "scientific_area_area": submission.scientific_area_area,
+        "scientific_area_subarea": submission.scientific_area_subarea,
+        "manuscript_type": submission.manuscript_type,
+        
+        # IDs resolvidos (oficiais ou temporários)
+        "journal_id": final_journal_id,
+        "publisher_id": final_publisher_id,
+        
+        # Salva o "snapshot" dos nomes digitados para referência futura
+        "custom_journal_name": submission.custom_journal_name if submission.journal_id == "other" else None,
+        "custom_publisher_name": submission.custom_publisher_name if submission.publisher_id == "other" else None,
+        
+        "decision_type": submission.decision_type,
+        "reviewer_count": submission.reviewer_count,
+        "time_to_decision": submission.time_to_decision,
+        "apc_range": submission.apc_range,
+        "review_comments": submission.review_comments,
+        "editor_comments": submission.editor_comments,
+        "perceived_coherence": submission.perceived_coherence,
+        
+        # Campos de Qualidade
+        "overall_review_quality": getattr(submission, 'overall_review_quality', None),
+        "feedback_clarity": getattr(submission, 'feedback_clarity', None),
+        "decision_fairness": getattr(submission, 'decision_fairness', None),
+        "would_recommend": getattr(submission, 'would_recommend', None),
+        
+        # Condicionais
+        "journal_is_open_access": getattr(submission, 'journal_is_open_access', None),
+        "editor_comments_quality": getattr(submission, 'editor_comments_quality', None),
+        
+        # Metadados
+        "evidence_file_id": None,
+        "status": "pending",
+        "is_sample": False,
+        "valid_for_stats": valid_for_stats,
+        "validation_flags": validation_flags,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.submissions.insert_one(submission_doc)
+    await ANALYTICS_VERSION.bump()
+    
+    # Atualiza contagem de contribuição do usuário (write-behind via outbox, aplicada em segundo plano)
+    await side_effects.record([counter_op("users", "user_id", user.user_id, contribution_count=1)])
+    
+    response = {"submission_id": submission_id, "status": "pending", "valid_for_stats": valid_for_stats}
+    if journal_suggestions:
+        response["journal_suggestions"] = journal_suggestions
+    return response
+
+
+# Same user + same journal within this window counts as a duplicate
+DUPLICATE_WINDOW_DAYS = 30
+
+def evaluate_submission_rules(submission: dict) -> dict:
+    """
+    Apply the completeness and consistency rules to a submission (pure, no DB access).
+    
+    Works on the API payload (model_dump) as well as on stored submission documents,
+    so the same rules serve both creation and retroactive re-validation.
+    
+    Returns:
+        dict: validation flags; is_unique is left True (duplicates need the
+              user's other submissions, see validate_submission_for_stats)
+    
+    Checks:
+    1. Completeness - all required fields present
+    2. Logical consistency - no contradictory responses
+    3. Conditional field validation - conditional fields only present when appropriate
+    """
+    flags = {
+        "is_complete": True,
+        "is_consistent": True,
+        "is_unique": True,
+        "issues": []
+    }
+    
+    # 1. Check completeness (required fields)
+    # Note: scientific_area can be the legacy field OR the hierarchical fields
+    has_scientific_area = (
+        submission.get('scientific_area') or 
+        submission.get('scientific_area_grande')
+    )
+    
+    if not has_scientific_area:
+        flags["is_complete"] = False
+        flags["issues"].append("missing_scientific_area")
+    
+    required_fields = ['manuscript_type', 'decision_type', 'reviewer_count', 
+                       'time_to_decision', 'editor_comments', 'perceived_coherence']
+    
+    for field in required_fields:
+        value = submission.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            flags["is_complete"] = False
+            flags["issues"].append(f"missing_{field}")
+    
+    # Review comments can be empty for desk rejects
+    decision_type = submission.get('decision_type') or ''
+    review_comments = submission.get('review_comments') or []
+    if decision_type != 'desk_reject' and (not review_comments or len(review_comments) == 0):
+        flags["is_complete"] = False
+        flags["issues"].append("missing_review_comments")
+    
+    # 2. Check logical consistency
+    reviewer_count = submission.get('reviewer_count') or ''
+    editor_comments = submission.get('editor_comments') or ''
+    
+    # Inconsistency: detailed review comments but 0 reviewers
     if reviewer_count == "0" and review_comments:
         detailed_comments = ['methodology', 'statistics', 'conceptual']
         if any(c in review_comments for c in detailed_comments):
@@ -1228,8 +3529,8 @@ async def validate_submission_for_stats(user_hashed_id: str, journal_id: str, su
     
     # 3. Conditional field validation
     # APC range should only be provided for open access journals
-    journal_is_open_access = getattr(submission, 'journal_is_open_access', None)
-    apc_range = getattr(submission, 'apc_range', None)
+    journal_is_open_access = submission.get('journal_is_open_access')
+    apc_range = submission.get('apc_range')
     
     # If journal is NOT open access, APC range should be 'no_apc' or None
     if journal_is_open_access is False and apc_range and apc_range not in ['no_apc', '']:
@@ -1237,18 +3538,41 @@ async def validate_submission_for_stats(user_hashed_id: str, journal_id: str, su
         flags["issues"].append("apc_provided_for_non_open_access")
     
     # Editor comments quality should only be provided if editor provided comments
-    editor_comments_quality = getattr(submission, 'editor_comments_quality', None)
+    editor_comments_quality = submission.get('editor_comments_quality')
     if editor_comments == 'no' and editor_comments_quality is not None:
         flags["is_consistent"] = False
         flags["issues"].append("editor_quality_without_comments")
     
     # Quality assessment: feedback_clarity only meaningful if there was feedback
-    feedback_clarity = getattr(submission, 'feedback_clarity', None)
+    feedback_clarity = submission.get('feedback_clarity')
     if reviewer_count == "0" and editor_comments == 'no' and feedback_clarity is not None:
         flags["issues"].append("feedback_clarity_without_feedback")  # Warning
     
+    return flags
+
+def mark_duplicate(flags: dict):
+    """Flag a submission as a duplicate (same user + journal within 30 days)"""
+    flags["is_unique"] = False
+    flags["issues"].append("duplicate_within_30_days")
+
+def is_valid_for_stats(flags: dict) -> bool:
+    """Overall validity: complete, consistent and unique"""
+    return flags["is_complete"] and flags["is_consistent"] and flags["is_unique"]
+
+async def validate_submission_for_stats(user_hashed_id: str, journal_id: str, submission) -> tuple:
+    """
+    Validate if a submission should be included in aggregated statistics.
+    
+    Returns:
+        tuple: (valid_for_stats: bool, validation_flags: dict)
+    
+    Applies evaluate_submission_rules, then checks for duplicates
+    (same user + journal within 30 days).
+    """
+    flags = evaluate_submission_rules(submission.model_dump())
+    
     # 4. Check for duplicates (same user + journal within 30 days)
-    thirty_days_ago = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    thirty_days_ago = (datetime.now(timezone.utc) - timedelta(days=DUPLICATE_WINDOW_DAYS)).isoformat()
     
     existing = await db.submissions.find_one({
         "user_hashed_id": user_hashed_id,
@@ -1257,13 +3581,10 @@ async def validate_submission_for_stats(user_hashed_id: str, journal_id: str, su
     })
     
     if existing:
-        flags["is_unique"] = False
-        flags["issues"].append("duplicate_within_30_days")
+        mark_duplicate(flags)
     
     # Determine overall validity
-    valid_for_stats = flags["is_complete"] and flags["is_consistent"] and flags["is_unique"]
-    
-    return valid_for_stats, flags
+    return is_valid_for_stats(flags), flags
 
 @api_router.post("/submissions/{submission_id}/evidence")
 async def upload_evidence(
@@ -1283,36 +3604,50 @@ async def upload_evidence(
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    # Read and encrypt file
-    content = await file.read()
-    encrypted_content = fernet.encrypt(content)
+    # Oversized request bodies never get here (BodySizeLimitMiddleware)
+    # Content-addressed: identical files share one encrypted blob
+    try:
+        blob = await store_evidence_blob(file)
+    except EvidenceTooLarge:
+        raise HTTPException(status_code=413, detail="Evidence file too large")
     
-    # Save encrypted file
+    # Save file metadata (per upload; points at the shared blob)
     file_id = f"evidence_{uuid.uuid4().hex[:12]}"
-    file_path = UPLOAD_DIR / f"{file_id}.enc"
-    
-    with open(file_path, "wb") as f:
-        f.write(encrypted_content)
-    
-    # Save file metadata
     retention_until = datetime.now(timezone.utc) + timedelta(days=365)  # 12 months retention
     evidence_doc = {
         "file_id": file_id,
         "user_hashed_id": user.hashed_id,
-        "encrypted_path": str(file_path),
+        "content_hash": blob["content_hash"],
+        **{field: blob[field] for field in EVIDENCE_LOCATION_FIELDS if field in blob},
         "original_filename": file.filename,
         "mime_type": file.content_type,
+        "encryption": blob["encryption"],
+        "size_bytes": blob["size_bytes"],
         "retention_until": retention_until.isoformat(),
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.evidence_files.insert_one(evidence_doc)
     
+    # Render the moderation preview in the background (no-op if the blob has one)
+    if is_previewable(file.content_type) and "preview" not in blob:
+        schedule_evidence_preview(blob["content_hash"])
+    
     # Update submission with file reference
-    await db.submissions.update_one(
+    previous = await db.submissions.find_one_and_update(
         {"submission_id": submission_id},
-        {"$set": {"evidence_file_id": file_id}}
+        {"$set": {"evidence_file_id": file_id}},
+        projection={"evidence_file_id": 1},
+        return_document=ReturnDocument.BEFORE
     )
     
+    # A re-upload replaces the previous evidence: release its blob reference
+    # (if this fails, the unreferenced file is reclaimed by the retention sweep)
+    previous_id = (previous or {}).get("evidence_file_id")
+    if previous_id and previous_id != file_id:
+        replaced = await db.evidence_files.find({"file_id": previous_id}, EVIDENCE_DELETE_PROJECTION).to_list(1)
+        if replaced:
+            await delete_evidence_files(replaced, defaultdict(int))
+    
     return {"file_id": file_id, "status": "uploaded"}
 
 @api_router.get("/submissions/my")
@@ -1326,11 +3661,7 @@ async def get_my_submissions(request: Request):
     ).sort("created_at", -1).to_list(1000)
     
     # Enrich with journal/publisher names
-    for sub in submissions:
-        journal = await db.journals.find_one({"journal_id": sub["journal_id"]}, {"_id": 0, "name": 1})
-        publisher = await db.publishers.find_one({"publisher_id": sub["publisher_id"]}, {"_id": 0, "name": 1})
-        sub["journal_name"] = journal["name"] if journal else "Unknown"
-        sub["publisher_name"] = publisher["name"] if publisher else "Unknown"
+    await add_catalog_names(submissions)
     
     return submissions
 
@@ -1561,11 +3892,7 @@ async def get_publisher_analytics():
         return []  # No public publisher stats in user_only mode
     
     # Get list of verified publisher IDs
-    verified_publishers = await db.publishers.find(
-        {"$or": [{"is_verified": True}, {"is_verified": {"$exists": False}}]},
-        {"_id": 0, "publisher_id": 1}
-    ).to_list(1000)
-    verified_pub_ids = [p["publisher_id"] for p in verified_publishers]
+    verified_pub_ids = await catalog_index.verified_publisher_ids()
     
     pipeline = [
         {"$match": {**base_query, "publisher_id": {"$in": verified_pub_ids}}},
@@ -1585,9 +3912,10 @@ async def get_publisher_analytics():
     results = await db.submissions.aggregate(pipeline).to_list(1000)
     
     # Enrich with publisher names and calculate scores
+    publishers = await catalog_index.get_publishers(r["_id"] for r in results)
     analytics = []
     for r in results:
-        publisher = await db.publishers.find_one({"publisher_id": r["_id"]}, {"_id": 0})
+        publisher = publishers.get(r["_id"])
         if not publisher:
             continue
         
@@ -1634,15 +3962,7 @@ async def get_journal_analytics(publisher_id: Optional[str] = None):
         return []  # No public journal stats in user_only mode
     
     # Get list of verified journal IDs
-    journal_query = {"$or": [{"is_verified": True}, {"is_verified": {"$exists": False}}]}
-    if publisher_id:
-        journal_query["publisher_id"] = publisher_id
-    
-    verified_journals = await db.journals.find(
-        journal_query,
-        {"_id": 0, "journal_id": 1}
-    ).to_list(1000)
-    verified_journal_ids = [j["journal_id"] for j in verified_journals]
+    verified_journal_ids = await catalog_index.verified_journal_ids(publisher_id)
     
     match_stage = {**base_query, "journal_id": {"$in": verified_journal_ids}}
     if publisher_id:
@@ -1666,10 +3986,14 @@ async def get_journal_analytics(publisher_id: Optional[str] = None):
     
     results = await db.submissions.aggregate(pipeline).to_list(1000)
     
+    journals, publishers = await asyncio.gather(
+        catalog_index.get_journals(r["_id"] for r in results),
+        catalog_index.get_publishers(r["publisher_id"] for r in results)
+    )
     analytics = []
     for r in results:
-        journal = await db.journals.find_one({"journal_id": r["_id"]}, {"_id": 0})
-        publisher = await db.publishers.find_one({"publisher_id": r["publisher_id"]}, {"_id": 0})
+        journal = journals.get(r["_id"])
+        publisher = publishers.get(r["publisher_id"])
         if not journal or not publisher:
             continue
         
@@ -1694,7 +4018,7 @@ async def get_journal_analytics(publisher_id: Optional[str] = None):
             "no_peer_review_rate": round((r["no_reviewer"] / total) * 100, 1)
         })
     
-    return analytics
+    return FastJSONResponse(analytics)
 
 @api_router.get("/analytics/areas")
 async def get_area_analytics():
@@ -1776,8 +4100,10 @@ async def get_my_insights(request: Request):
     
     # Get journal names
     top_journals = []
-    for jid, count in sorted(journals_submitted.items(), key=lambda x: -x[1])[:5]:
-        journal = await db.journals.find_one({"journal_id": jid}, {"_id": 0, "name": 1})
+    top_journal_counts = sorted(journals_submitted.items(), key=lambda x: -x[1])[:5]
+    journals = await catalog_index.get_journals(jid for jid, _ in top_journal_counts)
+    for jid, count in top_journal_counts:
+        journal = journals.get(jid)
         if journal:
             top_journals.append({"name": journal["name"], "count": count})
     
@@ -1864,202 +4190,738 @@ async def ensure_areas_initialized():
             await db.scientific_areas.insert_many(areas_to_insert)
     return True
 
+# --- In-memory area tree ---
+
+# Other worker processes only see an admin area edit after a reload
+CNPQ_TREE_REFRESH_SECONDS = float(os.environ.get("CNPQ_TREE_REFRESH_SECONDS", "300"))
+
+def _json_bytes(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+class CnpqTree:
+    """Immutable snapshot of the scientific_areas collection.
+    
+    Built once from all area documents: a flat code → node dict, active
+    children per parent sorted by code, and the JSON body of every dropdown
+    response serialized up front. Edits build a new snapshot instead of
+    mutating this one.
+    """
+    
+    def __init__(self, docs: List[dict], version: int = 0):
+        self.version = version
+        self.nodes = {
+            doc["code"]: {
+                "type": doc["level"],
+                "code": doc["code"],
+                "name": doc["name"],
+                "name_en": doc["name_en"],
+                "is_active": doc.get("is_active", True)
+            }
+            for doc in docs
+        }
+        children = defaultdict(list)
+        for doc in docs:
+            if doc.get("is_active", True):
+                children[doc.get("parent_code")].append(doc)
+        
+        # parent code (None for the Grande Áreas) → sorted child codes / response body
+        self.children = {}
+        self.children_json = {}
+        for parent_code, docs_ in children.items():
+            docs_.sort(key=lambda doc: doc["code"])
+            self.children[parent_code] = tuple(doc["code"] for doc in docs_)
+            self.children_json[parent_code] = _json_bytes([
+                {"code": doc["code"], "name": doc["name"], "name_en": doc["name_en"]} for doc in docs_
+            ])
+        self.lookup_json = {code: _json_bytes(node) for code, node in self.nodes.items()}
+        # Legacy /options/scientific-areas shape
+        self.scientific_areas_json = _json_bytes([
+            {"id": code, "name": self.nodes[code]["name"], "name_en": self.nodes[code]["name_en"]}
+            for code in self.children.get(None, ())
+        ])
+        self.built_at = time.monotonic()
+
+_cnpq_tree: Optional[CnpqTree] = None
+_cnpq_tree_lock = asyncio.Lock()
+
+async def refresh_cnpq_tree() -> CnpqTree:
+    """Rebuild the area tree from the database and swap it in"""
+    global _cnpq_tree
+    version = AREAS_VERSION.value
+    await ensure_areas_initialized()
+    docs = await db.scientific_areas.find(
+        {}, {"_id": 0, "code": 1, "name": 1, "name_en": 1, "level": 1, "parent_code": 1, "is_active": 1}
+    ).to_list(None)
+    _cnpq_tree = CnpqTree(docs, version)
+    options_bundle_cache.invalidate()
+    return _cnpq_tree
+
+def _cnpq_tree_stale(tree: Optional[CnpqTree]) -> bool:
+    return (
+        tree is None
+        or tree.version < AREAS_VERSION.value
+        or time.monotonic() - tree.built_at >= CNPQ_TREE_REFRESH_SECONDS
+    )
+
+async def get_cnpq_tree() -> CnpqTree:
+    """Current area tree, reloaded after an area edit (in any worker) or CNPQ_TREE_REFRESH_SECONDS"""
+    tree = _cnpq_tree
+    if not _cnpq_tree_stale(tree):
+        return tree
+    async with _cnpq_tree_lock:
+        tree = _cnpq_tree
+        if _cnpq_tree_stale(tree):
+            tree = await refresh_cnpq_tree()
+        return tree
+
+async def cnpq_areas_changed():
+    """Publish an admin area edit: bump the areas version and rebuild the tree"""
+    await AREAS_VERSION.bump()
+    await refresh_cnpq_tree()
+
+def json_bytes_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
 @api_router.get("/options/scientific-areas")
 async def get_scientific_areas():
     """Get list of scientific areas (legacy - returns Grande Áreas for backwards compatibility)"""
-    await ensure_areas_initialized()
-    
-    # Get from DB (only active)
-    areas = await db.scientific_areas.find(
-        {"level": "grande_area", "is_active": True},
-        {"_id": 0, "code": 1, "name": 1, "name_en": 1}
-    ).sort("code", 1).to_list(100)
-    
-    return [{"id": a["code"], "name": a["name"], "name_en": a["name_en"]} for a in areas]
+    tree = await get_cnpq_tree()
+    return json_bytes_response(tree.scientific_areas_json)
 
 # ============== CNPq HIERARCHICAL AREAS ==============
 
 @api_router.get("/options/cnpq/grande-areas")
 async def get_cnpq_grande_areas():
     """Get list of CNPq Grande Áreas (top level)"""
-    await ensure_areas_initialized()
-    
-    areas = await db.scientific_areas.find(
-        {"level": "grande_area", "is_active": True},
-        {"_id": 0, "code": 1, "name": 1, "name_en": 1}
-    ).sort("code", 1).to_list(100)
-    
-    return areas
+    tree = await get_cnpq_tree()
+    return json_bytes_response(tree.children_json.get(None, b"[]"))
 
 @api_router.get("/options/cnpq/areas/{grande_area_code}")
 async def get_cnpq_areas(grande_area_code: str):
     """Get list of CNPq Áreas for a given Grande Área"""
-    await ensure_areas_initialized()
+    tree = await get_cnpq_tree()
     
-    areas = await db.scientific_areas.find(
-        {"level": "area", "parent_code": grande_area_code, "is_active": True},
-        {"_id": 0, "code": 1, "name": 1, "name_en": 1}
-    ).sort("code", 1).to_list(100)
-    
-    if not areas:
-        # Check if grande_area exists
-        ga = await db.scientific_areas.find_one({"code": grande_area_code, "level": "grande_area"})
-        if not ga:
-            raise HTTPException(status_code=404, detail="Grande Área not found")
-    
-    return areas
+    # Only a Grande Área has Áreas (the children of an Área are its Subáreas)
+    node = tree.nodes.get(grande_area_code)
+    if not node or node["type"] != "grande_area":
+        raise HTTPException(status_code=404, detail="Grande Área not found")
+    return json_bytes_response(tree.children_json.get(grande_area_code, b"[]"))
 
 @api_router.get("/options/cnpq/subareas/{area_code}")
 async def get_cnpq_subareas(area_code: str):
     """Get list of CNPq Subáreas for a given Área"""
-    await ensure_areas_initialized()
-    
-    subareas = await db.scientific_areas.find(
-        {"level": "subarea", "parent_code": area_code, "is_active": True},
-        {"_id": 0, "code": 1, "name": 1, "name_en": 1}
-    ).sort("code", 1).to_list(500)
-    
-    return subareas
+    tree = await get_cnpq_tree()
+    node = tree.nodes.get(area_code)
+    if not node or node["type"] != "area":
+        return json_bytes_response(b"[]")
+    return json_bytes_response(tree.children_json.get(area_code, b"[]"))
 
 @api_router.get("/options/cnpq/lookup/{code}")
 async def get_cnpq_area_lookup(code: str):
     """Lookup CNPq area by full code (e.g., '1.01.02')"""
-    await ensure_areas_initialized()
-    
-    area = await db.scientific_areas.find_one(
-        {"code": code},
-        {"_id": 0}
-    )
+    tree = await get_cnpq_tree()
     
-    if not area:
+    body = tree.lookup_json.get(code)
+    if body is None:
         raise HTTPException(status_code=404, detail="Area code not found")
     
-    return {
-        "type": area["level"],
-        "code": area["code"],
-        "name": area["name"],
-        "name_en": area["name_en"],
-        "is_active": area.get("is_active", True)
-    }
+    return json_bytes_response(body)
+
+# Fixed option lists (also served together by /options/all)
+
+MANUSCRIPT_TYPES = [
+    {"id": "experimental", "name": "Experimental"},
+    {"id": "methodological", "name": "Methodological"},
+    {"id": "review", "name": "Review"},
+    {"id": "short_communication", "name": "Short Communication"}
+]
+
+DECISION_TYPES = [
+    {"id": "desk_reject", "name": "Desk Reject"},
+    {"id": "reject_after_review", "name": "Reject After Review"},
+    {"id": "major_revision", "name": "Major Revision"},
+    {"id": "minor_revision", "name": "Minor Revision"}
+]
+
+REVIEWER_COUNTS = [
+    {"id": "0", "name": "0 (No reviewers)"},
+    {"id": "1", "name": "1 reviewer"},
+    {"id": "2+", "name": "2 or more reviewers"}
+]
+
+TIME_RANGES = [
+    {"id": "0-30", "name": "0–30 days"},
+    {"id": "31-90", "name": "31–90 days"},
+    {"id": "90+", "name": "90+ days"}
+]
+
+APC_RANGES = [
+    {"id": "no_apc", "name": "No APC"},
+    {"id": "under_1000", "name": "< $1,000"},
+    {"id": "1000_3000", "name": "$1,000–$3,000"},
+    {"id": "over_3000", "name": "> $3,000"}
+]
+
+REVIEW_COMMENT_TYPES = [
+    {"id": "methodology", "name": "Methodology"},
+    {"id": "statistics", "name": "Statistics"},
+    {"id": "conceptual", "name": "Conceptual Discussion"},
+    {"id": "formatting_language", "name": "Formatting/Language Only"},
+    {"id": "generic_editorial", "name": "Generic/Editorial Only"}
+]
+
+EDITOR_COMMENT_TYPES = [
+    {"id": "yes_technical", "name": "Yes – Technical"},
+    {"id": "yes_generic", "name": "Yes – Generic"},
+    {"id": "no", "name": "No"}
+]
+
+COHERENCE_OPTIONS = [
+    {"id": "yes", "name": "Yes"},
+    {"id": "partially", "name": "Partially"},
+    {"id": "no", "name": "No"}
+]
+
+REVIEW_QUALITY_SCALE = [
+    {"id": 1, "value": 1, "label": "Very Low", "description": "Review provided minimal useful feedback"},
+    {"id": 2, "value": 2, "label": "Low", "description": "Review had significant gaps"},
+    {"id": 3, "value": 3, "label": "Average", "description": "Review met basic expectations"},
+    {"id": 4, "value": 4, "label": "High", "description": "Review was thorough and helpful"},
+    {"id": 5, "value": 5, "label": "Very High", "description": "Review was exceptional in quality"}
+]
+
+FEEDBACK_CLARITY_SCALE = [
+    {"id": 1, "value": 1, "label": "Very Unclear", "description": "Feedback was difficult to understand or act upon"},
+    {"id": 2, "value": 2, "label": "Unclear", "description": "Feedback lacked clarity in several areas"},
+    {"id": 3, "value": 3, "label": "Neutral", "description": "Feedback was understandable but not detailed"},
+    {"id": 4, "value": 4, "label": "Clear", "description": "Feedback was mostly clear and actionable"},
+    {"id": 5, "value": 5, "label": "Very Clear", "description": "Feedback was highly clear and actionable"}
+]
+
+DECISION_FAIRNESS_OPTIONS = [
+    {"id": "agree", "label": "Agree", "description": "The decision aligned with the review feedback"},
+    {"id": "neutral", "label": "Neutral", "description": "No strong opinion on the alignment"},
+    {"id": "disagree", "label": "Disagree", "description": "The decision did not align with the review feedback"}
+]
+
+WOULD_RECOMMEND_OPTIONS = [
+    {"id": "yes", "label": "Yes", "description": "Would recommend based on the editorial process"},
+    {"id": "neutral", "label": "Neutral", "description": "No strong recommendation either way"},
+    {"id": "no", "label": "No", "description": "Would not recommend based on the editorial process"}
+]
 
 @api_router.get("/options/manuscript-types")
 async def get_manuscript_types():
     """Get list of manuscript types"""
-    return [
-        {"id": "experimental", "name": "Experimental"},
-        {"id": "methodological", "name": "Methodological"},
-        {"id": "review", "name": "Review"},
-        {"id": "short_communication", "name": "Short Communication"}
-    ]
+    return MANUSCRIPT_TYPES
 
 @api_router.get("/options/decision-types")
 async def get_decision_types():
     """Get list of decision types"""
-    return [
-        {"id": "desk_reject", "name": "Desk Reject"},
-        {"id": "reject_after_review", "name": "Reject After Review"},
-        {"id": "major_revision", "name": "Major Revision"},
-        {"id": "minor_revision", "name": "Minor Revision"}
-    ]
+    return DECISION_TYPES
 
 @api_router.get("/options/reviewer-counts")
 async def get_reviewer_counts():
     """Get reviewer count options"""
-    return [
-        {"id": "0", "name": "0 (No reviewers)"},
-        {"id": "1", "name": "1 reviewer"},
-        {"id": "2+", "name": "2 or more reviewers"}
-    ]
+    return REVIEWER_COUNTS
 
 @api_router.get("/options/time-ranges")
 async def get_time_ranges():
     """Get time to decision ranges"""
-    return [
-        {"id": "0-30", "name": "0–30 days"},
-        {"id": "31-90", "name": "31–90 days"},
-        {"id": "90+", "name": "90+ days"}
-    ]
+    return TIME_RANGES
 
 @api_router.get("/options/apc-ranges")
 async def get_apc_ranges():
     """Get APC ranges"""
-    return [
-        {"id": "no_apc", "name": "No APC"},
-        {"id": "under_1000", "name": "< $1,000"},
-        {"id": "1000_3000", "name": "$1,000–$3,000"},
-        {"id": "over_3000", "name": "> $3,000"}
-    ]
+    return APC_RANGES
 
 @api_router.get("/options/review-comment-types")
 async def get_review_comment_types():
     """Get review comment types"""
-    return [
-        {"id": "methodology", "name": "Methodology"},
-        {"id": "statistics", "name": "Statistics"},
-        {"id": "conceptual", "name": "Conceptual Discussion"},
-        {"id": "formatting_language", "name": "Formatting/Language Only"},
-        {"id": "generic_editorial", "name": "Generic/Editorial Only"}
-    ]
+    return REVIEW_COMMENT_TYPES
 
 @api_router.get("/options/editor-comment-types")
 async def get_editor_comment_types():
     """Get editor comment types"""
-    return [
-        {"id": "yes_technical", "name": "Yes – Technical"},
-        {"id": "yes_generic", "name": "Yes – Generic"},
-        {"id": "no", "name": "No"}
-    ]
+    return EDITOR_COMMENT_TYPES
 
 @api_router.get("/options/coherence-options")
 async def get_coherence_options():
     """Get perceived coherence options"""
-    return [
-        {"id": "yes", "name": "Yes"},
-        {"id": "partially", "name": "Partially"},
-        {"id": "no", "name": "No"}
-    ]
+    return COHERENCE_OPTIONS
 
 # NEW: Quality assessment options (neutral language, captures positive/neutral/negative)
 
 @api_router.get("/options/review-quality-scale")
 async def get_review_quality_scale():
     """Get overall review quality scale (1-5)"""
-    return [
-        {"id": 1, "value": 1, "label": "Very Low", "description": "Review provided minimal useful feedback"},
-        {"id": 2, "value": 2, "label": "Low", "description": "Review had significant gaps"},
-        {"id": 3, "value": 3, "label": "Average", "description": "Review met basic expectations"},
-        {"id": 4, "value": 4, "label": "High", "description": "Review was thorough and helpful"},
-        {"id": 5, "value": 5, "label": "Very High", "description": "Review was exceptional in quality"}
-    ]
+    return REVIEW_QUALITY_SCALE
 
 @api_router.get("/options/feedback-clarity-scale")
 async def get_feedback_clarity_scale():
     """Get feedback clarity scale (1-5)"""
-    return [
-        {"id": 1, "value": 1, "label": "Very Unclear", "description": "Feedback was difficult to understand or act upon"},
-        {"id": 2, "value": 2, "label": "Unclear", "description": "Feedback lacked clarity in several areas"},
-        {"id": 3, "value": 3, "label": "Neutral", "description": "Feedback was understandable but not detailed"},
-        {"id": 4, "value": 4, "label": "Clear", "description": "Feedback was mostly clear and actionable"},
-        {"id": 5, "value": 5, "label": "Very Clear", "description": "Feedback was highly clear and actionable"}
-    ]
+    return FEEDBACK_CLARITY_SCALE
+
+@api_router.get("/options/decision-fairness")
+async def get_decision_fairness_options():
+    """Get decision fairness perception options"""
+    return DECISION_FAIRNESS_OPTIONS
+
+@api_router.get("/options/would-recommend")
+async def get_would_recommend_options():
+    """Get recommendation options based on editorial process"""
+    return WOULD_RECOMMEND_OPTIONS
+
+# --- Consolidated options bundle (one request on form load) ---
+
+# Safety net for multi-worker deployments, as for /journals/structure
+OPTIONS_BUNDLE_TTL_SECONDS = float(os.environ.get("OPTIONS_BUNDLE_TTL_SECONDS", "300"))
+# Long-lived caching for requests that name the current bundle version
+OPTIONS_BUNDLE_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+async def build_options_bundle() -> dict:
+    """Every submission-form option list, including Grande Áreas and every publisher"""
+    tree, publishers = await asyncio.gather(
+        get_cnpq_tree(),
+        db.publishers.find({}, {"_id": 0, "publisher_id": 1, "name": 1}).sort("name", 1).to_list(None)
+    )
+    return {
+        "grande_areas": [
+            {"code": code, "name": tree.nodes[code]["name"], "name_en": tree.nodes[code]["name_en"]}
+            for code in tree.children.get(None, ())
+        ],
+        "publishers": publishers,
+        "manuscript_types": MANUSCRIPT_TYPES,
+        "decision_types": DECISION_TYPES,
+        "reviewer_counts": REVIEWER_COUNTS,
+        "time_ranges": TIME_RANGES,
+        "apc_ranges": APC_RANGES,
+        "review_comment_types": REVIEW_COMMENT_TYPES,
+        "editor_comment_types": EDITOR_COMMENT_TYPES,
+        "coherence_options": COHERENCE_OPTIONS,
+        "review_quality_scale": REVIEW_QUALITY_SCALE,
+        "feedback_clarity_scale": FEEDBACK_CLARITY_SCALE,
+        "decision_fairness_options": DECISION_FAIRNESS_OPTIONS,
+        "would_recommend_options": WOULD_RECOMMEND_OPTIONS
+    }
+
+options_bundle_cache = SerializedPayloadCache(build_options_bundle, OPTIONS_BUNDLE_TTL_SECONDS)
+
+@api_router.get("/options/all")
+async def get_all_options(request: Request, v: Optional[str] = None):
+    """All form options in one payload (ETag/304).
+    
+    The ETag doubles as the bundle version: a request carrying the current
+    version as `v` may be cached indefinitely, any other is revalidated.
+    """
+    body, etag = await options_bundle_cache.get()
+    # `v` may be given with or without quotes/W/ (compressed responses carry a weak ETag)
+    current = v and v.removeprefix("W/").strip('"') == etag.strip('"')
+    cache_control = OPTIONS_BUNDLE_IMMUTABLE_CACHE if current else "no-cache"
+    return etag_response(request, body, etag, cache_control)
+
+# ============== BACKGROUND JOBS ==============
+
+# A running job renews its lease on every checkpoint; a stale lease can be taken over
+JOB_LEASE_SECONDS = 300
+
+# Keeps references to running job tasks so they are not garbage collected
+_background_tasks = set()
+
+async def claim_job(job_id: str, restart: bool = False) -> Optional[dict]:
+    """Claim a resumable job, or return None if another run holds its lease.
+    
+    A job resumes from its stored checkpoint unless `restart` is set or the
+    previous run completed.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        previous = await db.job_checkpoints.find_one_and_update(
+            {"job_id": job_id, "$or": [{"status": {"$ne": "running"}}, {"lease_until": {"$lt": now}}]},
+            {"$set": {
+                "status": "running",
+                "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "updated_at": now.isoformat(),
+                "error": None
+            }},
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        return None
+    
+    if restart or not previous or previous.get("status") == "completed":
+        return await db.job_checkpoints.find_one_and_update(
+            {"job_id": job_id},
+            {"$set": {"checkpoint": None, "progress": {}, "started_at": now.isoformat()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    return await db.job_checkpoints.find_one({"job_id": job_id}, {"_id": 0})
+
+async def save_job_checkpoint(job_id: str, checkpoint: Any, progress: dict):
+    """Persist job progress and renew its lease"""
+    now = datetime.now(timezone.utc)
+    await db.job_checkpoints.update_one(
+        {"job_id": job_id},
+        {"$set": {
+            "checkpoint": checkpoint,
+            "progress": progress,
+            "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+            "updated_at": now.isoformat()
+        }}
+    )
+
+async def get_job_status(job_id: str) -> dict:
+    """Current state of a resumable job (for admin progress endpoints)"""
+    job = await db.job_checkpoints.find_one({"job_id": job_id}, {"_id": 0, "lease_until": 0})
+    return job or {"job_id": job_id, "status": "never_run"}
+
+async def start_background_job(job_id: str, runner, restart: bool = False) -> dict:
+    """Claim `job_id` and run `runner(job)` in the background.
+    
+    Raises:
+        HTTPException 409 if the job is already running
+    """
+    job = await claim_job(job_id, restart=restart)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Job already running")
+    
+    task = asyncio.create_task(run_claimed_job(job, runner))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return job
+
+async def run_claimed_job(job: dict, runner):
+    """Run `runner(job)` for a claimed job and record how it finished"""
+    job_id = job["job_id"]
+    try:
+        await runner(job)
+        await db.job_checkpoints.update_one(
+            {"job_id": job_id},
+            {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc).isoformat()}}
+        )
+    except Exception as e:
+        logger.error(f"Background job {job_id} failed: {e}")
+        await db.job_checkpoints.update_one(
+            {"job_id": job_id},
+            {"$set": {"status": "failed", "error": str(e)}}
+        )
+
+# --- Evidence retention ---
+
+RETENTION_JOB_ID = "evidence_retention_sweep"
+RETENTION_SWEEP_INTERVAL_SECONDS = float(os.environ.get("RETENTION_SWEEP_INTERVAL_SECONDS", "3600"))
+RETENTION_SWEEP_BATCH_SIZE = int(os.environ.get("RETENTION_SWEEP_BATCH_SIZE", "200"))
+
+async def release_evidence_blob(evidence: dict) -> int:
+    """Drop the reference an evidence file holds on its blob and reclaim the blob once none are left.
+    
+    The file ID is recorded on the blob by the same write, so releasing a
+    reference again (a rerun after a crash) changes nothing; matching the
+    storage_key keeps a newer generation of the same content untouched. The
+    blob document is deleted (only if still unreferenced) before its file,
+    so an upload that re-references the content in between keeps it.
+    
+    Returns:
+        int: bytes freed on disk
+    """
+    content_hash = evidence["content_hash"]
+    await db.evidence_blobs.update_one(
+        {"content_hash": content_hash, "storage_key": evidence.get("storage_key"),
+         "released_file_ids": {"$ne": evidence["file_id"]}},
+        {"$inc": {"ref_count": -1}, "$push": {"released_file_ids": evidence["file_id"]}}
+    )
+    blob = await db.evidence_blobs.find_one_and_delete(
+        {"content_hash": content_hash, "ref_count": {"$lte": 0}},
+        projection={"_id": 0}
+    )
+    if not blob:
+        return 0
+    freed = await delete_evidence_object(blob)
+    if blob.get("preview", {}).get("storage_key"):
+        freed += await delete_evidence_object(blob["preview"])
+    return freed
+
+async def forget_released_references(evidence: List[dict]):
+    """Clear release markers once the evidence documents that held them are deleted"""
+    hashes = list({doc["content_hash"] for doc in evidence if doc.get("content_hash")})
+    if hashes:
+        await db.evidence_blobs.update_many(
+            {"content_hash": {"$in": hashes}},
+            {"$pull": {"released_file_ids": {"$in": [doc["file_id"] for doc in evidence]}}}
+        )
+
+# Fields delete_evidence_files needs from each evidence document
+EVIDENCE_DELETE_PROJECTION = {"_id": 0, "file_id": 1, "content_hash": 1, **{field: 1 for field in EVIDENCE_LOCATION_FIELDS}}
+
+async def delete_evidence_files(evidence: List[dict], report: dict):
+    """Delete evidence documents and release what they hold.
+    
+    Every step can be repeated safely, so a caller that dies midway is
+    finished by a rerun over the same documents without releasing a blob
+    reference twice:
+    1. Mark them deleting_at in one update_many (readers stop serving them)
+    2. Unlink the submissions that still reference them
+    3. Release blob references (at most once per file, see release_evidence_blob)
+    4. Delete the metadata last
+    Counts are added to `report`.
+    """
+    file_ids = [doc["file_id"] for doc in evidence]
+    await db.evidence_files.update_many(
+        {"file_id": {"$in": file_ids}, "deleting_at": {"$exists": False}},
+        {"$set": {"deleting_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    
+    result = await db.submissions.update_many(
+        {"evidence_file_id": {"$in": file_ids}},
+        {"$unset": {"evidence_file_id": ""}}
+    )
+    report["submissions_unlinked"] += result.modified_count
+    
+    for doc in evidence:
+        if doc.get("content_hash"):
+            freed = await release_evidence_blob(doc)
+            if freed:
+                report["blobs_deleted"] += 1
+        elif doc.get("encrypted_path"):
+            # Legacy evidence owns its file outright
+            freed = await delete_evidence_object(doc)
+        else:
+            continue
+        report["bytes_reclaimed"] += freed
+    
+    result = await db.evidence_files.delete_many({"file_id": {"$in": file_ids}})
+    await forget_released_references(evidence)
+    report["files_deleted"] += result.deleted_count
+
+async def run_retention_sweep(job: dict):
+    """Delete evidence past its retention_until, in bounded batches.
+    
+    A sweep that dies midway is finished by the next one, which finds the
+    same documents still expired (see delete_evidence_files). Those marks,
+    not the job checkpoint, carry an interrupted batch over; progress and
+    bytes reclaimed are stored on the job after every batch.
+    """
+    cutoff = datetime.now(timezone.utc).isoformat()
+    report = {"files_deleted": 0, "blobs_deleted": 0, "bytes_reclaimed": 0, "submissions_unlinked": 0, "batches": 0}
+    
+    while True:
+        expired = await db.evidence_files.find(
+            {"retention_until": {"$lte": cutoff}},
+            EVIDENCE_DELETE_PROJECTION
+        ).sort("retention_until", 1).limit(RETENTION_SWEEP_BATCH_SIZE).to_list(RETENTION_SWEEP_BATCH_SIZE)
+        if not expired:
+            break
+        
+        await delete_evidence_files(expired, report)
+        report["batches"] += 1
+        await save_job_checkpoint(RETENTION_JOB_ID, None, report)
+    
+    await save_job_checkpoint(RETENTION_JOB_ID, None, report)
+    logger.info(
+        f"Retention sweep: {report['files_deleted']} evidence files, "
+        f"{report['blobs_deleted']} blobs, {report['bytes_reclaimed']} bytes reclaimed"
+    )
+
+async def retention_sweep_loop():
+    """Run the retention sweep periodically (skipped while another host holds the lease)"""
+    while True:
+        await asyncio.sleep(RETENTION_SWEEP_INTERVAL_SECONDS)
+        try:
+            job = await claim_job(RETENTION_JOB_ID, restart=True)
+            if job is not None:
+                await run_claimed_job(job, run_retention_sweep)
+        except Exception as e:
+            logger.error(f"Retention sweeper error: {e}")
+
+# --- Evidence key rotation ---
+
+REWRAP_JOB_ID = "evidence_key_rewrap"
+REWRAP_BATCH_SIZE = int(os.environ.get("REWRAP_BATCH_SIZE", "50"))
+REWRAP_CONCURRENCY = int(os.environ.get("REWRAP_CONCURRENCY", "4"))
+# Upper bound on re-encrypted plaintext per second (0 = unthrottled)
+REWRAP_MAX_BYTES_PER_SECOND = int(os.environ.get("REWRAP_MAX_BYTES_PER_SECOND", "0"))
 
-@api_router.get("/options/decision-fairness")
-async def get_decision_fairness_options():
-    """Get decision fairness perception options"""
-    return [
-        {"id": "agree", "label": "Agree", "description": "The decision aligned with the review feedback"},
-        {"id": "neutral", "label": "Neutral", "description": "No strong opinion on the alignment"},
-        {"id": "disagree", "label": "Disagree", "description": "The decision did not align with the review feedback"}
-    ]
+def not_under_primary_key() -> dict:
+    return {"key_id": {"$ne": evidence_keyring.primary.key_id.hex()}}
 
-@api_router.get("/options/would-recommend")
-async def get_would_recommend_options():
-    """Get recommendation options based on editorial process"""
-    return [
-        {"id": "yes", "label": "Yes", "description": "Would recommend based on the editorial process"},
-        {"id": "neutral", "label": "Neutral", "description": "No strong recommendation either way"},
-        {"id": "no", "label": "No", "description": "Would not recommend based on the editorial process"}
-    ]
+def evidence_file_location_update(target: dict) -> dict:
+    """Update pointing evidence_files at the object described by `target`"""
+    present = {field: target[field] for field in EVIDENCE_LOCATION_FIELDS if field in target}
+    update = {"$set": {**present, "encryption": target["encryption"]}}
+    missing = {field: "" for field in EVIDENCE_LOCATION_FIELDS if field not in target}
+    if missing:
+        update["$unset"] = missing
+    return update
+
+async def rewrap_to_primary(doc: dict, storage_key: str, digest=None) -> tuple:
+    """Re-encrypt the object behind `doc` into a new object under the primary key.
+    
+    Returns:
+        tuple: (new location fields, plaintext bytes), or (None, 0) if the
+        object is already stream-v1 under the primary key
+    """
+    source = await open_evidence_source(doc)
+    if source.info and source.info.key_id == evidence_keyring.primary.key_id:
+        return None, 0
+    storage = get_evidence_storage()
+    size = await encrypt_stream(source.iter_all(), storage, storage_key, digest=digest)
+    location = {
+        "storage_backend": storage.name,
+        "storage_key": storage_key,
+        "key_id": evidence_keyring.primary.key_id.hex(),
+        "encryption": EVIDENCE_FORMAT_STREAM
+    }
+    return location, size
+
+async def rewrap_blob(blob: dict) -> tuple:
+    """Move one blob (and the evidence_files sharing it) to the primary key.
+    
+    Content hashes are keyed by the primary key too, so the blob is
+    re-addressed; if the same content was meanwhile uploaded under the new
+    key, the two blobs are merged. Previews are dropped and re-rendered on
+    demand under the new key.
+    
+    Evidence files are re-pointed before the old blob document and object
+    are deleted. A merge only joins a blob that still holds references (one
+    at zero may be mid-reclaim) and settles its count on the files actually
+    moved, so a concurrent release or sweep can leave a reference too many
+    but never one too few.
+    """
+    primary_key_id = evidence_keyring.primary.key_id.hex()
+    match = {"content_hash": blob["content_hash"], "storage_key": blob["storage_key"]}
+    digest = hmac.new(evidence_keyring.primary.hash_key, digestmod=hashlib.sha256)
+    location, size = await rewrap_to_primary(blob, f"blob_{uuid.uuid4().hex}", digest)
+    if location is None:
+        # Written under the primary before key ids were recorded
+        await db.evidence_blobs.update_one(match, {"$set": {"key_id": primary_key_id}})
+        await db.evidence_files.update_many({"content_hash": blob["content_hash"]}, {"$set": {"key_id": primary_key_id}})
+        return "current", 0
+    
+    new_hash = digest.hexdigest()
+    storage = get_evidence_storage()
+    try:
+        result = await db.evidence_blobs.update_one(
+            match,
+            {"$set": {**location, "content_hash": new_hash}, "$unset": {"encrypted_path": "", "preview": ""}}
+        )
+        if not result.matched_count:
+            # Reclaimed or rewrapped concurrently
+            await storage.delete(location["storage_key"])
+            return "skipped", 0
+        target, references = {**location, "content_hash": new_hash}, None
+    except DuplicateKeyError:
+        # Same content already stored under the primary key: merge into it
+        await storage.delete(location["storage_key"])
+        references = blob.get("ref_count", 0)
+        target = await db.evidence_blobs.find_one_and_update(
+            {"content_hash": new_hash, "ref_count": {"$gt": 0}},
+            {"$inc": {"ref_count": references}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if target is None:
+            # Being reclaimed right now; a later run re-addresses this blob instead
+            return "skipped", 0
+    
+    update = evidence_file_location_update(target)
+    update["$set"]["content_hash"] = new_hash
+    # Files being swept keep the old location (their reference is released against the old blob)
+    result = await db.evidence_files.update_many(
+        {**match, "deleting_at": {"$exists": False}},
+        update
+    )
+    
+    if references is not None:
+        if result.modified_count != references:
+            await db.evidence_blobs.update_one(
+                {"content_hash": new_hash, "storage_key": target["storage_key"]},
+                {"$inc": {"ref_count": result.modified_count - references}}
+            )
+        await db.evidence_blobs.delete_one(match)
+    
+    await delete_evidence_object(blob)
+    if blob.get("preview", {}).get("storage_key"):
+        await delete_evidence_object(blob["preview"])
+    return "rewrapped", size
+
+async def rewrap_legacy_evidence(evidence: dict) -> tuple:
+    """Move one pre-deduplication evidence file (Fernet or stream-v1) to the primary key"""
+    primary_key_id = evidence_keyring.primary.key_id.hex()
+    match = {
+        "file_id": evidence["file_id"],
+        "storage_key": evidence.get("storage_key"),
+        "encrypted_path": evidence.get("encrypted_path")
+    }
+    location, size = await rewrap_to_primary(evidence, f"{evidence['file_id']}_{uuid.uuid4().hex[:8]}")
+    if location is None:
+        await db.evidence_files.update_one(match, {"$set": {"key_id": primary_key_id}})
+        return "current", 0
+    
+    result = await db.evidence_files.update_one(match, evidence_file_location_update(location))
+    if not result.matched_count:
+        await delete_evidence_object(location)
+        return "skipped", 0
+    await delete_evidence_object(evidence)
+    return "rewrapped", size
+
+REWRAP_PHASES = [
+    ("blobs", "evidence_blobs", lambda: not_under_primary_key(), rewrap_blob),
+    ("legacy_files", "evidence_files", lambda: {"content_hash": {"$exists": False}, **not_under_primary_key()}, rewrap_legacy_evidence),
+]
+
+async def run_evidence_rewrap(job: dict):
+    """Re-encrypt all evidence not yet under the primary key.
+    
+    Documents are processed in _id order, REWRAP_BATCH_SIZE at a time with up
+    to REWRAP_CONCURRENCY in parallel, checkpointing after every batch so an
+    interrupted rotation resumes where it stopped. Throughput is capped at
+    REWRAP_MAX_BYTES_PER_SECOND to leave I/O for regular traffic. Failures are
+    logged and counted; a later run retries them.
+    """
+    checkpoint = job.get("checkpoint") or {"phase": REWRAP_PHASES[0][0], "last_id": None}
+    progress = {"rewrapped": 0, "already_current": 0, "skipped": 0, "failed": 0, "bytes_rewrapped": 0, **(job.get("progress") or {})}
+    progress["primary_key_id"] = evidence_keyring.primary.key_id.hex()
+    semaphore = asyncio.Semaphore(REWRAP_CONCURRENCY)
+    phase_names = [phase[0] for phase in REWRAP_PHASES]
+    
+    async def process(rewrap, doc):
+        async with semaphore:
+            try:
+                return await rewrap(doc)
+            except Exception as e:
+                logger.error(f"Rewrap failed for {doc.get('file_id') or doc.get('storage_key')}: {e}")
+                return "failed", 0
+    
+    for name, collection_name, query, rewrap in REWRAP_PHASES[phase_names.index(checkpoint["phase"]):]:
+        last_id = checkpoint["last_id"] if name == checkpoint["phase"] else None
+        while True:
+            batch_query = query()
+            if last_id:
+                batch_query["_id"] = {"$gt": ObjectId(last_id)}
+            batch = await db[collection_name].find(batch_query).sort("_id", 1).limit(REWRAP_BATCH_SIZE).to_list(REWRAP_BATCH_SIZE)
+            if not batch:
+                break
+            
+            started = time.monotonic()
+            results = await asyncio.gather(*(process(rewrap, doc) for doc in batch))
+            batch_bytes = 0
+            for status, size in results:
+                progress["already_current" if status == "current" else status] += 1
+                batch_bytes += size
+            progress["bytes_rewrapped"] += batch_bytes
+            
+            last_id = str(batch[-1]["_id"])
+            await save_job_checkpoint(REWRAP_JOB_ID, {"phase": name, "last_id": last_id}, progress)
+            
+            if REWRAP_MAX_BYTES_PER_SECOND:
+                pause = batch_bytes / REWRAP_MAX_BYTES_PER_SECOND - (time.monotonic() - started)
+                if pause > 0:
+                    await asyncio.sleep(pause)
+    
+    logger.info(f"Evidence rewrap finished: {progress}")
 
 # ============== ADMIN ENDPOINTS ==============
 
@@ -2106,6 +4968,7 @@ async def update_admin_settings(update: PlatformSettingsUpdate, request: Request
             {"$set": update_data},
             upsert=True
         )
+        await SETTINGS_VERSION.bump()
     
     settings = await get_platform_settings()
     logger.info(f"Platform settings updated: {update_data}")
@@ -2127,6 +4990,7 @@ async def set_visibility_override(override: VisibilityOverride, request: Request
         {"$set": {f"visibility_overrides.{entity_key}.{override.entity_id}": override.force_visible}},
         upsert=True
     )
+    await SETTINGS_VERSION.bump()
     
     logger.info(f"Visibility override set: {override.entity_type}/{override.entity_id} = {override.force_visible}")
     return {"message": "Override set successfully", "entity_type": override.entity_type, "entity_id": override.entity_id, "force_visible": override.force_visible}
@@ -2145,9 +5009,64 @@ async def remove_visibility_override(entity_type: str, entity_id: str, request:
         {"settings_id": "global"},
         {"$unset": {f"visibility_overrides.{entity_key}.{entity_id}": ""}}
     )
+    await SETTINGS_VERSION.bump()
     
     return {"message": "Override removed successfully"}
 
+# --- Admin Counts ---
+
+# Upper bound on staleness for writes that don't bump ANALYTICS_VERSION (e.g. seed scripts)
+ADMIN_COUNTS_TTL_SECONDS = float(os.environ.get("ADMIN_COUNTS_TTL_SECONDS", "30"))
+
+_submission_counts = {"version": -1, "built_at": 0.0, "counts": None}
+
+async def count_submissions_by_status() -> Dict[str, int]:
+    """Total, per-status and sample/real submission counts in one $facet pass"""
+    result = await db.submissions.aggregate([
+        {"$facet": {
+            "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "sample": [{"$match": {"is_sample": True}}, {"$count": "count"}]
+        }}
+    ]).to_list(1)
+    facets = result[0] if result else {"status": [], "sample": []}
+    
+    by_status = {row["_id"]: row["count"] for row in facets["status"]}
+    total = sum(by_status.values())
+    sample = facets["sample"][0]["count"] if facets["sample"] else 0
+    return {
+        "total": total,
+        "pending": by_status.get("pending", 0),
+        "validated": by_status.get("validated", 0),
+        "flagged": by_status.get("flagged", 0),
+        "sample": sample,
+        "real": total - sample
+    }
+
+async def get_submission_counts() -> Dict[str, int]:
+    """Submission counts, recomputed only after a submission write (ANALYTICS_VERSION) or the TTL"""
+    cached = _submission_counts
+    if (cached["counts"] is not None and cached["version"] == ANALYTICS_VERSION.value
+            and time.monotonic() - cached["built_at"] < ADMIN_COUNTS_TTL_SECONDS):
+        return cached["counts"]
+    
+    # Read the version first: a write landing mid-count bumps it and forces a recount next time
+    version = ANALYTICS_VERSION.value
+    counts = await count_submissions_by_status()
+    _submission_counts.update(version=version, built_at=time.monotonic(), counts=counts)
+    return counts
+
+async def get_user_counts() -> Dict[str, int]:
+    """Total and sample/real user counts.
+    
+    The total comes from the collection metadata (estimatedDocumentCount);
+    only the few sample users are actually counted.
+    """
+    total, sample = await asyncio.gather(
+        db.users.estimated_document_count(),
+        db.users.count_documents({"is_sample": True})
+    )
+    return {"total": total, "sample": sample, "real": max(total - sample, 0)}
+
 # --- Data Management ---
 
 @api_router.get("/admin/data/stats")
@@ -2155,25 +5074,15 @@ async def get_data_stats(request: Request):
     """Get sample vs real data statistics"""
     await require_admin(request)
     
-    total_submissions = await db.submissions.count_documents({})
-    sample_submissions = await db.submissions.count_documents({"is_sample": True})
-    real_submissions = await db.submissions.count_documents({"is_sample": {"$ne": True}})
-    
-    total_users = await db.users.count_documents({})
-    sample_users = await db.users.count_documents({"is_sample": True})
-    real_users = await db.users.count_documents({"is_sample": {"$ne": True}})
+    submissions, users = await asyncio.gather(get_submission_counts(), get_user_counts())
     
     return {
         "submissions": {
-            "total": total_submissions,
-            "sample": sample_submissions,
-            "real": real_submissions
+            "total": submissions["total"],
+            "sample": submissions["sample"],
+            "real": submissions["real"]
         },
-        "users": {
-            "total": total_users,
-            "sample": sample_users,
-            "real": real_users
-        }
+        "users": users
     }
 
 @api_router.post("/admin/data/purge-sample")
@@ -2183,6 +5092,7 @@ async def purge_sample_data(request: Request):
     
     # Delete sample submissions
     submissions_result = await db.submissions.delete_many({"is_sample": True})
+    await ANALYTICS_VERSION.bump()
     
     # Delete sample users (if any)
     users_result = await db.users.delete_many({"is_sample": True})
@@ -2253,8 +5163,10 @@ async def get_admin_diagnostics(request: Request):
     ]
     
     journal_statuses = []
-    async for doc in db.submissions.aggregate(journal_status_pipeline):
-        journal = await db.journals.find_one({"journal_id": doc["_id"]}, {"_id": 0, "name": 1})
+    journal_docs = await db.submissions.aggregate(journal_status_pipeline).to_list(None)
+    journals = await catalog_index.get_journals(doc["_id"] for doc in journal_docs)
+    for doc in journal_docs:
+        journal = journals.get(doc["_id"])
         journal_name = journal["name"] if journal else "Unknown"
         
         meets_subs = doc["submission_count"] >= min_subs
@@ -2397,6 +5309,7 @@ async def create_area(area: AreaCreate, request: Request):
     
     await db.scientific_areas.insert_one(area_doc)
     del area_doc["_id"]
+    await cnpq_areas_changed()
     
     return area_doc
 
@@ -2420,6 +5333,7 @@ async def update_area(code: str, update: AreaUpdate, request: Request):
     if update_data:
         update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
         await db.scientific_areas.update_one({"code": code}, {"$set": update_data})
+        await cnpq_areas_changed()
     
     updated = await db.scientific_areas.find_one({"code": code}, {"_id": 0})
     return updated
@@ -2449,10 +5363,12 @@ async def delete_area(code: str, request: Request):
             {"code": code},
             {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc).isoformat()}}
         )
+        await cnpq_areas_changed()
         return {"message": f"Area disabled (has {submission_count} submissions)", "soft_delete": True}
     else:
         # Hard delete if no submissions
         await db.scientific_areas.delete_one({"code": code})
+        await cnpq_areas_changed()
         return {"message": "Area deleted", "soft_delete": False}
 
 # --- Original Admin Stats ---
@@ -2462,63 +5378,86 @@ async def get_admin_stats(request: Request):
     """Get admin dashboard statistics"""
     await require_admin(request)
     
-    total_users = await db.users.count_documents({})
-    total_submissions = await db.submissions.count_documents({})
-    pending_submissions = await db.submissions.count_documents({"status": "pending"})
-    validated_submissions = await db.submissions.count_documents({"status": "validated"})
-    flagged_submissions = await db.submissions.count_documents({"status": "flagged"})
-    
-    # Add sample vs real breakdown
-    sample_submissions = await db.submissions.count_documents({"is_sample": True})
-    real_submissions = await db.submissions.count_documents({"is_sample": {"$ne": True}})
+    submissions, users = await asyncio.gather(get_submission_counts(), get_user_counts())
     
     return {
-        "total_users": total_users,
-        "total_submissions": total_submissions,
-        "pending_submissions": pending_submissions,
-        "validated_submissions": validated_submissions,
-        "flagged_submissions": flagged_submissions,
-        "sample_submissions": sample_submissions,
-        "real_submissions": real_submissions
+        "total_users": users["total"],
+        "total_submissions": submissions["total"],
+        "pending_submissions": submissions["pending"],
+        "validated_submissions": submissions["validated"],
+        "flagged_submissions": submissions["flagged"],
+        # Sample vs real breakdown
+        "sample_submissions": submissions["sample"],
+        "real_submissions": submissions["real"]
     }
 
+MAX_ADMIN_PAGE_SIZE = 200
+
+async def count_admin_submissions(status: Optional[str]) -> int:
+    """Total for the admin submission list, taken from the cached status counts when possible"""
+    counts = await get_submission_counts()
+    if not status:
+        return counts["total"]
+    if status in ("pending", "validated", "flagged"):
+        return counts[status]
+    return await db.submissions.count_documents({"status": status})
+
 @api_router.get("/admin/submissions")
 async def get_all_submissions(
     request: Request,
     status: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None
 ):
-    """Get all submissions for admin review"""
+    """Get all submissions for admin review, newest first.
+    
+    Pages are ordered by (created_at, submission_id) descending and served
+    from the matching compound indexes. Pass the returned `next_cursor` to
+    continue after the last row without skipping; `skip` still works for
+    jumping to an arbitrary page.
+    """
     await require_admin(request)
+    limit = max(1, min(limit, MAX_ADMIN_PAGE_SIZE))
     
-    query = {}
+    conditions = []
     if status:
-        query["status"] = status
-    
-    submissions = await db.submissions.find(
-        query,
-        {"_id": 0}
-    ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    
-    # Enrich with journal/publisher names
+        conditions.append({"status": status})
+    if cursor:
+        created_at, last_id = decode_page_cursor(cursor, 2)
+        conditions.append({"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "submission_id": {"$lt": last_id}}
+        ]})
+        skip = 0
+    query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+    
+    submissions, total = await asyncio.gather(
+        db.submissions.find(query, {"_id": 0})
+            .sort([("created_at", -1), ("submission_id", -1)])
+            .skip(skip).limit(limit + 1).to_list(limit + 1),
+        count_admin_submissions(status)
+    )
+    next_cursor = None
+    if len(submissions) > limit:
+        submissions = submissions[:limit]
+        last = submissions[-1]
+        next_cursor = encode_page_cursor(last.get("created_at"), last["submission_id"])
+    
+    # Enrich with journal/publisher names (one batched catalog lookup per page)
+    await add_catalog_names(submissions)
     for sub in submissions:
-        journal = await db.journals.find_one({"journal_id": sub["journal_id"]}, {"_id": 0, "name": 1})
-        publisher = await db.publishers.find_one({"publisher_id": sub["publisher_id"]}, {"_id": 0, "name": 1})
-        sub["journal_name"] = journal["name"] if journal else "Unknown"
-        sub["publisher_name"] = publisher["name"] if publisher else "Unknown"
-        
         # Check if has evidence
         sub["has_evidence"] = sub.get("evidence_file_id") is not None
     
-    total = await db.submissions.count_documents(query)
-    
-    return {
+    # Raw Mongo documents: rendered directly by orjson, skipping jsonable_encoder
+    return FastJSONResponse({
         "submissions": submissions,
         "total": total,
         "skip": skip,
-        "limit": limit
-    }
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
 
 @api_router.get("/admin/submissions/{submission_id}")
 async def get_submission_detail(submission_id: str, request: Request):
@@ -2534,16 +5473,18 @@ async def get_submission_detail(submission_id: str, request: Request):
         raise HTTPException(status_code=404, detail="Submission not found")
     
     # Enrich with journal/publisher info
-    journal = await db.journals.find_one({"journal_id": submission["journal_id"]}, {"_id": 0})
-    publisher = await db.publishers.find_one({"publisher_id": submission["publisher_id"]}, {"_id": 0})
-    submission["journal"] = journal
-    submission["publisher"] = publisher
+    journals, publishers = await asyncio.gather(
+        catalog_index.get_journals([submission["journal_id"]]),
+        catalog_index.get_publishers([submission["publisher_id"]])
+    )
+    submission["journal"] = journals.get(submission["journal_id"])
+    submission["publisher"] = publishers.get(submission["publisher_id"])
     
     # Get evidence file info if exists
     if submission.get("evidence_file_id"):
         evidence = await db.evidence_files.find_one(
-            {"file_id": submission["evidence_file_id"]},
-            {"_id": 0, "encrypted_path": 0}  # Don't expose encrypted path
+            {"file_id": submission["evidence_file_id"], "deleting_at": {"$exists": False}},
+            {"_id": 0, "encrypted_path": 0, "storage_key": 0}  # Don't expose storage location
         )
         submission["evidence"] = evidence
     
@@ -2580,15 +5521,18 @@ async def moderate_submission(
     old_status = submission["status"]
     has_evidence = submission.get("evidence_file_id") is not None
     
-    # Update submission status
-    await db.submissions.update_one(
-        {"submission_id": submission_id},
+    # Update submission status (only from the status the effects below are computed from)
+    result = await db.submissions.update_one(
+        {"submission_id": submission_id, "status": old_status},
         {"$set": {
             "status": moderation.status,
             "moderated_at": datetime.now(timezone.utc).isoformat(),
             "moderated_by": admin.user_id
         }}
     )
+    if not result.matched_count:
+        raise HTTPException(status_code=409, detail="Submission was moderated concurrently, reload and retry")
+    await ANALYTICS_VERSION.bump()
     
     # Log moderation action
     log_entry = {
@@ -2603,148 +5547,412 @@ async def moderate_submission(
     }
     await db.moderation_logs.insert_one(log_entry)
     
-    # Update user trust score and counts based on moderation
-    # Trust Score Rules: +20 per validated, +10 per validated with evidence, -15 per flagged
-    user_update = {}
+    # Trust score, counters and promotion checks are secondary writes: they are
+    # recorded in the side-effect outbox and applied by its worker
+    user_increments, catalog_delta = moderation_effects(old_status, moderation.status, has_evidence)
+    await side_effects.record(moderation_effect_ops(submission, user_increments, catalog_delta))
     
-    if moderation.status == "validated" and old_status != "validated":
-        # Validated: +20 points, +10 if has evidence
-        score_increase = 20 + (10 if has_evidence else 0)
-        user_update["$inc"] = {
-            "validated_count": 1,
-            "trust_score": score_increase
-        }
-        if has_evidence:
-            user_update["$inc"]["validated_with_evidence_count"] = 1
-        
-        # Update journal/publisher validated count for promotion tracking
-        await db.journals.update_one(
-            {"journal_id": submission["journal_id"]},
-            {"$inc": {"validated_submission_count": 1}}
-        )
-        await db.publishers.update_one(
-            {"publisher_id": submission["publisher_id"]},
-            {"$inc": {"validated_submission_count": 1}}
-        )
+    return {"message": "Submission moderated successfully", "status": moderation.status}
+
+# Upper bound on submissions moderated by a single bulk request
+MAX_BULK_MODERATION = 1000
+
+@api_router.post("/admin/submissions/moderate-bulk")
+async def moderate_submissions_bulk(moderation: BulkSubmissionModeration, request: Request):
+    """Moderate many submissions at once (same rules as the single endpoint).
+    
+    Fetches all submissions with one $in query, moves them with one guarded
+    update per old status and records the counter ops in the side-effect outbox.
+    """
+    admin = await require_admin(request)
+    
+    if moderation.status not in ["pending", "validated", "flagged"]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    submission_ids = list(dict.fromkeys(moderation.submission_ids))
+    if not submission_ids:
+        raise HTTPException(status_code=400, detail="No submissions given")
+    if len(submission_ids) > MAX_BULK_MODERATION:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_MODERATION} submissions per request")
+    
+    submissions = await db.submissions.find(
+        {"submission_id": {"$in": submission_ids}},
+        {"_id": 0, "submission_id": 1, "status": 1, "user_hashed_id": 1,
+         "journal_id": 1, "publisher_id": 1, "evidence_file_id": 1}
+    ).to_list(len(submission_ids))
+    
+    found_ids = {sub["submission_id"] for sub in submissions}
+    not_found = [sid for sid in submission_ids if sid not in found_ids]
+    to_update = [sub for sub in submissions if sub["status"] != moderation.status]
+    
+    applied = []
+    if to_update:
+        now = datetime.now(timezone.utc).isoformat()
         
-        # Check if user-added journal should be promoted to verified
-        await check_and_promote_journal(submission["journal_id"])
-        await check_and_promote_publisher(submission["publisher_id"])
+        # 1. One write per old status, guarded on it: a submission moderated
+        # concurrently since it was read is left alone, and its effects skipped
+        by_old_status = defaultdict(list)
+        for sub in to_update:
+            by_old_status[sub["status"]].append(sub)
+        for old_status, group in by_old_status.items():
+            ids = [sub["submission_id"] for sub in group]
+            result = await db.submissions.update_many(
+                {"submission_id": {"$in": ids}, "status": old_status},
+                {"$set": {
+                    "status": moderation.status,
+                    "moderated_at": now,
+                    "moderated_by": admin.user_id
+                }}
+            )
+            if result.modified_count == len(ids):
+                applied += group
+            elif result.modified_count:
+                # Find out which ones this write moved (moderated_at is unique to this request)
+                moved = {
+                    doc["submission_id"] async for doc in db.submissions.find(
+                        {"submission_id": {"$in": ids}, "moderated_at": now, "moderated_by": admin.user_id},
+                        {"_id": 0, "submission_id": 1}
+                    )
+                }
+                applied += [sub for sub in group if sub["submission_id"] in moved]
+    
+    if applied:
+        await ANALYTICS_VERSION.bump()
         
-    elif moderation.status == "flagged" and old_status != "flagged":
-        # Flagged: -15 points
-        user_update["$inc"] = {
-            "flagged_count": 1,
-            "trust_score": -15
-        }
-    elif old_status == "validated" and moderation.status != "validated":
-        # Reverting from validated: remove the points
-        score_decrease = 20 + (10 if has_evidence else 0)
-        user_update["$inc"] = {
-            "validated_count": -1,
-            "trust_score": -score_decrease
-        }
-        if has_evidence:
-            user_update["$inc"]["validated_with_evidence_count"] = -1
+        # 2. Moderation log entries in one insert_many
+        await db.moderation_logs.insert_many([{
+            "log_id": f"log_{uuid.uuid4().hex[:12]}",
+            "submission_id": sub["submission_id"],
+            "admin_user_id": admin.user_id,
+            "admin_name": admin.name,
+            "old_status": sub["status"],
+            "new_status": moderation.status,
+            "notes": moderation.admin_notes,
+            "bulk": True,
+            "created_at": now
+        } for sub in applied], ordered=False)
         
-        # Decrease journal/publisher count
-        await db.journals.update_one(
-            {"journal_id": submission["journal_id"]},
-            {"$inc": {"validated_submission_count": -1}}
-        )
-        await db.publishers.update_one(
-            {"publisher_id": submission["publisher_id"]},
-            {"$inc": {"validated_submission_count": -1}}
-        )
-    elif old_status == "flagged" and moderation.status != "flagged":
-        # Reverting from flagged: restore points
-        user_update["$inc"] = {
-            "flagged_count": -1,
-            "trust_score": 15
-        }
+        # 3. Counter ops of the transitions that were actually written, recorded in the
+        # side-effect outbox with one insert_many. User ops stay one per transition
+        # (trust_score is clamped after each); journal/publisher counts are summed.
+        ops = []
+        journal_deltas, publisher_deltas = defaultdict(int), defaultdict(int)
+        for sub in applied:
+            has_evidence = sub.get("evidence_file_id") is not None
+            user_increments, catalog_delta = moderation_effects(sub["status"], moderation.status, has_evidence)
+            ops.append(counter_op("users", "hashed_id", sub["user_hashed_id"], **user_increments))
+            journal_deltas[sub["journal_id"]] += catalog_delta
+            publisher_deltas[sub["publisher_id"]] += catalog_delta
+        ops += [counter_op("journals", "journal_id", journal_id, validated_submission_count=delta)
+                for journal_id, delta in journal_deltas.items()]
+        ops += [counter_op("publishers", "publisher_id", publisher_id, validated_submission_count=delta)
+                for publisher_id, delta in publisher_deltas.items()]
+        await side_effects.record(ops)
+    
+    logger.info(f"Bulk moderation by {admin.user_id}: {len(applied)} submissions set to {moderation.status}")
     
-    if user_update:
-        await db.users.update_one(
-            {"hashed_id": submission["user_hashed_id"]},
-            user_update
-        )
-        # Ensure trust score stays within 0-100
-        await db.users.update_one(
-            {"hashed_id": submission["user_hashed_id"], "trust_score": {"$lt": 0}},
-            {"$set": {"trust_score": 0}}
-        )
-        await db.users.update_one(
-            {"hashed_id": submission["user_hashed_id"], "trust_score": {"$gt": 100}},
-            {"$set": {"trust_score": 100}}
-        )
-    
-    return {"message": "Submission moderated successfully", "status": moderation.status}
+    return {
+        "message": "Submissions moderated successfully",
+        "status": moderation.status,
+        "requested": len(submission_ids),
+        "updated": len(applied),
+        "unchanged": len(submissions) - len(to_update),
+        "conflicts": len(to_update) - len(applied),
+        "not_found": not_found
+    }
 
-async def check_and_promote_journal(journal_id: str):
-    """Check if a user-added journal should be promoted to verified"""
-    journal = await db.journals.find_one({"journal_id": journal_id}, {"_id": 0})
-    if not journal or not journal.get("is_user_added") or journal.get("is_verified"):
-        return
+# --- Retroactive re-validation ---
+
+REVALIDATION_JOB_ID = "revalidate_submissions"
+REVALIDATION_BATCH_SIZE = 1000
+
+# Stored fields the validation rules read
+REVALIDATION_PROJECTION = {
+    "_id": 0, "submission_id": 1, "user_hashed_id": 1, "journal_id": 1, "created_at": 1,
+    "valid_for_stats": 1, "validation_flags": 1,
+    "scientific_area": 1, "scientific_area_grande": 1, "manuscript_type": 1, "decision_type": 1,
+    "reviewer_count": 1, "time_to_decision": 1, "editor_comments": 1, "perceived_coherence": 1,
+    "review_comments": 1, "journal_is_open_access": 1, "apc_range": 1,
+    "editor_comments_quality": 1, "feedback_clarity": 1
+}
+
+def _as_datetime(value) -> Optional[datetime]:
+    """Stored timestamps are ISO strings (or datetimes in older seeds); normalize to aware datetimes"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def revalidate_group(submissions: List[dict]) -> List[UpdateOne]:
+    """Re-apply the current rules to one (user, journal) group sorted by created_at.
     
-    # Promotion requires 3+ validated submissions
-    if journal.get("validated_submission_count", 0) >= 3:
-        await db.journals.update_one(
-            {"journal_id": journal_id},
-            {"$set": {"is_verified": True}}
-        )
+    A submission is a duplicate when an earlier one of the group was created
+    within DUPLICATE_WINDOW_DAYS before it, which is what the create-time check
+    saw. Returns updates only for submissions whose outcome changed.
+    """
+    window = timedelta(days=DUPLICATE_WINDOW_DAYS)
+    updates = []
+    previous_created = None
+    for sub in submissions:
+        flags = evaluate_submission_rules(sub)
+        created = _as_datetime(sub.get("created_at"))
+        if previous_created is not None and created is not None and created - previous_created <= window:
+            mark_duplicate(flags)
+        if created is not None:
+            previous_created = created
+        
+        valid = is_valid_for_stats(flags)
+        if valid != sub.get("valid_for_stats") or flags != sub.get("validation_flags"):
+            updates.append(UpdateOne(
+                {"submission_id": sub["submission_id"]},
+                {"$set": {"valid_for_stats": valid, "validation_flags": flags}}
+            ))
+    return updates
+
+async def run_submission_revalidation(job: dict):
+    """Stream all submissions grouped by (user, journal) and rewrite changed validity flags.
+    
+    Resumable: the checkpoint is the last fully processed (user, journal) group.
+    """
+    progress = job.get("progress") or {}
+    processed = progress.get("processed", 0)
+    changed = progress.get("changed", 0)
+    
+    query = {}
+    checkpoint = job.get("checkpoint")
+    if checkpoint:
+        last_user, last_journal = checkpoint
+        query = {"$or": [
+            {"user_hashed_id": {"$gt": last_user}},
+            {"user_hashed_id": last_user, "journal_id": {"$gt": last_journal}}
+        ]}
+    
+    cursor = db.submissions.find(query, REVALIDATION_PROJECTION).sort([
+        ("user_hashed_id", 1), ("journal_id", 1), ("created_at", 1), ("submission_id", 1)
+    ]).batch_size(REVALIDATION_BATCH_SIZE)
+    
+    pending_updates = []
+    batch_count = 0
+    group_key, group = None, []
+    
+    async def flush(last_group):
+        nonlocal pending_updates, changed, batch_count
+        if pending_updates:
+            await db.submissions.bulk_write(pending_updates, ordered=False)
+            await ANALYTICS_VERSION.bump()
+            changed += len(pending_updates)
+        pending_updates, batch_count = [], 0
+        await save_job_checkpoint(REVALIDATION_JOB_ID, list(last_group), {"processed": processed, "changed": changed})
+    
+    async for sub in cursor:
+        key = (sub.get("user_hashed_id"), sub.get("journal_id"))
+        if key != group_key:
+            if group:
+                pending_updates.extend(revalidate_group(group))
+                # Checkpoints fall on group boundaries so the duplicate window is never split
+                if batch_count >= REVALIDATION_BATCH_SIZE:
+                    await flush(group_key)
+            group_key, group = key, []
+        group.append(sub)
+        processed += 1
+        batch_count += 1
+    
+    if group:
+        pending_updates.extend(revalidate_group(group))
+        await flush(group_key)
+    
+    logger.info(f"Submission re-validation finished: {processed} processed, {changed} changed")
+
+@api_router.post("/admin/submissions/revalidate")
+async def start_submission_revalidation(request: Request, restart: bool = False):
+    """Re-apply the current validation rules to all stored submissions (background job)"""
+    await require_admin(request)
+    await start_background_job(REVALIDATION_JOB_ID, run_submission_revalidation, restart=restart)
+    return await get_job_status(REVALIDATION_JOB_ID)
+
+@api_router.get("/admin/submissions/revalidate/status")
+async def get_submission_revalidation_status(request: Request):
+    """Progress of the re-validation job"""
+    await require_admin(request)
+    return await get_job_status(REVALIDATION_JOB_ID)
+
+# Validated submissions needed before a user-added journal/publisher is verified
+VERIFICATION_PROMOTION_THRESHOLD = 3
+
+async def _promote_verified(collection, id_field: str, ids: List[str]) -> List[dict]:
+    """Verify every user-added entity in `ids` that reached the promotion threshold"""
+    eligible = {
+        id_field: {"$in": list(ids)},
+        "is_user_added": True,
+        "is_verified": {"$ne": True},
+        "validated_submission_count": {"$gte": VERIFICATION_PROMOTION_THRESHOLD}
+    }
+    promoted = await collection.find(eligible, {"_id": 0, id_field: 1, "name": 1}).to_list(None)
+    if promoted:
+        async with catalog_write() as catalog_version:
+            await collection.update_many(
+                {**eligible, id_field: {"$in": [doc[id_field] for doc in promoted]}},
+                {"$set": {"is_verified": True, "catalog_version": catalog_version}}
+            )
+    return promoted
+
+async def check_and_promote_journals(journal_ids: List[str]) -> List[dict]:
+    """Promote user-added journals with enough validated submissions to verified"""
+    promoted = await _promote_verified(db.journals, "journal_id", journal_ids)
+    catalog_index.mark_verified(catalog_index.journals, [journal["journal_id"] for journal in promoted])
+    for journal in promoted:
         logger.info(f"Journal {journal['name']} promoted to verified status")
+    return promoted
 
-async def check_and_promote_publisher(publisher_id: str):
-    """Check if a user-added publisher should be promoted to verified"""
-    publisher = await db.publishers.find_one({"publisher_id": publisher_id}, {"_id": 0})
-    if not publisher or not publisher.get("is_user_added") or publisher.get("is_verified"):
-        return
-    
-    # Promotion requires 3+ validated submissions
-    if publisher.get("validated_submission_count", 0) >= 3:
-        await db.publishers.update_one(
-            {"publisher_id": publisher_id},
-            {"$set": {"is_verified": True}}
-        )
+async def check_and_promote_publishers(publisher_ids: List[str]) -> List[dict]:
+    """Promote user-added publishers with enough validated submissions to verified"""
+    promoted = await _promote_verified(db.publishers, "publisher_id", publisher_ids)
+    catalog_index.mark_verified(catalog_index.publishers, [publisher["publisher_id"] for publisher in promoted])
+    for publisher in promoted:
         logger.info(f"Publisher {publisher['name']} promoted to verified status")
+    return promoted
 
 @api_router.get("/admin/evidence/{file_id}")
 async def get_evidence_file(file_id: str, request: Request):
-    """Get decrypted evidence file for admin review"""
-    from fastapi.responses import StreamingResponse
-    import io
-    
+    """Stream the decrypted evidence file for admin review (supports HTTP Range)"""
     await require_admin(request)
     
     evidence = await db.evidence_files.find_one(
-        {"file_id": file_id},
+        {"file_id": file_id, "deleting_at": {"$exists": False}},
         {"_id": 0}
     )
     
     if not evidence:
         raise HTTPException(status_code=404, detail="Evidence file not found")
     
-    # Read and decrypt file
+    # Header/metadata problems are reported before the response starts;
+    # only the chunks overlapping the requested range are decrypted
     try:
-        encrypted_path = Path(evidence["encrypted_path"])
-        if not encrypted_path.exists():
-            raise HTTPException(status_code=404, detail="File not found on disk")
-        
-        with open(encrypted_path, "rb") as f:
-            encrypted_content = f.read()
-        
-        decrypted_content = fernet.decrypt(encrypted_content)
-        
-        return StreamingResponse(
-            io.BytesIO(decrypted_content),
-            media_type=evidence["mime_type"],
-            headers={
-                "Content-Disposition": f'inline; filename="{evidence["original_filename"]}"'
-            }
-        )
+        source = await open_evidence_source(evidence)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found on disk")
     except Exception as e:
         logger.error(f"Error decrypting evidence: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving evidence file")
+    
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{evidence["original_filename"]}"'
+    }
+    
+    byte_range = parse_byte_range(request.headers.get("range"), source.size)
+    if byte_range is None:
+        start, end, status_code = 0, source.size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{source.size}"
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    
+    async def body():
+        if source.size == 0:
+            return
+        try:
+            # Each chunk is fetched from storage and decrypted on the evidence pool
+            async for chunk in source.iter_range(start, end):
+                yield chunk
+        except InvalidTag:
+            # Headers are already sent: abort the stream rather than serve tampered bytes
+            logger.error(f"Evidence {file_id} failed authentication while streaming")
+            raise
+    
+    return StreamingResponse(
+        body(),
+        status_code=status_code,
+        media_type=evidence["mime_type"],
+        headers=headers
+    )
+
+@api_router.get("/admin/system/evidence-io")
+async def get_evidence_io_stats(request: Request):
+    """Queue depth and throughput of the evidence crypto/I-O pool"""
+    await require_admin(request)
+    return evidence_io.stats()
+
+@api_router.get("/admin/evidence/{file_id}/preview")
+async def get_evidence_preview(file_id: str, request: Request):
+    """Small JPEG preview of image evidence for the moderation screen.
+    
+    Returns 202 while the preview is being rendered and 404 when the evidence
+    has no preview (non-image, unreadable, or stored before deduplication).
+    """
+    await require_admin(request)
+    
+    evidence = await db.evidence_files.find_one(
+        {"file_id": file_id, "deleting_at": {"$exists": False}},
+        {"_id": 0, "content_hash": 1, "mime_type": 1}
+    )
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence file not found")
+    
+    blob = None
+    if evidence.get("content_hash"):
+        blob = await db.evidence_blobs.find_one({"content_hash": evidence["content_hash"]}, {"_id": 0})
+    if not blob:
+        raise HTTPException(status_code=404, detail="Preview not available")
+    
+    preview = blob.get("preview")
+    if is_previewable(evidence.get("mime_type")) and preview_claimable(preview, datetime.now(timezone.utc)):
+        # Never rendered (uploaded before previews existed), a render that died, or a failure due for retry
+        schedule_evidence_preview(blob["content_hash"])
+        preview = {"status": "pending"}
+    
+    if preview and preview["status"] == "pending":
+        return JSONResponse(status_code=202, content={"status": "pending"})
+    if not preview or preview["status"] != "ready":
+        raise HTTPException(status_code=404, detail="Preview not available")
+    
+    try:
+        content = await read_evidence_plaintext(preview)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Preview not available")
+    
+    return Response(
+        content=content,
+        media_type=preview["mime_type"],
+        headers={"Cache-Control": "private, max-age=86400"}
+    )
+
+@api_router.post("/admin/system/retention-sweep")
+async def trigger_retention_sweep(request: Request):
+    """Run the evidence retention sweep now instead of waiting for the schedule"""
+    await require_admin(request)
+    await start_background_job(RETENTION_JOB_ID, run_retention_sweep, restart=True)
+    return {"message": "Retention sweep started", "job_id": RETENTION_JOB_ID}
+
+@api_router.get("/admin/system/retention-sweep/status")
+async def get_retention_sweep_status(request: Request):
+    """Progress and bytes reclaimed of the latest retention sweep"""
+    await require_admin(request)
+    return await get_job_status(RETENTION_JOB_ID)
+
+@api_router.post("/admin/system/key-rotation/rewrap")
+async def start_evidence_rewrap(request: Request, restart: bool = False):
+    """Re-encrypt stored evidence under the primary key (resumes unless restart=true)"""
+    await require_admin(request)
+    job = await start_background_job(REWRAP_JOB_ID, run_evidence_rewrap, restart=restart)
+    return {"message": "Evidence rewrap started", "job_id": REWRAP_JOB_ID, "resumed_from": job.get("checkpoint")}
+
+@api_router.get("/admin/system/key-rotation")
+async def get_key_rotation_status(request: Request):
+    """Keyring state, evidence still under old keys, and rewrap job progress"""
+    await require_admin(request)
+    pending_blobs, pending_files = await asyncio.gather(
+        db.evidence_blobs.count_documents(not_under_primary_key()),
+        db.evidence_files.count_documents({"content_hash": {"$exists": False}, **not_under_primary_key()})
+    )
+    return {
+        "primary_key_id": evidence_keyring.primary.key_id.hex(),
+        "key_ids": [key.key_id.hex() for key in evidence_keyring.keys],
+        "pending": {"blobs": pending_blobs, "legacy_files": pending_files},
+        "job": await get_job_status(REWRAP_JOB_ID)
+    }
 
 @api_router.get("/admin/users")
 async def get_admin_users(
@@ -2757,7 +5965,7 @@ async def get_admin_users(
     
     users = await db.users.find(
         {},
-        {"_id": 0, "hashed_id": 0}  # Don't expose hashed_id
+        {**PUBLIC_DOC_PROJECTION, "hashed_id": 0}  # Don't expose hashed_id
     ).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
     
     total = await db.users.count_documents({})
@@ -2793,6 +6001,113 @@ async def toggle_admin_status(user_id: str, request: Request):
 
 
 
+# ============== DATABASE INDEXES ==============
+
+async def backfill_name_keys():
+    """Store the normalized matching key on journals/publishers that lack it"""
+    for collection in (db.journals, db.publishers):
+        updates = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": normalize_name_key(doc["name"])}})
+            async for doc in collection.find({"name_key": {"$exists": False}, "name": {"$type": "string"}}, {"name": 1})
+        ]
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+            logger.info(f"Backfilled name_key on {len(updates)} {collection.name}")
+    
+    # Legacy candidates were keyed by exact title-cased names: merge variants under one key.
+    # Each source's count is added at most once (its _id is recorded on the target by the
+    # same write), so a merge interrupted before the sources are deleted can simply rerun,
+    # even by another worker booting at the same time. The few merged_from ids are kept.
+    merged = defaultdict(lambda: {"sources": []})
+    async for doc in db.journal_candidates.find({"name_key": {"$exists": False}}):
+        key = (normalize_name_key(doc.get("name")), normalize_name_key(doc.get("publisher_name")))
+        merged[key]["sources"].append(doc)
+        merged[key].setdefault("name", doc.get("name"))
+        merged[key].setdefault("publisher_name", doc.get("publisher_name"))
+    
+    if merged:
+        # 1. Make sure every target exists (a no-op on a rerun)
+        await db.journal_candidates.bulk_write([
+            UpdateOne(
+                {"name_key": name_key, "publisher_key": publisher_key},
+                {"$setOnInsert": {"name": data["name"], "publisher_name": data["publisher_name"], "count": 0}},
+                upsert=True
+            )
+            for (name_key, publisher_key), data in merged.items()
+        ], ordered=False)
+        # 2. Add each source's count unless the target already records it
+        await db.journal_candidates.bulk_write([
+            UpdateOne(
+                {"name_key": name_key, "publisher_key": publisher_key, "merged_from": {"$ne": source["_id"]}},
+                {"$inc": {"count": source.get("count", 0)}, "$push": {"merged_from": source["_id"]}}
+            )
+            for (name_key, publisher_key), data in merged.items()
+            for source in data["sources"]
+        ], ordered=False)
+        # 3. Drop the sources
+        await db.journal_candidates.delete_many({"_id": {"$in": [
+            source["_id"] for data in merged.values() for source in data["sources"]
+        ]}})
+        logger.info(f"Merged legacy journal candidates into {len(merged)} normalized candidates")
+
+async def ensure_indexes():
+    """Create the indexes the hot paths rely on (idempotent).
+    
+    Raises:
+        RuntimeError: if a unique index cannot be created (duplicates exist),
+        since exactly-once promotion and deduplication depend on them
+    """
+    # Older documents predate name_key; fill it in before the unique indexes need it
+    await backfill_name_keys()
+    
+    name_key_only = {"partialFilterExpression": {"name_key": {"$exists": True}}}
+    index_specs = [
+        # Crowdsourcing: one candidate per (journal, publisher) normalized name pair
+        (db.journal_candidates, [("name_key", 1), ("publisher_key", 1)], {"unique": True}),
+        # Catalog: journal names are unique per publisher, publisher names are unique
+        (db.journals, [("publisher_id", 1), ("name_key", 1)], {"unique": True, **name_key_only}),
+        (db.journals, [("name_key", 1)], {}),
+        (db.journals, [("journal_id", 1)], {"unique": True}),
+        (db.publishers, [("name_key", 1)], {"unique": True, **name_key_only}),
+        (db.publishers, [("publisher_id", 1)], {"unique": True}),
+        # Keyset pagination in (name, id) order and catalog delta sync
+        (db.journals, [("name", 1), ("journal_id", 1)], {}),
+        (db.journals, [("publisher_id", 1), ("name", 1), ("journal_id", 1)], {}),
+        (db.journals, [("catalog_version", 1)], {}),
+        (db.publishers, [("name", 1), ("publisher_id", 1)], {}),
+        (db.publishers, [("catalog_version", 1)], {}),
+        (db.catalog_reservations, [("expires_at", 1)], {"expireAfterSeconds": 0}),
+        # Write-behind retries are picked up by due time
+        (db.side_effect_outbox, [("next_attempt_at", 1)], {}),
+        # Duplicate check on create and the (user, journal) ordered re-validation scan
+        (db.submissions, [("user_hashed_id", 1), ("journal_id", 1), ("created_at", 1), ("submission_id", 1)], {}),
+        (db.submissions, [("submission_id", 1)], {"unique": True}),
+        # Admin review list: newest first, overall and per status
+        (db.submissions, [("created_at", -1), ("submission_id", -1)], {}),
+        (db.submissions, [("status", 1), ("created_at", -1), ("submission_id", -1)], {}),
+        # Resumable background jobs
+        (db.job_checkpoints, [("job_id", 1)], {"unique": True}),
+        # Evidence: one blob per content hash
+        (db.evidence_blobs, [("content_hash", 1)], {"unique": True}),
+        (db.evidence_files, [("file_id", 1)], {"unique": True}),
+        (db.evidence_files, [("retention_until", 1)], {}),
+        # Idempotency-Key replay store, expired by MongoDB's TTL monitor
+        (db.idempotency_keys, [("key", 1)], {"unique": True}),
+        (db.idempotency_keys, [("created_at", 1)], {"expireAfterSeconds": IDEMPOTENCY_TTL_HOURS * 3600}),
+    ]
+    
+    missing_unique = []
+    for collection, keys, options in index_specs:
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Could not create index {keys} on {collection.name}: {e}")
+            if options.get("unique"):
+                missing_unique.append(f"{collection.name} {keys}")
+    if missing_unique:
+        # Pre-existing duplicates must be merged by hand before the app can serve writes safely
+        raise RuntimeError(f"Unique indexes could not be created: {'; '.join(missing_unique)}")
+
 # ============== DATABASE SEEDING (POPULAR BANCO INICIAL) ==============
 
 async def seed_database():
@@ -2896,40 +6211,13 @@ async def seed_database():
           ]
         }
 
-        # Inserção no Banco
-        count_pub = 0
-        count_jour = 0
-
-        for pub_name, journals in seed_data.items():
-            # Cria Publisher
-            pub_id = f"pub_{uuid.uuid4().hex[:12]}"
-            await db.publishers.insert_one({
-                "publisher_id": pub_id,
-                "name": pub_name,
-                "is_user_added": False,
-                "is_verified": True,
-                "validated_submission_count": 0,
-                "created_at": datetime.now(timezone.utc).isoformat()
-            })
-            count_pub += 1
-
-            # Cria Journals Vinculados
-            journal_docs = []
-            for j_name in journals:
-                journal_docs.append({
-                    "journal_id": f"journal_{uuid.uuid4().hex[:12]}",
-                    "name": j_name,
-                    "publisher_id": pub_id,
-                    "is_user_added": False,
-                    "is_verified": True,
-                    "open_access": None, # Será preenchido pelos usuários ou admin posteriormente
-                    "validated_submission_count": 0,
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                })
-            
-            if journal_docs:
-                await db.journals.insert_many(journal_docs)
-                count_jour += len(journal_docs)
+        # Inserção no Banco (mesmo caminho em lote da importação de catálogo)
+        report = await import_catalog(
+            ({"name": j_name, "publisher_name": pub_name} for pub_name, journals in seed_data.items() for j_name in journals),
+            source="seed"
+        )
+        count_pub = report["publishers_inserted"]
+        count_jour = report["inserted"]
 
         logger.info(f"Database seeding completed! Added {count_pub} publishers and {count_jour} journals.")
 
@@ -2941,11 +6229,35 @@ async def seed_database():
 # ======================================================================
 @app.on_event("startup")
 async def startup_event():
-    # 1. Garante áreas do CNPq (que já estava no seu código)
-    await ensure_areas_initialized()
+    # 1. Sincroniza as versões dos dados (ETags) e carrega a árvore do CNPq em memória
+    await sync_versions()
+    await refresh_cnpq_tree()
+    
+    # 2. Garante os índices antes de qualquer escrita (os únicos impedem que workers
+    # concorrentes semeiem duplicatas); falha o startup se um índice único não puder ser criado
+    await ensure_indexes()
     
-    # 2. Garante revistas iniciais (NOVO)
+    # 3. Garante revistas iniciais (NOVO)
     await seed_database()
+    
+    # 4. Carrega os índices em memória: trigramas (sugestões de nomes) e catálogo (nomes/flags)
+    await load_catalog_indexes()
+    
+    # 5. Inicia o worker de escrita assíncrona (contadores e promoções)
+    side_effects.start()
+    
+    # 6. Valida o backend de armazenamento de evidências (falha cedo se mal configurado)
+    get_evidence_storage()
+    
+    # 7. Agenda a limpeza periódica de evidências vencidas (retention_until)
+    sweeper = asyncio.create_task(retention_sweep_loop())
+    _background_tasks.add(sweeper)
+    sweeper.add_done_callback(_background_tasks.discard)
+    
+    # 8. Acompanha as versões publicadas pelos outros workers
+    version_sync = asyncio.create_task(version_sync_loop())
+    _background_tasks.add(version_sync)
+    version_sync.add_done_callback(_background_tasks.discard)
 
 
 
@@ -2959,17 +6271,281 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
+# ============== CONDITIONAL GET ==============
+
+# Part of every version ETag, so a restart (possibly with new code) never
+# revalidates old representations. Set ETAG_NONCE to a release id to share
+# ETags across the workers of one deployment.
+ETAG_BOOT_NONCE = os.environ.get("ETAG_NONCE") or uuid.uuid4().hex[:12]
+
+class ConditionalGetRegistry:
+    """Routes whose GET responses are fully determined by a set of data versions"""
+    
+    def __init__(self):
+        self._exact: Dict[str, tuple] = {}
+        self._templates: List[tuple] = []
+    
+    def register(self, path: str, *sources: VersionSource):
+        """Declare the version sources of a route (path templates like /x/{code} allowed)"""
+        if "{" in path:
+            pattern = re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(path)) + "$")
+            self._templates.append((pattern, sources))
+        else:
+            self._exact[path] = sources
+    
+    def etag_for(self, path: str) -> Optional[str]:
+        sources = self._exact.get(path)
+        if sources is None:
+            sources = next((sources for pattern, sources in self._templates if pattern.match(path)), None)
+            if sources is None:
+                return None
+        tag = "-".join([ETAG_BOOT_NONCE, *(str(source.value) for source in sources)])
+        return f'W/"{tag}"'
+
+conditional_get_routes = ConditionalGetRegistry()
+
+for path in ["/api/publishers", "/api/journals"]:
+    conditional_get_routes.register(path, CATALOG_VERSION)
+conditional_get_routes.register("/api/analytics/visibility-status", SETTINGS_VERSION)
+for path in ["/api/analytics/overview", "/api/analytics/publishers", "/api/analytics/journals", "/api/analytics/areas"]:
+    conditional_get_routes.register(path, ANALYTICS_VERSION, SETTINGS_VERSION, CATALOG_VERSION)
+for path in ["/api/options/scientific-areas", "/api/options/cnpq/grande-areas", "/api/options/cnpq/areas/{grande_area_code}",
+             "/api/options/cnpq/subareas/{area_code}", "/api/options/cnpq/lookup/{code}"]:
+    conditional_get_routes.register(path, AREAS_VERSION)
+# Fixed option lists only change with the code (i.e. the boot nonce)
+for path in ["/api/options/manuscript-types", "/api/options/decision-types", "/api/options/reviewer-counts",
+             "/api/options/time-ranges", "/api/options/apc-ranges", "/api/options/review-comment-types",
+             "/api/options/editor-comment-types", "/api/options/coherence-options", "/api/options/review-quality-scale",
+             "/api/options/feedback-clarity-scale", "/api/options/decision-fairness", "/api/options/would-recommend"]:
+    conditional_get_routes.register(path)
+
+class ConditionalGetMiddleware:
+    """Answer If-None-Match for registered routes before the handler runs.
+    
+    The ETag is built from in-memory versions only, so a 304 costs no
+    database work; 200 responses of those routes get the same ETag attached.
+    """
+    
+    def __init__(self, app, registry: ConditionalGetRegistry):
+        self.app = app
+        self.registry = registry
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        etag = self.registry.etag_for(scope["path"])
+        if etag is None:
+            await self.app(scope, receive, send)
+            return
+        
+        if etag_matches(Headers(scope=scope).get("if-none-match", ""), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                if "etag" not in headers:
+                    headers["ETag"] = etag
+                    headers.setdefault("Cache-Control", "no-cache")
+            await send(message)
+        
+        await self.app(scope, receive, send_with_etag)
+
+# ============== RESPONSE COMPRESSION ==============
+
+# Smaller bodies are sent as-is: the framing overhead outweighs the savings
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# Evidence is served with byte ranges (Content-Range offsets refer to the plaintext)
+COMPRESSION_EXCLUDED_PATHS = ("/api/admin/evidence/",)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br (when the brotli package is installed) or gzip from an Accept-Encoding header"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name.strip().lower()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def make_compressor(encoding: str) -> tuple:
+    """(compress(chunk), finish()) for a streaming encoder"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress, compressor.flush
+
+class CompressionMiddleware:
+    """gzip/brotli for compressible 200 responses of at least `minimum_size` bytes.
+    
+    Partial (206) and already-encoded responses, binary content types and
+    evidence downloads pass through untouched. Strong ETags become weak on
+    compressed responses, since the bytes on the wire differ.
+    """
+    
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or scope["path"].startswith(COMPRESSION_EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        passthrough = False
+        compress = finish = None
+        
+        async def send_compressed(message):
+            nonlocal start_message, passthrough, compress, finish
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (message["status"] != 200
+                        or "content-encoding" in headers
+                        or "content-range" in headers
+                        or not headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether compression pays off
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compress is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compress, finish = make_compressor(encoding)
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if not more_body:
+                    data = compress(body) + finish()
+                    headers["Content-Length"] = str(len(data))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(start_message)
+            
+            data = compress(body)
+            if not more_body:
+                data += finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
+
+# ============== REQUEST SIZE LIMITS ==============
+
+# Multipart framing around an evidence file (boundaries, part headers)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# Request bodies on these routes are capped while they are received, before
+# FastAPI parses (and spools to disk) a multipart upload: (path, max bytes, error)
+BODY_SIZE_LIMITS = [
+    (re.compile(r"^/api/submissions/[^/]+/evidence$"), MAX_EVIDENCE_BYTES + MULTIPART_OVERHEAD_BYTES, "Evidence file too large"),
+]
+
+class BodySizeLimitMiddleware:
+    """Reject oversized request bodies with 413 without reading them in full.
+    
+    A declared Content-Length over the limit is refused before any of the
+    body is read; chunked or understated bodies are cut off as soon as the
+    bytes received pass it. The exact file size is still checked while the
+    upload is encrypted (EvidenceTooLarge).
+    """
+    
+    def __init__(self, app, limits: list):
+        self.app = app
+        self.limits = limits
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+        limit = next(((max_bytes, detail) for pattern, max_bytes, detail in self.limits if pattern.match(scope["path"])), None)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_bytes, detail = limit
+        
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside the body parser, so FastAPI answers with this error
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+        
+        await self.app(scope, receive_limited, send)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(ConditionalGetMiddleware, registry=conditional_get_routes)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+app.add_middleware(BodySizeLimitMiddleware, limits=BODY_SIZE_LIMITS)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    # The frontend reads the /options/all ETag as the bundle version (see get_all_options)
+    expose_headers=["ETag"],
 )
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await side_effects.stop()
+    for task in list(_background_tasks):
+        task.cancel()
+    evidence_io.shutdown()
     client.close()
@@ -0,0 +1,161 @@
+"""
+Shared fixtures for the in-process backend tests
+
+These tests import server.py directly and drive it against a real MongoDB
+(TEST_MONGO_URL, default mongodb://localhost:27017) in a throwaway database
+that is dropped afterwards. They are skipped when no MongoDB is reachable.
+The live-deployment suites in this directory don't use these fixtures.
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+
+# server.py reads these at import time; the fixtures below replace the client
+os.environ.setdefault("MONGO_URL", TEST_MONGO_URL)
+os.environ.setdefault("DB_NAME", "pproc_test")
+os.environ.setdefault("ALLOW_EPHEMERAL_ENCRYPTION_KEY", "1")
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(scope="session")
+def loop():
+    """One event loop for the whole session (the Motor client is bound to it)"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine to completion on the session loop"""
+    return loop.run_until_complete
+
+
+@pytest.fixture
+def server(run, monkeypatch, tmp_path):
+    """The server module wired to a fresh test database and a temporary evidence directory"""
+    import server as server_module
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def connect():
+        client = AsyncIOMotorClient(TEST_MONGO_URL, serverSelectionTimeoutMS=2000)
+        await client.server_info()
+        return client
+
+    try:
+        client = run(connect())
+    except Exception as e:
+        pytest.skip(f"MongoDB not reachable at {TEST_MONGO_URL}: {e}")
+
+    db_name = f"pproc_test_{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(server_module, "client", client)
+    monkeypatch.setattr(server_module, "db", client[db_name])
+    monkeypatch.setattr(server_module, "_evidence_storages", {
+        "local": server_module.LocalEvidenceStorage(tmp_path)
+    })
+    run(server_module.ensure_indexes())
+    yield server_module
+    run(client.drop_database(db_name))
+    client.close()
+
+
+@pytest.fixture
+def db(server):
+    return server.db
+
+
+@pytest.fixture
+def api(server, run):
+    """httpx client calling the app in-process (no startup tasks run)"""
+    import httpx
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+    yield client
+    run(client.aclose())
+
+
+@pytest.fixture
+def make_user(db, run):
+    """Create a user with a live session; returns the Authorization headers"""
+    def make(user_id: str = "user_test", admin: bool = False, **fields) -> dict:
+        token = f"token_{uuid.uuid4().hex}"
+        now = datetime.now(timezone.utc)
+        run(db.users.insert_one({
+            "user_id": user_id,
+            "email": f"{user_id}@example.org",
+            "name": user_id,
+            "hashed_id": f"hashed_{user_id}",
+            "is_admin": admin,
+            "has_orcid": True,
+            "trust_score": 0.0,
+            "contribution_count": 0,
+            "validated_count": 0,
+            "flagged_count": 0,
+            "created_at": now.isoformat(),
+            **fields
+        }))
+        run(db.user_sessions.insert_one({
+            "session_id": token,
+            "user_id": user_id,
+            "session_token": token,
+            "expires_at": (now + timedelta(days=1)).isoformat()
+        }))
+        return {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def patch_collection(monkeypatch, db):
+    """Route one collection's `method_name` through replacement(original, self, *args, **kwargs)"""
+    def patch(method_name: str, collection_name: str, replacement):
+        collection_class = type(db[collection_name])
+        original = getattr(collection_class, method_name)
+
+        async def patched(self, *args, **kwargs):
+            if self.name == collection_name:
+                return await replacement(original, self, *args, **kwargs)
+            return await original(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection_class, method_name, patched)
+    return patch
+
+
+def fail_once(failure):
+    """Replacement for patch_collection that runs `failure` on the first call only"""
+    calls = []
+
+    async def replacement(original, collection, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            return await failure(original, collection, *args, **kwargs)
+        return await original(collection, *args, **kwargs)
+    return replacement
+
+
+@pytest.fixture
+def upload_evidence(db, api, run, make_user):
+    """Upload `content` as evidence through the API; returns the response JSON plus submission_id"""
+    headers = make_user("user_evidence")
+
+    def upload(content: bytes, submission_id: str = None, filename: str = "evidence.pdf",
+               mime_type: str = "application/pdf") -> dict:
+        submission_id = submission_id or f"sub_{uuid.uuid4().hex[:12]}"
+        run(db.submissions.update_one(
+            {"submission_id": submission_id},
+            {"$setOnInsert": {"user_hashed_id": "hashed_user_evidence", "status": "pending"}},
+            upsert=True
+        ))
+        response = run(api.post(f"/api/submissions/{submission_id}/evidence", headers=headers,
+                                files={"file": (filename, content, mime_type)}))
+        assert response.status_code == 200, response.text
+        return {**response.json(), "submission_id": submission_id}
+    upload.headers = headers
+    return upload
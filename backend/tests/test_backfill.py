@@ -0,0 +1,85 @@
+"""
+Tests for the startup database setup
+1. Legacy journal candidates are merged under their normalized key, summing counts
+2. A merge interrupted before the sources were deleted can rerun without double counting
+3. A unique index that cannot be created fails startup, which creates indexes before seeding
+"""
+import pytest
+
+from conftest import fail_once
+
+LEGACY = [
+    {"name": "Journal Of Physics", "publisher_name": "Acme Press", "count": 2},
+    {"name": "journal of physics", "publisher_name": "ACME press", "count": 3},
+    {"name": "Other Journal", "publisher_name": "Acme Press", "count": 1},
+]
+
+
+@pytest.fixture(autouse=True)
+def legacy_db(db, run):
+    """Startup backfills before ensure_indexes: legacy candidates predate the unique key index"""
+    run(db.journal_candidates.drop_indexes())
+
+
+def candidates(db, run):
+    docs = run(db.journal_candidates.find({}, {"_id": 0, "name_key": 1, "count": 1}).to_list(None))
+    return {doc.get("name_key"): doc["count"] for doc in docs}
+
+
+def test_legacy_candidates_are_merged(server, db, run):
+    run(db.journal_candidates.insert_many([dict(doc) for doc in LEGACY]))
+    run(server.backfill_name_keys())
+    assert candidates(db, run) == {"journal of physics": 5, "other journal": 1}
+
+    run(server.backfill_name_keys())
+    assert candidates(db, run) == {"journal of physics": 5, "other journal": 1}
+
+
+def test_existing_normalized_candidate_keeps_its_count(server, db, run):
+    run(db.journal_candidates.insert_one({"name": "Journal of Physics", "publisher_name": "Acme Press",
+                                          "name_key": "journal of physics", "publisher_key": "acme press", "count": 4}))
+    run(db.journal_candidates.insert_many([dict(doc) for doc in LEGACY[:2]]))
+    run(server.backfill_name_keys())
+    assert candidates(db, run) == {"journal of physics": 9}
+
+
+def test_interrupted_merge_reruns_once(server, db, run, patch_collection):
+    run(db.journal_candidates.insert_many([dict(doc) for doc in LEGACY]))
+
+    async def crash(original, collection, *args, **kwargs):
+        raise RuntimeError("process killed")
+    patch_collection("delete_many", "journal_candidates", fail_once(crash))
+
+    try:
+        run(server.backfill_name_keys())
+    except RuntimeError:
+        pass
+    run(server.backfill_name_keys())
+    assert candidates(db, run) == {"journal of physics": 5, "other journal": 1}
+
+
+def test_unique_index_failure_is_fatal(server, db, run):
+    run(db.publishers.drop_indexes())
+    run(db.publishers.insert_many([
+        {"publisher_id": "pub_1", "name": "Acme", "name_key": "acme"},
+        {"publisher_id": "pub_2", "name": "ACME", "name_key": "acme"},
+    ]))
+    with pytest.raises(RuntimeError, match="publishers"):
+        run(server.ensure_indexes())
+
+
+def test_startup_creates_indexes_before_seeding(server, run, monkeypatch):
+    calls = []
+
+    async def broken_indexes():
+        calls.append("ensure_indexes")
+        raise RuntimeError("Unique indexes could not be created")
+
+    async def seed():
+        calls.append("seed_database")
+    monkeypatch.setattr(server, "ensure_indexes", broken_indexes)
+    monkeypatch.setattr(server, "seed_database", seed)
+
+    with pytest.raises(RuntimeError):
+        run(server.startup_event())
+    assert calls == ["ensure_indexes"]
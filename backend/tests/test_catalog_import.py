@@ -0,0 +1,162 @@
+"""
+Tests for the bulk catalog import
+1. Normalizing OpenAlex, DOAJ (JSON and CSV) and plain records
+2. Import counts: inserted / updated / unchanged / skipped / duplicates
+3. Journals another writer created mid-batch are reported as conflicts
+4. The upload endpoint (gzip, format errors) and parsing off the event loop
+5. Small PrefixIndex batches are inserted in place
+"""
+import gzip
+import io
+import json
+import threading
+
+import pytest
+
+from conftest import fail_once
+
+OPENALEX = [
+    {"display_name": "Journal of Physics", "host_organization_name": "Acme Press", "is_oa": False,
+     "issn_l": "1234-5678", "type": "journal"},
+    {"display_name": "Acme Letters", "host_organization_name": "Acme Press", "is_oa": True, "type": "journal"},
+    {"display_name": "Acme Repository", "host_organization_name": "Acme Press", "type": "repository"},
+    {"display_name": "Nameless", "type": "journal"},
+]
+
+
+def import_records(server, run, records, **kwargs):
+    return run(server.import_catalog(iter(records), "test", **kwargs))
+
+
+class TestNormalize:
+    def test_openalex_source(self, server):
+        record = server.normalize_catalog_record(OPENALEX[0])
+        assert record == {"name": "Journal of Physics", "publisher_name": "Acme Press",
+                          "open_access": False, "issn": "1234-5678"}
+
+    def test_doaj_bibjson_is_open_access(self, server):
+        record = server.normalize_catalog_record({"bibjson": {
+            "title": "  Open   Biology ", "publisher": {"name": "Libre"}, "eissn": "2222-333x"
+        }})
+        assert record == {"name": "Open Biology", "publisher_name": "Libre", "open_access": True, "issn": "2222-333X"}
+
+    def test_doaj_csv_columns_and_default(self, server):
+        record = server.normalize_catalog_record(
+            {"Journal title": "Open Chemistry", "Publisher": "Libre", "Journal EISSN (online version)": ""},
+            open_access_default=True
+        )
+        assert record == {"name": "Open Chemistry", "publisher_name": "Libre", "open_access": True, "issn": None}
+
+    @pytest.mark.parametrize("raw", [
+        None, {}, OPENALEX[2], OPENALEX[3],
+        {"name": "x" * 301, "publisher": "Acme"},
+        {"name": "---", "publisher": "Acme"},
+    ])
+    def test_unusable_records(self, server, raw):
+        assert server.normalize_catalog_record(raw) is None
+
+    def test_format_from_filename(self, server):
+        assert server.catalog_dump_format("sources.jsonl.gz") == "jsonl"
+        assert server.catalog_dump_format("doaj.csv") == "csv"
+        assert server.catalog_dump_format("anything", "csv") == "csv"
+        with pytest.raises(ValueError):
+            server.catalog_dump_format("dump.xml")
+
+
+class TestImportCounts:
+    def test_import_then_reimport(self, server, db, run):
+        report = import_records(server, run, OPENALEX + [OPENALEX[0], None])
+        assert {k: report[k] for k in ("records", "inserted", "updated", "unchanged", "skipped", "duplicates", "conflicts")} == {
+            "records": 6, "inserted": 2, "updated": 0, "unchanged": 0, "skipped": 3, "duplicates": 1, "conflicts": 0
+        }
+        assert report["publishers_inserted"] == 1
+
+        report = import_records(server, run, OPENALEX)
+        assert (report["inserted"], report["updated"], report["unchanged"]) == (0, 0, 2)
+
+        changed = [{**OPENALEX[0], "is_oa": True}, OPENALEX[1]]
+        report = import_records(server, run, changed)
+        assert (report["inserted"], report["updated"], report["unchanged"]) == (0, 1, 1)
+        journal = run(db.journals.find_one({"name": "Journal of Physics"}))
+        assert journal["open_access"] is True and journal["issn"] == "1234-5678"
+
+    def test_existing_user_journal_is_verified_not_duplicated(self, server, db, run):
+        import_records(server, run, OPENALEX[:1])
+        run(db.journals.update_one({"name": "Journal of Physics"}, {"$set": {"is_verified": False}}))
+        report = import_records(server, run, OPENALEX[:1])
+        assert (report["inserted"], report["updated"]) == (0, 1)
+        assert run(db.journals.count_documents({})) == 1
+
+    def test_publisher_reused_across_batches(self, server, run, monkeypatch):
+        monkeypatch.setattr(server, "CATALOG_IMPORT_BATCH_SIZE", 2)
+        records = [{"name": f"Journal {i}", "publisher": "Acme"} for i in range(5)]
+        report = import_records(server, run, records)
+        assert (report["records"], report["inserted"], report["publishers_inserted"]) == (5, 5, 1)
+
+    def test_concurrent_insert_is_a_conflict(self, server, db, run, patch_collection):
+        async def racing_writer(original, collection, requests, **kwargs):
+            # Another writer creates the same journal between the existence check and the write
+            publisher = await db.publishers.find_one({"name_key": server.normalize_name_key("Acme Press")})
+            await collection.insert_one({
+                "journal_id": "journal_other", "name": "Acme Letters", "publisher_id": publisher["publisher_id"],
+                "name_key": server.normalize_name_key("Acme Letters")
+            })
+            return await original(collection, requests, **kwargs)
+        patch_collection("bulk_write", "journals", fail_once(racing_writer))
+
+        report = import_records(server, run, OPENALEX[:2])
+        assert (report["inserted"], report["conflicts"], report["unchanged"]) == (1, 1, 0)
+        assert run(db.journals.count_documents({})) == 2
+
+
+class TestEndpoint:
+    def test_gzip_jsonl_upload(self, server, db, api, run, make_user):
+        headers = make_user("admin_1", admin=True)
+        body = gzip.compress("\n".join(json.dumps(r) for r in OPENALEX).encode())
+        response = run(api.post("/api/admin/catalog/import", headers=headers,
+                                files={"file": ("sources.jsonl.gz", body, "application/gzip")}))
+        assert response.status_code == 200
+        assert response.json()["inserted"] == 2
+        assert server.journal_name_index.search(server.normalize_name_key("acme let"))
+
+    def test_bad_gzip_is_rejected(self, api, run, make_user):
+        headers = make_user("admin_1", admin=True)
+        response = run(api.post("/api/admin/catalog/import", headers=headers,
+                                files={"file": ("sources.jsonl.gz", b"not gzip", "application/gzip")}))
+        assert response.status_code == 400
+
+    def test_unknown_format_is_rejected(self, api, run, make_user):
+        headers = make_user("admin_1", admin=True)
+        response = run(api.post("/api/admin/catalog/import", headers=headers,
+                                files={"file": ("sources.xml", b"<xml/>", "text/xml")}))
+        assert response.status_code == 400
+
+    def test_requires_admin(self, api, run, make_user):
+        headers = make_user("user_1")
+        response = run(api.post("/api/admin/catalog/import", headers=headers,
+                                files={"file": ("doaj.csv", io.BytesIO(b"Journal title,Publisher\n"), "text/csv")}))
+        assert response.status_code == 403
+
+    def test_parsing_runs_off_the_event_loop(self, server, run, monkeypatch):
+        threads = set()
+        normalize = server.normalize_catalog_record
+
+        def recording_normalize(*args, **kwargs):
+            threads.add(threading.current_thread())
+            return normalize(*args, **kwargs)
+        monkeypatch.setattr(server, "normalize_catalog_record", recording_normalize)
+
+        import_records(server, run, OPENALEX)
+        assert threads and threading.main_thread() not in threads
+
+
+class TestPrefixIndex:
+    def test_small_batch_matches_a_rebuild(self, server):
+        entries = [(f"j{i}", f"journal number {i}", i) for i in range(500)]
+        incremental, rebuilt = server.PrefixIndex(), server.PrefixIndex()
+        incremental.add_many(entries)
+        incremental.add_many([("j3", "renamed journal", 3), ("new", "journal number new", None)])
+        rebuilt.add_many([e for e in entries if e[0] != "j3"] + [("j3", "renamed journal", 3), ("new", "journal number new", None)])
+
+        assert incremental._suffixes == rebuilt._suffixes
+        assert incremental.search("renamed") == rebuilt.search("renamed")
@@ -0,0 +1,146 @@
+"""
+Tests for catalog pagination and delta sync
+1. The reported catalog_version stays below versions whose writes are still in flight
+2. A client syncing `since` the reported version never misses a write
+3. Expired reservations (dead writers) stop holding the watermark back
+4. Unpaginated lists signal truncation; cursor pages return everything
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+
+def sync(api, run, since):
+    response = run(api.get("/api/journals", params={"since": since, "limit": 1000}))
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestWatermark:
+    def test_in_flight_write_holds_the_watermark(self, server, db, api, run):
+        async def scenario():
+            async with server.catalog_write() as version:
+                page = (await api.get("/api/journals", params={"since": 0, "limit": 10})).json()
+                assert page["catalog_version"] < version
+                await db.journals.insert_one({"journal_id": "journal_late", "name": "Late", "catalog_version": version})
+            return page["catalog_version"]
+
+        reported = run(scenario())
+        names = [j["name"] for j in sync(api, run, reported)["items"]]
+        assert "Late" in names
+
+    def test_older_reservation_finishing_last(self, server, db, api, run):
+        async def scenario():
+            first = server.catalog_write()
+            first_version = await first.__aenter__()
+            async with server.catalog_write() as second_version:
+                await db.journals.insert_one({"journal_id": "journal_b", "name": "B", "catalog_version": second_version})
+            # The newer write is done, the older one is not: stay below the older one
+            reported = (await api.get("/api/journals", params={"since": 0, "limit": 10})).json()["catalog_version"]
+            assert reported < first_version
+            await db.journals.insert_one({"journal_id": "journal_a", "name": "A", "catalog_version": first_version})
+            await first.__aexit__(None, None, None)
+            return reported
+
+        reported = run(scenario())
+        names = {j["name"] for j in sync(api, run, reported)["items"]}
+        assert names == {"A", "B"}
+
+    def test_concurrent_writers_never_skip(self, server, db, api, run):
+        seen = set()
+        written = []
+
+        async def writer(i):
+            async with server.catalog_write() as version:
+                await asyncio.sleep(0.005 * (i % 4))
+                await db.journals.insert_one({"journal_id": f"journal_{i}", "name": f"J{i}", "catalog_version": version})
+                written.append(f"J{i}")
+
+        async def reader(since):
+            page = (await api.get("/api/journals", params={"since": since, "limit": 1000})).json()
+            seen.update(j["name"] for j in page["items"])
+            return page["catalog_version"]
+
+        async def scenario():
+            since = 0
+            writers = [asyncio.create_task(writer(i)) for i in range(20)]
+            while not all(task.done() for task in writers):
+                since = await reader(since)
+                await asyncio.sleep(0.002)
+            await reader(since)
+
+        run(scenario())
+        assert seen == set(written)
+
+    def test_expired_reservation_is_ignored(self, server, db, run):
+        version = run(server.CATALOG_VERSION.bump())
+        run(db.catalog_reservations.insert_one({
+            "reservation_id": "catres_dead", "floor": 0,
+            "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)
+        }))
+        assert run(server.catalog_watermark()) == version
+
+    def test_reservation_released_when_the_write_fails(self, server, db, run):
+        async def failing_write():
+            async with server.catalog_write():
+                raise RuntimeError("write failed")
+
+        try:
+            run(failing_write())
+        except RuntimeError:
+            pass
+        assert run(db.catalog_reservations.count_documents({})) == 0
+
+
+class TestPagination:
+    def test_plain_list_signals_truncation(self, server, db, api, run):
+        run(db.publishers.insert_many([
+            {"publisher_id": f"pub_{i:05d}", "name": f"Publisher {i:05d}"} for i in range(1005)
+        ]))
+        response = run(api.get("/api/publishers"))
+        assert len(response.json()) == 1000
+        cursor = response.headers["x-next-cursor"]
+
+        rest = run(api.get("/api/publishers", params={"cursor": cursor, "limit": 1000})).json()
+        assert len(rest["items"]) == 5
+        assert rest["next_cursor"] is None
+
+    def test_cursor_pages_cover_every_journal_once(self, server, db, api, run):
+        # Duplicate names exercise the (name, journal_id) tie-break
+        run(db.journals.insert_many([
+            {"journal_id": f"journal_{i:04d}", "name": f"Journal {i % 7}", "publisher_id": "pub_1"} for i in range(250)
+        ]))
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 40, "publisher_id": "pub_1", **({"cursor": cursor} if cursor else {})}
+            page = run(api.get("/api/journals", params=params)).json()
+            ids += [j["journal_id"] for j in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert len(ids) == 250 and len(set(ids)) == 250
+
+    def test_bad_cursor_is_rejected(self, api, run):
+        assert run(api.get("/api/journals", params={"cursor": "not-a-cursor"})).status_code == 400
+
+    def test_options_bundle_lists_every_publisher(self, server, db, api, run):
+        run(db.publishers.insert_many([
+            {"publisher_id": f"pub_{i:05d}", "name": f"Publisher {i:05d}"} for i in range(1005)
+        ]))
+        server.options_bundle_cache.invalidate()
+        assert len(run(api.get("/api/options/all")).json()["publishers"]) == 1005
+
+    def test_options_bundle_version_is_cached_immutably(self, server, db, api, run):
+        response = run(api.get("/api/options/all"))
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "no-cache"
+
+        current = run(api.get("/api/options/all", params={"v": etag}))
+        assert current.headers["cache-control"] == server.OPTIONS_BUNDLE_IMMUTABLE_CACHE
+        assert current.headers["etag"] == etag
+
+        # A new publisher makes that version stale: its URL is revalidated again
+        run(db.publishers.insert_one({"publisher_id": "pub_new", "name": "New Publisher"}))
+        server.options_bundle_cache.invalidate()
+        stale = run(api.get("/api/options/all", params={"v": etag}))
+        assert stale.headers["cache-control"] == "no-cache"
+        assert stale.headers["etag"] != etag
@@ -0,0 +1,93 @@
+"""
+Tests for the in-memory CNPq area tree (no MongoDB needed)
+1. Children are the active nodes only, sorted by code; inactive nodes can still be looked up
+2. The dropdown endpoints: 404 for an unknown Grande Área, [] for one without Áreas
+3. The lookup payload keeps the shape of the old database-backed response
+"""
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+AREAS = [
+    {"code": "2", "name": "Ciências Biológicas", "name_en": "Biological Sciences", "level": "grande_area",
+     "parent_code": None},
+    {"code": "1", "name": "Ciências Exatas e da Terra", "name_en": "Exact and Earth Sciences",
+     "level": "grande_area", "parent_code": None},
+    {"code": "1.02", "name": "Ciência da Computação", "name_en": "Computer Science", "level": "area",
+     "parent_code": "1"},
+    {"code": "1.01", "name": "Matemática", "name_en": "Mathematics", "level": "area", "parent_code": "1"},
+    {"code": "1.03", "name": "Astronomia", "name_en": "Astronomy", "level": "area", "parent_code": "1",
+     "is_active": False},
+    {"code": "1.01.01", "name": "Álgebra", "name_en": "Algebra", "level": "subarea", "parent_code": "1.01"},
+]
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+@pytest.fixture
+def tree(monkeypatch):
+    """AREAS as the current (not stale) process-wide tree"""
+    tree = server.CnpqTree(AREAS, server.AREAS_VERSION.value)
+    monkeypatch.setattr(server, "_cnpq_tree", tree)
+    return tree
+
+
+class TestSnapshot:
+    def test_children_are_active_and_sorted(self, tree):
+        assert tree.children[None] == ("1", "2")
+        assert tree.children["1"] == ("1.01", "1.02")
+        assert tree.children["1.01"] == ("1.01.01",)
+        assert "2" not in tree.children
+        assert json.loads(tree.children_json["1"]) == [
+            {"code": "1.01", "name": "Matemática", "name_en": "Mathematics"},
+            {"code": "1.02", "name": "Ciência da Computação", "name_en": "Computer Science"},
+        ]
+
+    def test_inactive_node_is_kept_for_lookup(self, tree):
+        assert tree.nodes["1.03"]["is_active"] is False
+        assert json.loads(tree.lookup_json["1.03"])["is_active"] is False
+
+    def test_scientific_areas_legacy_shape(self, tree):
+        assert json.loads(tree.scientific_areas_json) == [
+            {"id": "1", "name": "Ciências Exatas e da Terra", "name_en": "Exact and Earth Sciences"},
+            {"id": "2", "name": "Ciências Biológicas", "name_en": "Biological Sciences"},
+        ]
+
+
+class TestEndpoints:
+    def test_grande_areas(self, tree, run):
+        assert [area["code"] for area in body(run(server.get_cnpq_grande_areas()))] == ["1", "2"]
+
+    def test_areas(self, tree, run):
+        assert [area["code"] for area in body(run(server.get_cnpq_areas("1")))] == ["1.01", "1.02"]
+        # A known Grande Área without (active) Áreas
+        assert run(server.get_cnpq_areas("2")).body == b"[]"
+
+    @pytest.mark.parametrize("code", ["9", "1.01"])
+    def test_areas_of_unknown_grande_area(self, tree, run, code):
+        with pytest.raises(HTTPException) as error:
+            run(server.get_cnpq_areas(code))
+        assert error.value.status_code == 404
+
+    def test_subareas(self, tree, run):
+        assert [area["code"] for area in body(run(server.get_cnpq_subareas("1.01")))] == ["1.01.01"]
+        assert run(server.get_cnpq_subareas("1.02")).body == b"[]"
+        assert run(server.get_cnpq_subareas("9")).body == b"[]"
+        # Only Subáreas are listed, not the Áreas of a Grande Área
+        assert run(server.get_cnpq_subareas("1")).body == b"[]"
+
+    def test_lookup_keeps_the_old_shape(self, tree, run):
+        assert body(run(server.get_cnpq_area_lookup("1.01.01"))) == {
+            "type": "subarea", "code": "1.01.01", "name": "Álgebra", "name_en": "Algebra", "is_active": True
+        }
+        assert body(run(server.get_cnpq_area_lookup("1.03")))["is_active"] is False
+
+    def test_lookup_of_unknown_code(self, tree, run):
+        with pytest.raises(HTTPException) as error:
+            run(server.get_cnpq_area_lookup("9"))
+        assert error.value.status_code == 404
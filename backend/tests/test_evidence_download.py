@@ -0,0 +1,90 @@
+"""
+Tests for streamed admin evidence downloads
+1. Whole-file and ranged (206) responses, including suffix and open-ended ranges
+2. Unsatisfiable ranges answer 416; malformed or multi-range headers get the whole file
+3. Only the chunks overlapping a range are decrypted
+"""
+import os
+
+import pytest
+
+CHUNK = 64 * 1024
+CONTENT = os.urandom(3 * CHUNK + 17)
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin_1", admin=True)
+
+
+@pytest.fixture
+def download(api, run, admin, upload_evidence):
+    file_id = upload_evidence(CONTENT)["file_id"]
+
+    def get(range_header=None, **headers):
+        if range_header:
+            headers["Range"] = range_header
+        return run(api.get(f"/api/admin/evidence/{file_id}", headers={**admin, **headers}))
+    return get
+
+
+def test_whole_file(download):
+    response = download()
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(CONTENT))
+
+
+@pytest.mark.parametrize("header,start,end", [
+    ("bytes=0-0", 0, 0),
+    (f"bytes={CHUNK - 10}-{CHUNK + 9}", CHUNK - 10, CHUNK + 9),
+    (f"bytes={2 * CHUNK}-", 2 * CHUNK, len(CONTENT) - 1),
+    ("bytes=-100", len(CONTENT) - 100, len(CONTENT) - 1),
+    (f"bytes=100-{10 * len(CONTENT)}", 100, len(CONTENT) - 1),
+])
+def test_ranges(download, header, start, end):
+    response = download(header, **{"Accept-Encoding": "gzip"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert "content-encoding" not in response.headers
+
+
+def test_unsatisfiable_range(download):
+    response = download(f"bytes={len(CONTENT)}-")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,5-6", "items=0-10", "bytes=a-b"])
+def test_ignored_range_headers(download, header):
+    response = download(header)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_only_overlapping_chunks_are_decrypted(server, download, monkeypatch):
+    decrypted = []
+    decrypt_chunk = server.EvidenceStreamInfo.decrypt_chunk
+
+    def counting_decrypt(self, key, index, encrypted):
+        decrypted.append(index)
+        return decrypt_chunk(self, key, index, encrypted)
+    monkeypatch.setattr(server.EvidenceStreamInfo, "decrypt_chunk", counting_decrypt)
+
+    assert download(f"bytes={CHUNK + 5}-{CHUNK + 50}").status_code == 206
+    assert decrypted == [1]
+
+
+def test_empty_file(api, run, admin, upload_evidence):
+    file_id = upload_evidence(b"")["file_id"]
+    response = run(api.get(f"/api/admin/evidence/{file_id}", headers=admin))
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_missing_object(server, db, run, download, tmp_path):
+    for path in tmp_path.iterdir():
+        path.unlink()
+    assert download().status_code == 404
@@ -0,0 +1,147 @@
+"""
+Tests for moderation previews of image evidence
+1. A preview is rendered after upload and served as JPEG (202 while rendering)
+2. A render whose worker died (stale claim) is re-claimed; a live claim is left alone
+3. A failed render is retried with backoff, not treated as final; undecodable images are final
+4. A worker whose claim was taken over does not record its result
+"""
+import asyncio
+import io
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from PIL import Image
+
+
+def png(color="red", size=(64, 48)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin_1", admin=True)
+
+
+def settle(server, run):
+    """Wait for the scheduled preview renders"""
+    async def wait():
+        await asyncio.gather(*list(server._background_tasks))
+    run(wait())
+
+
+def get_preview(api, run, admin, file_id):
+    return run(api.get(f"/api/admin/evidence/{file_id}/preview", headers=admin))
+
+
+def blob_preview(db, run):
+    return run(db.evidence_blobs.find_one({}))["preview"]
+
+
+def set_preview(db, run, preview):
+    run(db.evidence_blobs.update_many({}, {"$set": {"preview": preview}}))
+
+
+class TestRender:
+    def test_rendered_after_upload(self, server, db, api, run, admin, upload_evidence):
+        uploaded = upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+
+        response = get_preview(api, run, admin, uploaded["file_id"])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert Image.open(io.BytesIO(response.content)).size == (64, 48)
+
+    def test_pending_answers_202(self, server, db, api, run, admin, upload_evidence):
+        uploaded = upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+        set_preview(db, run, {"status": "pending", "claim_id": "live", "claimed_at": datetime.now(timezone.utc)})
+
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 202
+        settle(server, run)
+        # A live claim is not taken over
+        assert blob_preview(db, run)["claim_id"] == "live"
+
+    def test_non_image_has_no_preview(self, server, api, run, admin, upload_evidence):
+        uploaded = upload_evidence(b"%PDF-1.4 letter")
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 404
+
+
+class TestRecovery:
+    def test_stale_claim_is_reclaimed(self, server, db, api, run, admin, upload_evidence):
+        uploaded = upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+        # The worker rendering it died an hour ago
+        set_preview(db, run, {"status": "pending", "claim_id": "dead",
+                              "claimed_at": datetime.now(timezone.utc) - timedelta(hours=1)})
+
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 202
+        settle(server, run)
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 200
+
+    def test_failure_is_retried_with_backoff(self, server, db, api, run, admin, upload_evidence, monkeypatch):
+        read = server.read_evidence_plaintext
+        calls = []
+
+        async def flaky_read(evidence):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("storage unavailable")
+            return await read(evidence)
+        monkeypatch.setattr(server, "read_evidence_plaintext", flaky_read)
+
+        uploaded = upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+        preview = blob_preview(db, run)
+        assert (preview["status"], preview["attempts"]) == ("failed", 1)
+
+        # Not due yet: unavailable for now, nothing scheduled
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 404
+        assert not server._background_tasks
+
+        run(db.evidence_blobs.update_many({}, {"$set": {"preview.retry_at": datetime.now(timezone.utc)}}))
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 202
+        settle(server, run)
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 200
+
+    def test_backoff_doubles(self, server, db, run, upload_evidence, monkeypatch):
+        async def broken_read(evidence):
+            raise OSError("storage unavailable")
+        monkeypatch.setattr(server, "read_evidence_plaintext", broken_read)
+
+        upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+        run(db.evidence_blobs.update_many({}, {"$set": {"preview.retry_at": datetime.now(timezone.utc)}}))
+        before = datetime.now(timezone.utc)
+        run(server.generate_evidence_preview(run(db.evidence_blobs.find_one({}))["content_hash"]))
+
+        preview = blob_preview(db, run)
+        assert preview["attempts"] == 2
+        delay = server._as_datetime(preview["retry_at"]) - before
+        assert timedelta(seconds=server.EVIDENCE_PREVIEW_RETRY_SECONDS * 2 - 5) < delay <= timedelta(
+            seconds=server.EVIDENCE_PREVIEW_RETRY_SECONDS * 2 + 5)
+
+    def test_undecodable_image_is_final(self, server, db, api, run, admin, upload_evidence):
+        uploaded = upload_evidence(b"not really a png", filename="letter.png", mime_type="image/png")
+        settle(server, run)
+        assert blob_preview(db, run)["status"] == "unsupported"
+        assert get_preview(api, run, admin, uploaded["file_id"]).status_code == 404
+        assert not server._background_tasks
+
+    def test_taken_over_claim_does_not_record(self, server, db, run, upload_evidence, monkeypatch, tmp_path):
+        encrypt_bytes = server.encrypt_bytes
+
+        async def slow_encrypt(data, storage, key):
+            # Meanwhile the claim expired and another worker took it over
+            await db.evidence_blobs.update_many({}, {"$set": {"preview.claim_id": "other"}})
+            return await encrypt_bytes(data, storage, key)
+        monkeypatch.setattr(server, "encrypt_bytes", slow_encrypt)
+
+        upload_evidence(png(), filename="letter.png", mime_type="image/png")
+        settle(server, run)
+
+        preview = blob_preview(db, run)
+        assert (preview["status"], preview["claim_id"]) == ("pending", "other")
+        # Only the blob itself is stored: the late worker's preview object was removed
+        assert len(list(tmp_path.iterdir())) == 1
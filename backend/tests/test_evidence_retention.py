@@ -0,0 +1,83 @@
+"""
+Tests for the evidence retention sweep
+1. Expired evidence is deleted, its submission unlinked and an unshared blob reclaimed
+2. A sweep that dies after releasing references is finished by the next run
+   without releasing them twice
+3. Evidence marked for deletion is no longer served
+"""
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import fail_once
+
+SWEEP_JOB = {"job_id": "evidence_retention_sweep"}
+
+
+def expire(db, run, file_id):
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    run(db.evidence_files.update_one({"file_id": file_id}, {"$set": {"retention_until": past}}))
+
+
+def blob(db, run):
+    return run(db.evidence_blobs.find_one({}, {"_id": 0}))
+
+
+def test_expired_evidence_is_reclaimed(server, db, run, upload_evidence):
+    kept = upload_evidence(b"shared content")
+    expired = upload_evidence(b"shared content")
+    alone = upload_evidence(b"only copy")
+    expire(db, run, expired["file_id"])
+    expire(db, run, alone["file_id"])
+
+    run(server.run_retention_sweep(SWEEP_JOB))
+
+    assert [doc["file_id"] for doc in run(db.evidence_files.find({}).to_list(None))] == [kept["file_id"]]
+    blobs = run(db.evidence_blobs.find({}, {"_id": 0}).to_list(None))
+    assert len(blobs) == 1 and blobs[0]["ref_count"] == 1 and not blobs[0].get("released_file_ids")
+    submission = run(db.submissions.find_one({"submission_id": expired["submission_id"]}))
+    assert "evidence_file_id" not in submission
+
+
+def test_rerun_after_crash_releases_once(server, db, run, upload_evidence, patch_collection):
+    upload_evidence(b"shared content")
+    expired = upload_evidence(b"shared content")
+    expire(db, run, expired["file_id"])
+
+    async def crash(original, collection, *args, **kwargs):
+        raise RuntimeError("process killed")
+    patch_collection("delete_many", "evidence_files", fail_once(crash))
+
+    with pytest.raises(RuntimeError):
+        run(server.run_retention_sweep(SWEEP_JOB))
+    assert blob(db, run)["ref_count"] == 1
+    assert run(db.evidence_files.find_one({"file_id": expired["file_id"]}))["deleting_at"]
+
+    run(server.run_retention_sweep(SWEEP_JOB))
+    assert blob(db, run)["ref_count"] == 1
+    assert not blob(db, run).get("released_file_ids")
+    assert run(db.evidence_files.count_documents({})) == 1
+
+
+def test_new_generation_is_not_released(server, db, run, upload_evidence, patch_collection):
+    expired = upload_evidence(b"content")
+    expire(db, run, expired["file_id"])
+
+    async def crash(original, collection, *args, **kwargs):
+        raise RuntimeError("process killed")
+    patch_collection("delete_many", "evidence_files", fail_once(crash))
+    with pytest.raises(RuntimeError):
+        run(server.run_retention_sweep(SWEEP_JOB))
+    assert run(db.evidence_blobs.count_documents({})) == 0
+
+    # The same content is uploaded again before the sweep reruns
+    upload_evidence(b"content")
+    run(server.run_retention_sweep(SWEEP_JOB))
+    assert blob(db, run)["ref_count"] == 1
+
+
+def test_marked_evidence_is_not_served(server, db, api, run, upload_evidence, make_user):
+    evidence = upload_evidence(b"content")
+    run(db.evidence_files.update_one({"file_id": evidence["file_id"]}, {"$set": {"deleting_at": "now"}}))
+    headers = make_user("admin_1", admin=True)
+    assert run(api.get(f"/api/admin/evidence/{evidence['file_id']}", headers=headers)).status_code == 404
@@ -0,0 +1,86 @@
+"""
+Tests for re-encrypting evidence under a new primary key
+1. Every file stays readable and blobs are merged with their primary-key twins
+2. A merge target being reclaimed is left alone (the blob is skipped, nothing lost)
+3. A merge counts the references it actually moved
+"""
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+
+@pytest.fixture
+def rotate(server, monkeypatch):
+    """Make a fresh key primary, keeping the current one for decryption"""
+    old_secret = Fernet.generate_key().decode()
+    monkeypatch.setattr(server, "evidence_keyring", server.EvidenceKeyring([old_secret]))
+
+    def rotate_keys():
+        new_secret = Fernet.generate_key().decode()
+        monkeypatch.setattr(server, "evidence_keyring", server.EvidenceKeyring([new_secret, old_secret]))
+        return new_secret
+    return rotate_keys
+
+
+def read_evidence(api, run, headers, file_id):
+    response = run(api.get(f"/api/admin/evidence/{file_id}", headers=headers))
+    assert response.status_code == 200
+    return response.content
+
+
+def blobs(db, run):
+    return run(db.evidence_blobs.find({}, {"_id": 0}).to_list(None))
+
+
+def test_rotation_keeps_every_file_readable(server, db, api, run, make_user, upload_evidence, rotate, tmp_path,
+                                           monkeypatch):
+    admin = make_user("admin_1", admin=True)
+    shared, single = os.urandom(150_000), os.urandom(70_000)
+    files = {upload_evidence(shared)["file_id"]: shared, upload_evidence(shared)["file_id"]: shared,
+             upload_evidence(single)["file_id"]: single}
+
+    new_secret = rotate()
+    # The same content uploaded under the new key: the old blob is merged into it
+    files[upload_evidence(single)["file_id"]] = single
+    run(server.run_evidence_rewrap({"job_id": server.REWRAP_JOB_ID}))
+
+    monkeypatch.setattr(server, "evidence_keyring", server.EvidenceKeyring([new_secret]))
+    assert all(read_evidence(api, run, admin, file_id) == content for file_id, content in files.items())
+    assert sorted(blob["ref_count"] for blob in blobs(db, run)) == [2, 2]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_merge_into_reclaimed_blob_is_skipped(server, db, api, run, make_user, upload_evidence, rotate, tmp_path):
+    admin = make_user("admin_1", admin=True)
+    content = os.urandom(10_000)
+    old_file = upload_evidence(content)["file_id"]
+    old_blob = blobs(db, run)[0]
+
+    rotate()
+    upload_evidence(content)
+    # The new blob dropped to zero references and is about to be reclaimed
+    run(db.evidence_blobs.update_one({"content_hash": {"$ne": old_blob["content_hash"]}}, {"$set": {"ref_count": 0}}))
+
+    assert run(server.rewrap_blob(old_blob)) == ("skipped", 0)
+    assert run(db.evidence_blobs.find_one({"content_hash": old_blob["content_hash"]}))["ref_count"] == 1
+    assert read_evidence(api, run, admin, old_file) == content
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_merge_counts_the_files_it_moved(server, db, run, upload_evidence, rotate):
+    content = os.urandom(10_000)
+    upload_evidence(content)
+    swept = upload_evidence(content)["file_id"]
+    stale_snapshot = blobs(db, run)[0]
+    assert stale_snapshot["ref_count"] == 2
+
+    rotate()
+    upload_evidence(content)
+    # One old file disappears after the snapshot was taken
+    run(db.evidence_files.delete_one({"file_id": swept}))
+
+    status, _ = run(server.rewrap_blob(stale_snapshot))
+    assert status == "rewrapped"
+    assert [blob["ref_count"] for blob in blobs(db, run)] == [2]
+    assert run(db.evidence_files.count_documents({"content_hash": stale_snapshot["content_hash"]})) == 0
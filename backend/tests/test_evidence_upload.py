@@ -0,0 +1,173 @@
+"""
+Tests for evidence uploads
+1. Re-uploading evidence for a submission releases the replaced file's blob;
+   the response never says whether the content was already stored
+2. Oversized bodies are refused before they are read or parsed
+3. The stream-v1 chunk format: round trips (empty, exact chunk multiples)
+   and tampering (truncated, reordered chunks) failing authentication
+"""
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+
+def blobs(db, run):
+    return run(db.evidence_blobs.find({}, {"_id": 0}).to_list(None))
+
+
+class TestReupload:
+    def test_replaced_evidence_is_released(self, db, run, upload_evidence, tmp_path):
+        first = upload_evidence(b"first version")
+        second = upload_evidence(b"second version", submission_id=first["submission_id"])
+
+        assert [doc["file_id"] for doc in run(db.evidence_files.find({}).to_list(None))] == [second["file_id"]]
+        assert [blob["ref_count"] for blob in blobs(db, run)] == [1]
+        assert len(list(tmp_path.iterdir())) == 1
+        submission = run(db.submissions.find_one({"submission_id": first["submission_id"]}))
+        assert submission["evidence_file_id"] == second["file_id"]
+
+    def test_same_content_again_keeps_one_reference(self, db, run, upload_evidence):
+        first = upload_evidence(b"same")
+        upload_evidence(b"same", submission_id=first["submission_id"])
+        assert [blob["ref_count"] for blob in blobs(db, run)] == [1]
+        assert run(db.evidence_files.count_documents({})) == 1
+
+    def test_shared_blob_survives_replacement(self, db, run, upload_evidence):
+        first = upload_evidence(b"shared")
+        upload_evidence(b"shared")
+        upload_evidence(b"other", submission_id=first["submission_id"])
+        assert sorted(blob["ref_count"] for blob in blobs(db, run)) == [1, 1]
+
+    def test_response_does_not_reveal_deduplication(self, db, run, upload_evidence):
+        first = upload_evidence(b"decision letter")
+        second = upload_evidence(b"decision letter")
+        assert set(first) == set(second) == {"file_id", "status", "submission_id"}
+        assert [blob["ref_count"] for blob in blobs(db, run)] == [2]
+
+
+class TestSizeLimit:
+    def call_app(self, server, run, headers, body_parts):
+        """Drive the ASGI app directly; returns (status, number of body reads)"""
+        messages, reads = [], []
+
+        async def receive():
+            reads.append(1)
+            if len(reads) <= len(body_parts):
+                return {"type": "http.request", "body": body_parts[len(reads) - 1],
+                        "more_body": len(reads) < len(body_parts)}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/api/submissions/sub_1/evidence", "raw_path": b"/api/submissions/sub_1/evidence",
+            "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("127.0.0.1", 1),
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        }
+        run(server.app(scope, receive, send))
+        return messages[0]["status"], len(reads)
+
+    @pytest.fixture
+    def small_limit(self, server):
+        # The middleware holds this list: change it in place
+        original = server.BODY_SIZE_LIMITS[0]
+        server.BODY_SIZE_LIMITS[0] = (original[0], 1000, original[2])
+        yield
+        server.BODY_SIZE_LIMITS[0] = original
+
+    def test_declared_length_is_refused_unread(self, server, run, make_user, small_limit):
+        headers = {**make_user("user_1"), "Content-Type": "multipart/form-data; boundary=x", "Content-Length": "5000"}
+        status, reads = self.call_app(server, run, headers, [b"x" * 5000])
+        assert (status, reads) == (413, 0)
+
+    def test_chunked_body_is_cut_off(self, server, run, make_user, small_limit):
+        headers = {**make_user("user_1"), "Content-Type": "multipart/form-data; boundary=x"}
+        opening = b'--x\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n\r\n'
+        status, reads = self.call_app(server, run, headers, [opening] + [b"x" * 600] * 10)
+        assert status == 413
+        assert reads == 3
+
+    def test_file_over_the_limit_is_rejected(self, server, api, run, upload_evidence, monkeypatch):
+        monkeypatch.setattr(server, "MAX_EVIDENCE_BYTES", 100_000)
+        run(server.db.submissions.insert_one({"submission_id": "sub_1", "user_hashed_id": "hashed_user_evidence"}))
+        response = run(api.post("/api/submissions/sub_1/evidence", headers=upload_evidence.headers,
+                                files={"file": ("big.pdf", os.urandom(100_001), "application/pdf")}))
+        assert response.status_code == 413
+        assert run(server.db.evidence_blobs.count_documents({})) == 0
+
+
+class TestStreamFormat:
+    @pytest.fixture
+    def storage(self, server):
+        return server.get_evidence_storage("local")
+
+    def encrypt(self, server, run, data, block_size=10_000):
+        async def blocks():
+            for offset in range(0, len(data), block_size):
+                yield data[offset:offset + block_size]
+        key = f"blob_{os.urandom(4).hex()}"
+        assert run(server.encrypt_stream(blocks(), server.get_evidence_storage("local"), key)) == len(data)
+        return {"storage_backend": "local", "storage_key": key, "encryption": server.EVIDENCE_FORMAT_STREAM}
+
+    def decrypt(self, server, run, evidence):
+        async def read():
+            source = await server.open_evidence_source(evidence)
+            return b"".join([chunk async for chunk in source.iter_all()])
+        return run(read())
+
+    @pytest.mark.parametrize("size", [0, 1, 65_536, 2 * 65_536, 3 * 65_536 + 17])
+    def test_round_trip(self, server, run, size):
+        data = os.urandom(size)
+        assert self.decrypt(server, run, self.encrypt(server, run, data)) == data
+
+    def test_exact_multiple_has_no_empty_trailing_chunk(self, server, run, storage):
+        evidence = self.encrypt(server, run, os.urandom(2 * server.EVIDENCE_CHUNK_SIZE))
+        stored = storage.path(evidence["storage_key"]).stat().st_size
+        assert stored == server.EVIDENCE_HEADER.size + 2 * (server.EVIDENCE_CHUNK_SIZE + server.EVIDENCE_TAG_SIZE)
+
+    def test_ranged_read_within_and_across_chunks(self, server, run):
+        data = os.urandom(3 * server.EVIDENCE_CHUNK_SIZE + 17)
+        evidence = self.encrypt(server, run, data)
+
+        async def read(start, end):
+            source = await server.open_evidence_source(evidence)
+            return b"".join([chunk async for chunk in source.iter_range(start, end)])
+        for start, end in [(0, 0), (10, 70_000), (server.EVIDENCE_CHUNK_SIZE - 1, server.EVIDENCE_CHUNK_SIZE), (len(data) - 5, len(data) - 1)]:
+            assert run(read(start, end)) == data[start:end + 1]
+
+    @pytest.mark.parametrize("size,cut", [
+        (3 * 65_536 + 17, 17 + 16),   # final chunk dropped
+        (3 * 65_536, 65_536 + 16),    # exact multiple: final (full) chunk dropped
+        (3 * 65_536 + 17, 5),         # final chunk cut short
+        (0, 16),                      # empty file: only the header left
+        (0, 3),                       # empty file: tag cut short
+    ])
+    def test_truncation_is_detected(self, server, run, storage, size, cut):
+        evidence = self.encrypt(server, run, os.urandom(size))
+        path = storage.path(evidence["storage_key"])
+        path.write_bytes(path.read_bytes()[:-cut])
+        with pytest.raises((InvalidTag, ValueError)):
+            self.decrypt(server, run, evidence)
+
+    def test_reordered_chunks_are_detected(self, server, run, storage):
+        evidence = self.encrypt(server, run, os.urandom(3 * server.EVIDENCE_CHUNK_SIZE + 17))
+        path = storage.path(evidence["storage_key"])
+        raw = path.read_bytes()
+        header, size = server.EVIDENCE_HEADER.size, server.EVIDENCE_CHUNK_SIZE + server.EVIDENCE_TAG_SIZE
+        first, second = raw[header:header + size], raw[header + size:header + 2 * size]
+        path.write_bytes(raw[:header] + second + first + raw[header + 2 * size:])
+        with pytest.raises(InvalidTag):
+            self.decrypt(server, run, evidence)
+
+    @pytest.mark.parametrize("size", [0, 1000])
+    def test_flipped_bit_is_detected(self, server, run, storage, size):
+        evidence = self.encrypt(server, run, os.urandom(size))
+        path = storage.path(evidence["storage_key"])
+        raw = bytearray(path.read_bytes())
+        raw[-1] ^= 1
+        path.write_bytes(bytes(raw))
+        with pytest.raises(InvalidTag):
+            self.decrypt(server, run, evidence)
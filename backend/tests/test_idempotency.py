@@ -0,0 +1,97 @@
+"""
+Tests for Idempotency-Key on POST /submissions
+1. A retry replays the first response without creating a second submission
+2. A live reservation answers 409; an expired one is taken over by the retry
+3. A request that lost its lease can neither complete nor release the key
+"""
+import hashlib
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+SUBMISSION = {
+    "scientific_area_grande": "1", "manuscript_type": "experimental", "decision_type": "desk_reject",
+    "reviewer_count": "0", "time_to_decision": "0-30", "apc_range": "no_apc", "review_comments": [],
+    "editor_comments": "no", "perceived_coherence": "yes", "journal_id": "journal_1", "publisher_id": "pub_1"
+}
+
+
+@pytest.fixture
+def headers(make_user):
+    return {**make_user("user_1"), "Idempotency-Key": "key-1"}
+
+
+def reserve(db, run, lease_until, fingerprint=None):
+    from server import SubmissionCreate
+    fingerprint = fingerprint or hashlib.sha256(SubmissionCreate(**SUBMISSION).model_dump_json().encode()).hexdigest()
+    run(db.idempotency_keys.insert_one({
+        "key": "user_1:key-1", "fingerprint": fingerprint, "status": "in_progress", "lease_id": "crashed",
+        "in_progress_until": lease_until, "created_at": datetime.now(timezone.utc)
+    }))
+
+
+def test_retry_replays_the_first_response(db, api, run, headers):
+    first = run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    second = run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert run(db.submissions.count_documents({})) == 1
+
+
+def test_key_reused_with_another_payload(api, run, headers):
+    run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    response = run(api.post("/api/submissions", json={**SUBMISSION, "decision_type": "accept"}, headers=headers))
+    assert response.status_code == 422
+
+
+def test_live_reservation_is_a_conflict(db, api, run, headers):
+    reserve(db, run, datetime.now(timezone.utc) + timedelta(minutes=1))
+    response = run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    assert response.status_code == 409
+    assert "retry-after" in response.headers
+    assert run(db.submissions.count_documents({})) == 0
+
+
+def test_expired_reservation_is_taken_over(db, api, run, headers):
+    reserve(db, run, datetime.now(timezone.utc) - timedelta(seconds=1))
+    response = run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    assert response.status_code == 200
+    record = run(db.idempotency_keys.find_one({"key": "user_1:key-1"}))
+    assert record["status"] == "completed" and record["lease_id"] != "crashed"
+    assert run(api.post("/api/submissions", json=SUBMISSION, headers=headers)).json() == response.json()
+
+
+def test_reservation_without_lease_is_taken_over(db, api, run, headers):
+    reserve(db, run, None)
+    run(db.idempotency_keys.update_one({"key": "user_1:key-1"}, {"$unset": {"in_progress_until": ""}}))
+    assert run(api.post("/api/submissions", json=SUBMISSION, headers=headers)).status_code == 200
+
+
+def test_superseded_request_cannot_complete_or_release(server, db, run):
+    reserve(db, run, datetime.now(timezone.utc) - timedelta(seconds=1), fingerprint="f")
+    assert run(server.get_idempotent_response("user_1", "key-1", "f", "retry")) is None
+
+    run(server.save_idempotent_response("user_1", "key-1", "crashed", {"stale": True}))
+    run(server.release_idempotency_key("user_1", "key-1", "crashed"))
+    record = run(db.idempotency_keys.find_one({"key": "user_1:key-1"}))
+    assert record["status"] == "in_progress" and record["lease_id"] == "retry"
+
+    run(server.save_idempotent_response("user_1", "key-1", "retry", {"ok": True}))
+    assert run(server.get_idempotent_response("user_1", "key-1", "f", "later")) == {"ok": True}
+
+
+def test_failed_request_releases_the_key(server, db, api, run, headers, monkeypatch):
+    create = server._create_submission
+    calls = []
+
+    async def fail_first(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return await create(*args, **kwargs)
+    monkeypatch.setattr(server, "_create_submission", fail_first)
+
+    with pytest.raises(RuntimeError):
+        run(api.post("/api/submissions", json=SUBMISSION, headers=headers))
+    assert run(db.idempotency_keys.count_documents({})) == 0
+    assert run(api.post("/api/submissions", json=SUBMISSION, headers=headers)).status_code == 200
@@ -0,0 +1,128 @@
+"""
+Tests for the in-memory journal search (no MongoDB needed)
+1. PrefixIndex ranking: exact > name prefix > word prefix, alphabetical within a rank
+2. Replacing entries through add / add_many (in place and bulk paths) leaves no stale suffixes
+3. search_journals: fuzzy fill-up after the prefix matches, publisher filtering on both
+"""
+import pytest
+
+import server
+
+JOURNALS = [
+    ("j_phys", "Journal of Physics", "pub_acme"),
+    ("j_phys_a", "Journal of Physics A", "pub_acme"),
+    ("j_appl", "Applied Physics Letters", "pub_other"),
+    ("j_phys_rev", "Physical Review", "pub_other"),
+    ("j_chem", "Journal of Chemistry", "pub_acme"),
+]
+
+
+def ids(results):
+    return [result[1] for result in results]
+
+
+@pytest.fixture
+def index():
+    index = server.PrefixIndex()
+    index.add_many([(journal_id, server.normalize_name_key(name), {"publisher_id": publisher_id})
+                    for journal_id, name, publisher_id in JOURNALS])
+    return index
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """Fresh process-wide journal indexes holding JOURNALS"""
+    monkeypatch.setattr(server, "journal_name_index", server.TrigramIndex())
+    monkeypatch.setattr(server, "journal_prefix_index", server.PrefixIndex())
+    server.index_journal_names([
+        {"journal_id": journal_id, "name": name, "publisher_id": publisher_id}
+        for journal_id, name, publisher_id in JOURNALS
+    ])
+
+
+class TestRanking:
+    def test_exact_then_prefix_then_word_prefix(self, index):
+        results = index.search("journal of physics")
+        assert results[0][:2] == (server.PrefixIndex.EXACT, "j_phys")
+        assert results[1][:2] == (server.PrefixIndex.PREFIX, "j_phys_a")
+
+        results = index.search("phys")
+        assert [rank for rank, _, _ in results] == sorted(rank for rank, _, _ in results)
+        assert ids(results) == ["j_phys_rev", "j_appl", "j_phys", "j_phys_a"]
+        assert results[0][0] == server.PrefixIndex.PREFIX
+        assert {rank for rank, _, _ in results[1:]} == {server.PrefixIndex.WORD_PREFIX}
+
+    def test_best_rank_wins_for_an_entry(self):
+        index = server.PrefixIndex()
+        index.add("j1", "physics and physics")
+        assert index.search("physics") == [(server.PrefixIndex.PREFIX, "j1", None)]
+
+    def test_limit_accept_and_empty_prefix(self, index):
+        assert len(index.search("journal", limit=2)) == 2
+        assert ids(index.search("journal", accept=lambda payload: payload["publisher_id"] == "pub_other")) == []
+        assert ids(index.search("phys", accept=lambda payload: payload["publisher_id"] == "pub_other")) == [
+            "j_phys_rev", "j_appl"]
+        assert index.search("") == []
+        assert index.search("zzz") == []
+
+
+class TestReplace:
+    def test_add_replaces_the_old_key(self, index):
+        index.add("j_phys", "quantum matter", {"publisher_id": "pub_acme"})
+        assert "j_phys" not in ids(index.search("journal of physics"))
+        assert ids(index.search("matter")) == ["j_phys"]
+        assert len(index._suffixes) == sum(len(entry[2]) for entry in index._entries.values())
+
+    @pytest.mark.parametrize("filler", [0, server.PrefixIndex.INSORT_MAX_BATCH + 1])
+    def test_add_many_replaces_in_both_paths(self, index, filler):
+        batch = [(f"filler_{i}", f"filler journal {i}", None) for i in range(filler)]
+        batch += [("j_chem", "stale name", None), ("j_chem", "inorganic chemistry", {"publisher_id": "pub_acme"})]
+        index.add_many(batch)
+
+        # The last tuple for an id wins; the old and intermediate keys are gone
+        assert ids(index.search("inorganic")) == ["j_chem"]
+        assert index.search("stale") == []
+        assert "j_chem" not in ids(index.search("journal of chemistry"))
+        assert index._suffixes == sorted(index._suffixes)
+        assert len(index._suffixes) == sum(len(entry[2]) for entry in index._entries.values())
+
+    def test_remove(self, index):
+        index.remove("j_phys_a")
+        index.remove("missing")
+        assert ids(index.search("journal of physics")) == ["j_phys"]
+
+
+class TestSearchJournals:
+    def test_match_types(self, catalog):
+        results = server.search_journals("Journal of Physics", limit=3)
+        assert [(r["journal_id"], r["match"]) for r in results[:2]] == [("j_phys", "exact"), ("j_phys_a", "prefix")]
+
+        results = server.search_journals("letters")
+        assert [(r["journal_id"], r["match"]) for r in results] == [("j_appl", "word_prefix")]
+
+    def test_typos_fill_up_with_fuzzy_matches(self, catalog):
+        results = server.search_journals("jornal of physics", limit=3)
+        assert results and all(r["match"] == "fuzzy" for r in results)
+        assert results[0]["journal_id"] == "j_phys"
+        assert results == sorted(results, key=lambda r: -r["similarity"])
+
+    def test_prefix_matches_come_before_fuzzy(self, catalog):
+        results = server.search_journals("journal of ph", limit=5)
+        matches = [r["match"] for r in results]
+        assert matches[:2] == ["prefix", "prefix"]
+        assert set(matches[2:]) <= {"fuzzy"}
+        assert len({r["journal_id"] for r in results}) == len(results)
+
+    def test_short_queries_are_not_fuzzy(self, catalog):
+        assert server.search_journals("jx") == []
+
+    def test_publisher_filter(self, catalog):
+        results = server.search_journals("phys", publisher_id="pub_acme")
+        assert {r["journal_id"] for r in results} == {"j_phys", "j_phys_a"}
+
+        fuzzy = server.search_journals("physcal reveiw", publisher_id="pub_acme")
+        assert all(r["publisher_id"] == "pub_acme" for r in fuzzy)
+        assert "j_phys_rev" in {r["journal_id"] for r in server.search_journals("physcal reveiw")}
+
+    def test_limit(self, catalog):
+        assert len(server.search_journals("journal", limit=2)) == 2
@@ -0,0 +1,96 @@
+"""
+Tests for moderation status changes
+1. Bulk moderation applies counter effects per actual transition (trust_score clamped after each)
+2. A submission moderated concurrently (after it was read) is skipped, not double-counted
+3. The single-submission endpoint refuses to overwrite a concurrent change
+"""
+import pytest
+
+from conftest import fail_once
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin_1", admin=True)
+
+
+@pytest.fixture
+def submissions(db, run):
+    run(db.users.insert_one({"user_id": "author", "hashed_id": "h_author", "trust_score": 50,
+                             "validated_count": 0, "flagged_count": 0}))
+    run(db.journals.insert_one({"journal_id": "journal_1", "name": "J", "validated_submission_count": 1}))
+    run(db.publishers.insert_one({"publisher_id": "pub_1", "name": "P", "validated_submission_count": 1}))
+    docs = [{"submission_id": f"sub_{i}", "status": status, "user_hashed_id": "h_author",
+             "journal_id": "journal_1", "publisher_id": "pub_1"}
+            for i, status in enumerate(["pending", "pending", "flagged", "validated"])]
+    run(db.submissions.insert_many(docs))
+    return [doc["submission_id"] for doc in docs]
+
+
+def moderate_bulk(server, api, run, admin, ids, status):
+    response = run(api.post("/api/admin/submissions/moderate-bulk", headers=admin,
+                            json={"submission_ids": ids, "status": status}))
+    assert response.status_code == 200
+    run(server.side_effects.drain())  # the counter ops wait in the outbox
+    return response.json()
+
+
+def author(db, run):
+    return run(db.users.find_one({"hashed_id": "h_author"}, {"_id": 0}))
+
+
+def journal_count(db, run):
+    return run(db.journals.find_one({"journal_id": "journal_1"}))["validated_submission_count"]
+
+
+def test_bulk_effects_follow_each_old_status(server, db, api, run, admin, submissions):
+    report = moderate_bulk(server, api, run, admin, submissions, "validated")
+    assert (report["updated"], report["unchanged"], report["conflicts"]) == (3, 1, 0)
+
+    user = author(db, run)
+    assert user["validated_count"] == 3
+    assert user["trust_score"] == 100  # 50 + 3 * 20, clamped at 100
+    assert journal_count(db, run) == 4
+    assert run(db.moderation_logs.count_documents({"bulk": True})) == 3
+
+
+def test_bulk_trust_score_is_clamped_per_transition(server, db, api, run, admin, submissions):
+    run(db.users.update_one({"hashed_id": "h_author"}, {"$set": {"trust_score": 90}}))
+    # sub_2 flagged -> pending: +15 (clamped at 100), then sub_3 validated -> pending: -20
+    moderate_bulk(server, api, run, admin, submissions[2:], "pending")
+    assert author(db, run)["trust_score"] == 80
+
+
+def test_concurrent_change_is_skipped(server, db, api, run, admin, submissions, patch_collection):
+    async def moderated_meanwhile(original, collection, *args, **kwargs):
+        # Another moderator validates sub_0 between the read and the bulk write
+        await collection.update_one({"submission_id": "sub_0"}, {"$set": {"status": "validated"}})
+        return await original(collection, *args, **kwargs)
+    patch_collection("update_many", "submissions", fail_once(moderated_meanwhile))
+
+    report = moderate_bulk(server, api, run, admin, submissions[:2], "validated")
+    assert (report["updated"], report["conflicts"]) == (1, 1)
+    assert author(db, run)["validated_count"] == 1
+    assert journal_count(db, run) == 2
+    logged = run(db.moderation_logs.find({}, {"_id": 0, "submission_id": 1}).to_list(None))
+    assert logged == [{"submission_id": "sub_1"}]
+
+
+def test_bulk_rerun_changes_nothing(server, db, api, run, admin, submissions):
+    moderate_bulk(server, api, run, admin, submissions, "flagged")
+    before = author(db, run), journal_count(db, run)
+    report = moderate_bulk(server, api, run, admin, submissions, "flagged")
+    assert (report["updated"], report["unchanged"]) == (0, 4)
+    assert (author(db, run), journal_count(db, run)) == before
+
+
+def test_single_moderation_refuses_a_concurrent_change(db, api, run, admin, submissions, patch_collection):
+    async def moderated_meanwhile(original, collection, *args, **kwargs):
+        await collection.update_one({"submission_id": "sub_0"}, {"$set": {"status": "flagged"}})
+        return await original(collection, *args, **kwargs)
+    patch_collection("update_one", "submissions", fail_once(moderated_meanwhile))
+
+    response = run(api.put("/api/admin/submissions/sub_0/moderate", headers=admin, json={"status": "validated"}))
+    assert response.status_code == 409
+    assert run(db.submissions.find_one({"submission_id": "sub_0"}))["status"] == "flagged"
+    assert run(db.moderation_logs.count_documents({})) == 0
@@ -0,0 +1,155 @@
+"""
+Tests for the retroactive re-validation job
+1. revalidate_group: duplicate window, changed-only updates
+2. A full run rewrites stale flags and records its progress
+3. A run that fails mid-way resumes from its group checkpoint without re-reading finished groups
+4. The admin endpoints (start, already running, status)
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+FIELDS = {
+    "scientific_area_grande": "1", "manuscript_type": "experimental", "decision_type": "desk_reject",
+    "reviewer_count": "0", "time_to_decision": "0-30", "apc_range": "no_apc", "review_comments": [],
+    "editor_comments": "no", "perceived_coherence": "yes"
+}
+
+
+def submission(i, user="h1", journal="j1", days=0, stale=False, **fields):
+    """A complete submission; `stale` stores flags the current rules disagree with"""
+    doc = {
+        "submission_id": f"sub_{i:04d}", "user_hashed_id": user, "journal_id": journal,
+        "created_at": (START + timedelta(days=days)).isoformat(), **FIELDS, **fields
+    }
+    return doc if stale else {**doc, **stored_flags(doc)}
+
+
+def stored_flags(doc, duplicate=False):
+    from server import evaluate_submission_rules, is_valid_for_stats, mark_duplicate
+    flags = evaluate_submission_rules(doc)
+    if duplicate:
+        mark_duplicate(flags)
+    return {"valid_for_stats": is_valid_for_stats(flags), "validation_flags": flags}
+
+
+def validity(db, run):
+    docs = run(db.submissions.find({}, {"_id": 0, "submission_id": 1, "valid_for_stats": 1}).to_list(None))
+    return {doc["submission_id"]: doc["valid_for_stats"] for doc in docs}
+
+
+def run_job(server, run, restart=False):
+    job = run(server.claim_job(server.REVALIDATION_JOB_ID, restart=restart))
+    run(server.run_claimed_job(job, server.run_submission_revalidation))
+    return run(server.get_job_status(server.REVALIDATION_JOB_ID))
+
+
+class TestGroup:
+    def test_duplicate_window(self, server):
+        group = [submission(1, days=0), submission(2, days=10), submission(3, days=60)]
+        updates = server.revalidate_group(group)
+        assert [u._filter["submission_id"] for u in updates] == ["sub_0002"]
+        assert updates[0]._doc["$set"]["validation_flags"]["is_unique"] is False
+
+    def test_window_chains_from_the_previous_submission(self, server):
+        # Each one is within the window of the one before, not of the first
+        group = [submission(1, days=0), submission(2, days=25), submission(3, days=50)]
+        assert [u._filter["submission_id"] for u in server.revalidate_group(group)] == ["sub_0002", "sub_0003"]
+
+    def test_unchanged_group_has_no_updates(self, server):
+        group = [submission(1, days=0), {**submission(2, days=5, stale=True), **stored_flags(submission(2, days=5), duplicate=True)}]
+        assert server.revalidate_group(group) == []
+
+
+class TestRun:
+    def test_full_run(self, server, db, run):
+        run(db.submissions.insert_many([
+            submission(1, user="h1", days=0),
+            submission(2, user="h1", days=3),                                    # duplicate of sub_0001
+            submission(3, user="h2", stale=True, valid_for_stats=False),         # wrongly invalid
+            submission(4, user="h2", journal="j2", stale=True, valid_for_stats=True,
+                       manuscript_type=None),                                    # wrongly valid
+            submission(5, user="h3", journal="j1", days=3),                      # other user: not a duplicate
+        ]))
+        status = run_job(server, run)
+
+        assert status["status"] == "completed"
+        assert status["progress"] == {"processed": 5, "changed": 3}
+        assert validity(db, run) == {"sub_0001": True, "sub_0002": False, "sub_0003": True,
+                                     "sub_0004": False, "sub_0005": True}
+        assert run(db.submissions.find_one({"submission_id": "sub_0002"}))["validation_flags"]["issues"] == [
+            "duplicate_within_30_days"
+        ]
+
+        # A second run starts over and finds nothing left to change
+        assert run_job(server, run)["progress"] == {"processed": 5, "changed": 0}
+
+    def test_failed_run_resumes_from_checkpoint(self, server, db, run, monkeypatch, patch_collection):
+        monkeypatch.setattr(server, "REVALIDATION_BATCH_SIZE", 2)
+        run(db.submissions.insert_many([
+            submission(i, user=f"h{i // 2}", days=i % 2) for i in range(8)
+        ]))
+        # Every odd submission is a duplicate of the even one before it (same user and journal)
+        run(db.submissions.update_many({}, {"$set": {"valid_for_stats": True, "validation_flags": {}}}))
+
+        writes = []
+
+        async def second_write_fails(original, collection, requests, **kwargs):
+            writes.append(len(requests))
+            if len(writes) == 2:
+                raise RuntimeError("connection lost")
+            return await original(collection, requests, **kwargs)
+        patch_collection("bulk_write", "submissions", second_write_fails)
+
+        status = run_job(server, run)
+        assert status["status"] == "failed" and "connection lost" in status["error"]
+        assert status["checkpoint"] == ["h0", "j1"]
+        assert status["progress"] == {"processed": 2, "changed": 2}
+
+        read = []
+        find = type(db.submissions).find
+
+        def recording_find(collection, query=None, *args, **kwargs):
+            if collection.name == "submissions":
+                read.append(query)
+            return find(collection, query, *args, **kwargs)
+        monkeypatch.setattr(type(db.submissions), "find", recording_find)
+
+        status = run_job(server, run)
+        assert status["status"] == "completed"
+        assert status["progress"] == {"processed": 8, "changed": 8}
+        assert read[0] == {"$or": [{"user_hashed_id": {"$gt": "h0"}}, {"user_hashed_id": "h0", "journal_id": {"$gt": "j1"}}]}
+        assert validity(db, run) == {f"sub_{i:04d}": i % 2 == 0 for i in range(8)}
+
+    def test_restart_ignores_the_checkpoint(self, server, db, run):
+        run(db.submissions.insert_many([submission(1, user="h1"), submission(2, user="h2")]))
+        run(db.job_checkpoints.insert_one({
+            "job_id": server.REVALIDATION_JOB_ID, "status": "failed",
+            "checkpoint": ["h9", "j1"], "progress": {"processed": 40, "changed": 1}
+        }))
+        assert run_job(server, run, restart=True)["progress"] == {"processed": 2, "changed": 0}
+
+
+class TestEndpoint:
+    def test_start_and_status(self, server, db, api, run, make_user):
+        headers = make_user("admin_1", admin=True)
+        run(db.submissions.insert_one(submission(1, stale=True, valid_for_stats=False)))
+
+        async def scenario():
+            started = (await api.post("/api/admin/submissions/revalidate", headers=headers)).json()
+            again = await api.post("/api/admin/submissions/revalidate", headers=headers)
+            await asyncio.gather(*server._background_tasks)
+            return started, again
+
+        started, again = run(scenario())
+        assert started["status"] == "running"
+        assert again.status_code == 409
+
+        status = run(api.get("/api/admin/submissions/revalidate/status", headers=headers)).json()
+        assert status["status"] == "completed" and status["progress"]["changed"] == 1
+        assert validity(db, run) == {"sub_0001": True}
+
+    def test_requires_admin(self, api, run, make_user):
+        headers = make_user("user_1")
+        assert run(api.post("/api/admin/submissions/revalidate", headers=headers)).status_code == 403
+        assert run(api.get("/api/admin/submissions/revalidate/status", headers=headers)).status_code == 403
@@ -0,0 +1,216 @@
+"""
+Tests for the write-behind counter queue and its outbox
+Side effects are recorded in the outbox with the request and each op is applied exactly once:
+1. Recorded ops survive the process: any queue instance drains them
+2. Ops are applied one by one, so trust_score is clamped after each
+3. Follow-ups (catalog version bump, promotion checks) failing after the write
+4. A rejected op is retried with backoff; the ops behind it are not held back
+5. Lost acknowledgement, outbox clean-up failure, a drain dying after its claim
+6. Op ids never show up in API responses
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from conftest import fail_once
+
+
+@pytest.fixture
+def queue(server):
+    return server.SideEffectQueue(flush_interval=0.01, retry_base_seconds=0, stop_timeout=0.2)
+
+
+@pytest.fixture
+def catalog(db, run):
+    run(db.journals.insert_many([
+        {"journal_id": f"journal_{i}", "name": f"Journal {i}", "validated_submission_count": 0} for i in range(3)
+    ]))
+    run(db.users.insert_many([
+        {"user_id": f"user_{i}", "hashed_id": f"h{i}", "trust_score": 50, "validated_count": 0} for i in range(3)
+    ]))
+
+
+def counts(db, run, collection_name="journals", field="validated_submission_count", key="journal_id"):
+    docs = run(db[collection_name].find({}, {"_id": 0}).to_list(None))
+    return {doc[key]: doc.get(field) for doc in docs}
+
+
+def record(server, run, queue, collection_name, match_field, match_value, **increments):
+    run(queue.record([server.counter_op(collection_name, match_field, match_value, **increments)]))
+
+
+def make_due(db, run):
+    """Skip the backoff / claim expiry of every outbox entry"""
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    run(db.side_effect_outbox.update_many({}, {"$set": {"next_attempt_at": past}}))
+
+
+class TestRecord:
+    def test_recorded_ops_wait_in_the_outbox(self, server, db, run, queue, catalog):
+        record(server, run, queue, "journals", "journal_id", "journal_0", validated_submission_count=1)
+        assert run(db.side_effect_outbox.count_documents({})) == 1
+        assert counts(db, run)["journal_0"] == 0
+
+        # Another process (a fresh queue) picks them up
+        run(server.SideEffectQueue().drain())
+        assert counts(db, run)["journal_0"] == 1
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_zero_increments_are_not_recorded(self, server, db, run, queue):
+        run(queue.record([server.counter_op("journals", "journal_id", "journal_0", validated_submission_count=0), None]))
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_trust_score_is_clamped_after_each_op(self, server, db, run, queue, catalog):
+        run(db.users.update_one({"hashed_id": "h0"}, {"$set": {"trust_score": 95}}))
+        record(server, run, queue, "users", "hashed_id", "h0", trust_score=30)
+        record(server, run, queue, "users", "hashed_id", "h0", trust_score=-15)
+        run(queue.drain())
+        # 95 + 30 -> 100, then -15 -> 85 (not 95 + 15 -> 100)
+        assert counts(db, run, "users", "trust_score", "hashed_id")["h0"] == 85
+
+
+class TestFollowUpFailures:
+    """The increments are in; a failing follow-up must not re-apply them"""
+
+    def test_version_bump_failure_does_not_retry(self, server, db, run, queue, catalog, monkeypatch):
+        async def broken_bump():
+            raise RuntimeError("counters unavailable")
+        monkeypatch.setattr(server.CATALOG_VERSION, "bump", broken_bump)
+
+        record(server, run, queue, "journals", "journal_id", "journal_0", validated_submission_count=1)
+        run(queue.drain())
+        make_due(db, run)
+        run(queue.drain())
+
+        assert counts(db, run)["journal_0"] == 1
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_promotion_check_failure_does_not_retry(self, server, db, run, queue, catalog, monkeypatch):
+        async def broken_promotion(journal_ids):
+            raise RuntimeError("promotion failed")
+        monkeypatch.setattr(server, "check_and_promote_journals", broken_promotion)
+
+        record(server, run, queue, "journals", "journal_id", "journal_1", validated_submission_count=2)
+        run(queue.drain())
+
+        assert counts(db, run)["journal_1"] == 2
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+
+class TestWriteFailures:
+    def test_rejected_op_backs_off_alone(self, server, db, run, queue, catalog, patch_collection):
+        async def reject_second(original, collection, requests, **kwargs):
+            await original(collection, requests[:1], **kwargs)
+            raise BulkWriteError({
+                "writeErrors": [{"index": 1, "code": 14, "errmsg": "type mismatch"}],
+                "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+                "nMatched": 1, "nModified": 1, "nRemoved": 0, "upserted": []
+            })
+        patch_collection("bulk_write", "users", fail_once(reject_second))
+
+        for i in range(3):
+            record(server, run, queue, "users", "hashed_id", f"h{i}", validated_count=1)
+        run(queue.drain())
+        assert counts(db, run, "users", "validated_count", "hashed_id") == {"h0": 1, "h1": 0, "h2": 0}
+
+        entries = {doc["match_value"]: doc for doc in run(db.side_effect_outbox.find({}).to_list(None))}
+        assert (entries["h1"]["attempts"], entries["h1"]["last_error"]) == (1, "type mismatch")
+        assert entries["h2"]["attempts"] == 0
+
+        make_due(db, run)
+        run(queue.drain())
+        assert counts(db, run, "users", "validated_count", "hashed_id") == {"h0": 1, "h1": 1, "h2": 1}
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_lost_acknowledgement_is_not_applied_twice(self, server, db, run, queue, catalog, patch_collection):
+        async def apply_then_drop(original, collection, requests, **kwargs):
+            await original(collection, requests, **kwargs)
+            raise AutoReconnect("connection reset")
+        patch_collection("bulk_write", "journals", fail_once(apply_then_drop))
+
+        record(server, run, queue, "journals", "journal_id", "journal_0", validated_submission_count=1)
+        record(server, run, queue, "journals", "journal_id", "journal_2", validated_submission_count=1)
+        run(queue.drain())
+        assert run(db.side_effect_outbox.count_documents({"attempts": 1})) == 2
+
+        make_due(db, run)
+        run(queue.drain())
+        assert counts(db, run) == {"journal_0": 1, "journal_1": 0, "journal_2": 1}
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+        # Settled op ids are removed from the documents
+        assert run(db.journals.count_documents({"pending_counter_ops": {"$exists": True}})) == 0
+
+    def test_outbox_cleanup_failure_does_not_reapply(self, server, db, run, queue, catalog, patch_collection):
+        async def cleanup_fails(original, collection, *args, **kwargs):
+            raise AutoReconnect("connection reset")
+        patch_collection("delete_many", "side_effect_outbox", fail_once(cleanup_fails))
+
+        record(server, run, queue, "journals", "journal_id", "journal_1", validated_submission_count=3)
+        run(queue.drain())
+        assert run(db.side_effect_outbox.count_documents({})) == 1
+        # Still claimed: not retried before the claim expires
+        assert run(queue.drain()) == 0
+
+        make_due(db, run)
+        run(queue.drain())
+        assert counts(db, run)["journal_1"] == 3
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_drain_dying_after_its_claim(self, server, db, run, queue, catalog, patch_collection):
+        async def apply_then_die(original, collection, requests, **kwargs):
+            await original(collection, requests, **kwargs)
+            raise asyncio.CancelledError()
+        patch_collection("bulk_write", "journals", fail_once(apply_then_die))
+
+        record(server, run, queue, "journals", "journal_id", "journal_2", validated_submission_count=1)
+        with pytest.raises(asyncio.CancelledError):
+            run(queue.drain())
+
+        make_due(db, run)  # the claim expired
+        run(server.SideEffectQueue().drain())
+        assert counts(db, run)["journal_2"] == 1
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+
+class TestWorker:
+    def test_stop_drains_recorded_ops(self, server, db, run, queue, catalog):
+        async def scenario():
+            queue.start()
+            await queue.record([server.counter_op("journals", "journal_id", "journal_2", validated_submission_count=1)])
+            await queue.stop()
+
+        run(scenario())
+        assert counts(db, run)["journal_2"] == 1
+        assert run(db.side_effect_outbox.count_documents({})) == 0
+
+    def test_worker_applies_without_a_wakeup(self, server, db, run, queue, catalog):
+        async def scenario():
+            queue.start()
+            # Recorded by another process: only the poll finds it
+            await db.side_effect_outbox.insert_one(
+                server.counter_op("journals", "journal_id", "journal_1", validated_submission_count=1))
+            await asyncio.sleep(0.1)
+            applied = (await db.journals.find_one({"journal_id": "journal_1"}))["validated_submission_count"]
+            await queue.stop()
+            return applied
+
+        assert run(scenario()) == 1
+
+
+class TestPublicDocuments:
+    def test_op_ids_are_not_returned(self, db, api, run, make_user):
+        headers = make_user("user_1", pending_counter_ops=["op_1"])
+        run(db.publishers.insert_one({"publisher_id": "pub_1", "name": "P", "pending_counter_ops": ["op_2"]}))
+        run(db.journals.insert_one({"journal_id": "journal_1", "name": "J", "publisher_id": "pub_1",
+                                    "pending_counter_ops": ["op_3"]}))
+
+        responses = [
+            run(api.get("/api/journals")).json(),
+            run(api.get("/api/journals", params={"limit": 10})).json()["items"],
+            run(api.get("/api/publishers")).json(),
+            [run(api.get("/api/auth/me", headers=headers)).json()],
+        ]
+        for docs in responses:
+            assert docs and all("pending_counter_ops" not in doc for doc in docs)
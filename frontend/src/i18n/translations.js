@@ -70,6 +70,8 @@ const translations = {
       scientificArea: "Scientific Area",
       manuscriptType: "Manuscript Type",
       selectJournal: "Select Journal",
+      searchJournal: "Search journal",
+      searchJournalPlaceholder: "Type a journal name...",
       selectPublisher: "Select Publisher",
       decisionType: "Decision Type",
       reviewerCount: "Number of Reviewers",
@@ -271,6 +273,8 @@ const translations = {
       scientificArea: "Área Científica",
       manuscriptType: "Tipo de Manuscrito",
       selectJournal: "Selecionar Periódico",
+      searchJournal: "Buscar periódico",
+      searchJournalPlaceholder: "Digite o nome do periódico...",
       selectPublisher: "Selecionar Editora",
       decisionType: "Tipo de Decisão",
       reviewerCount: "Número de Revisores",
@@ -472,6 +476,8 @@ const translations = {
       scientificArea: "Área Científica",
       manuscriptType: "Tipo de Manuscrito",
       selectJournal: "Seleccionar Revista",
+      searchJournal: "Buscar revista",
+      searchJournalPlaceholder: "Escriba el nombre de la revista...",
       selectPublisher: "Seleccionar Editorial",
       decisionType: "Tipo de Decisión",
       reviewerCount: "Número de Revisores",
@@ -0,0 +1,63 @@
+// Loads a whole catalog list (/publishers, /journals?publisher_id=...) by
+// following next_cursor; the unpaginated endpoints stop at 1000 rows.
+export async function fetchAllPages(url, pageSize = 1000) {
+  const items = [];
+  const separator = url.includes('?') ? '&' : '?';
+  let cursor = null;
+  do {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(`${url}${separator}limit=${pageSize}${cursorParam}`);
+    if (!response.ok) {
+      throw new Error(`Failed to load ${url}: ${response.status}`);
+    }
+    const page = await response.json();
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
+
+const OPTIONS_VERSION_KEY = 'optionsBundleVersion';
+
+// The ETag of /options/all is the bundle's version (W/ is added by compression only)
+const bundleVersion = (response) => (response.headers.get('ETag') || '').replace(/^W\//, '');
+
+// Loads the /options/all bundle, calling onBundle once or twice. The version of
+// the last bundle seen is remembered: /options/all?v=<version> is served as
+// immutable, so a repeat visit renders straight from the browser cache. The
+// current version is then checked with one conditional request (usually a
+// 304), and onBundle is called again only if the bundle changed.
+export async function fetchOptionsBundle(api, onBundle) {
+  const fetchBundle = async (url) => {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`Failed to load ${url}: ${response.status}`);
+    }
+    return { bundle: await response.json(), version: bundleVersion(response) };
+  };
+
+  let shownVersion = null;
+  const knownVersion = localStorage.getItem(OPTIONS_VERSION_KEY);
+  if (knownVersion) {
+    try {
+      const cached = await fetchBundle(`${api}/options/all?v=${encodeURIComponent(knownVersion)}`);
+      onBundle(cached.bundle);
+      shownVersion = cached.version;
+    } catch (err) {
+      console.error('Failed to load cached options bundle:', err);
+    }
+  }
+
+  try {
+    const latest = await fetchBundle(`${api}/options/all`);
+    if (latest.version) {
+      localStorage.setItem(OPTIONS_VERSION_KEY, latest.version);
+    }
+    if (!shownVersion || latest.version !== shownVersion) {
+      onBundle(latest.bundle);
+    }
+  } catch (err) {
+    if (!shownVersion) throw err;
+    console.error('Failed to revalidate options bundle:', err);
+  }
+}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import Navbar from '../components/Navbar';
@@ -81,11 +81,22 @@ export default function AdminPage() {
   
   // Modal state
   const [selectedSubmission, setSelectedSubmission] = useState(null);
+  const [unavailablePreviews, setUnavailablePreviews] = useState({});
+  const [evidencePreviewUrl, setEvidencePreviewUrl] = useState(null);
   const [moderationNotes, setModerationNotes] = useState('');
   const [moderating, setModerating] = useState(false);
   const [viewingEvidence, setViewingEvidence] = useState(false);
 
   const pageSize = 20;
+  // Keyset cursor of each submissions page already visited (page 0 starts at the top)
+  const submissionCursors = useRef([null]);
+
+  const submissionsPageUrl = (page) => {
+    const statusParam = statusFilter !== 'all' ? `&status=${statusFilter}` : '';
+    const cursor = submissionCursors.current[page];
+    const position = cursor ? `cursor=${encodeURIComponent(cursor)}` : `skip=${page * pageSize}`;
+    return `${API}/admin/submissions?${position}&limit=${pageSize}${statusParam}`;
+  };
 
   // Check admin access
   useEffect(() => {
@@ -118,6 +129,51 @@ export default function AdminPage() {
     }
   }, [isAdmin]);
 
+  // Load the evidence preview, polling while the server is still rendering it (202)
+  const previewFileId = selectedSubmission?.evidence_file_id;
+  useEffect(() => {
+    setEvidencePreviewUrl(null);
+    if (!previewFileId || unavailablePreviews[previewFileId]) return;
+
+    let cancelled = false;
+    let timer = null;
+    let objectUrl = null;
+    const markUnavailable = () => setUnavailablePreviews((prev) => ({ ...prev, [previewFileId]: true }));
+
+    const loadPreview = async (attempt) => {
+      try {
+        const response = await fetch(`${API}/admin/evidence/${previewFileId}/preview`, {
+          credentials: 'include'
+        });
+        if (cancelled) return;
+        if (response.status === 202) {
+          // Still rendering: try again later (gives up quietly after ~45s; reopening retries)
+          if (attempt < 8) {
+            timer = setTimeout(() => loadPreview(attempt + 1), Math.min(1000 * 2 ** attempt, 8000));
+          }
+          return;
+        }
+        if (!response.ok) {
+          markUnavailable();
+          return;
+        }
+        const blob = await response.blob();
+        if (cancelled) return;
+        objectUrl = URL.createObjectURL(blob);
+        setEvidencePreviewUrl(objectUrl);
+      } catch (error) {
+        console.error('Failed to load evidence preview:', error);
+      }
+    };
+
+    loadPreview(0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [previewFileId, unavailablePreviews]);
+
   // Fetch platform settings
   useEffect(() => {
     const fetchSettings = async () => {
@@ -277,13 +333,10 @@ export default function AdminPage() {
     const fetchSubmissions = async () => {
       setLoading(true);
       try {
-        const statusParam = statusFilter !== 'all' ? `&status=${statusFilter}` : '';
-        const response = await fetch(
-          `${API}/admin/submissions?skip=${currentPage * pageSize}&limit=${pageSize}${statusParam}`,
-          { credentials: 'include' }
-        );
+        const response = await fetch(submissionsPageUrl(currentPage), { credentials: 'include' });
         if (response.ok) {
           const data = await response.json();
+          submissionCursors.current[currentPage + 1] = data.next_cursor;
           setSubmissions(data.submissions);
           setTotalSubmissions(data.total);
         }
@@ -346,13 +399,10 @@ export default function AdminPage() {
         setSelectedSubmission(null);
         setModerationNotes('');
         // Refresh submissions
-        const statusParam = statusFilter !== 'all' ? `&status=${statusFilter}` : '';
-        const refreshResponse = await fetch(
-          `${API}/admin/submissions?skip=${currentPage * pageSize}&limit=${pageSize}${statusParam}`,
-          { credentials: 'include' }
-        );
+        const refreshResponse = await fetch(submissionsPageUrl(currentPage), { credentials: 'include' });
         if (refreshResponse.ok) {
           const data = await refreshResponse.json();
+          submissionCursors.current[currentPage + 1] = data.next_cursor;
           setSubmissions(data.submissions);
           setTotalSubmissions(data.total);
         }
@@ -560,7 +610,7 @@ export default function AdminPage() {
             <div className="flex items-center justify-between mb-4">
               <div className="flex items-center space-x-2">
                 <Label>Filter by status:</Label>
-                <Select value={statusFilter} onValueChange={(v) => { setStatusFilter(v); setCurrentPage(0); }}>
+                <Select value={statusFilter} onValueChange={(v) => { submissionCursors.current = [null]; setStatusFilter(v); setCurrentPage(0); }}>
                   <SelectTrigger className="w-40" data-testid="status-filter">
                     <SelectValue />
                   </SelectTrigger>
@@ -1522,6 +1572,15 @@ export default function AdminPage() {
                       View Evidence
                     </Button>
                   </div>
+                  {evidencePreviewUrl && (
+                    <img
+                      src={evidencePreviewUrl}
+                      alt="Evidence preview"
+                      className="mt-3 max-h-64 rounded border border-blue-200 bg-white"
+                      onError={() => setUnavailablePreviews((prev) => ({ ...prev, [selectedSubmission.evidence_file_id]: true }))}
+                      data-testid="evidence-preview"
+                    />
+                  )}
                 </div>
               )}
 
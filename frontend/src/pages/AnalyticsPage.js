@@ -9,6 +9,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '../components/ui/tabs'
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../components/ui/select';
 import { Badge } from '../components/ui/badge';
 import { Progress } from '../components/ui/progress';
+import { fetchAllPages } from '../lib/catalog';
 import { 
   BarChart, 
   Bar, 
@@ -87,7 +88,7 @@ export default function AnalyticsPage() {
       try {
         const [overviewRes, publishersRes, pubAnalytics, journalAnalytics, areaAnalytics, visibilityRes] = await Promise.all([
           fetch(`${API}/analytics/overview`).then(r => r.json()),
-          fetch(`${API}/publishers`).then(r => r.json()),
+          fetchAllPages(`${API}/publishers`),
           fetch(`${API}/analytics/publishers`).then(r => r.json()),
           fetch(`${API}/analytics/journals`).then(r => r.json()),
           fetch(`${API}/analytics/areas`).then(r => r.json()),
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useLanguage } from '../i18n/LanguageContext';
 import { useAuth } from '../contexts/AuthContext';
@@ -11,6 +11,7 @@ import { RadioGroup, RadioGroupItem } from '../components/ui/radio-group';
 import { Checkbox } from '../components/ui/checkbox';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../components/ui/select';
 import { Progress } from '../components/ui/progress';
+import { fetchAllPages, fetchOptionsBundle } from '../lib/catalog';
 import { 
   ChevronRight, 
   ChevronLeft, 
@@ -116,44 +117,31 @@ export default function SubmissionPage() {
     const fetchOptions = async () => {
       setLoading(true);
       try {
-        const [
-          grandeAreas, types, decisions, reviewers, times, apcs, 
-          reviewComments, editorComments, coherence, publishers,
-          reviewQuality, feedbackClarity, fairness, recommend
-        ] = await Promise.all([
-          fetch(`${API}/options/cnpq/grande-areas`).then(r => r.json()),
-          fetch(`${API}/options/manuscript-types`).then(r => r.json()),
-          fetch(`${API}/options/decision-types`).then(r => r.json()),
-          fetch(`${API}/options/reviewer-counts`).then(r => r.json()),
-          fetch(`${API}/options/time-ranges`).then(r => r.json()),
-          fetch(`${API}/options/apc-ranges`).then(r => r.json()),
-          fetch(`${API}/options/review-comment-types`).then(r => r.json()),
-          fetch(`${API}/options/editor-comment-types`).then(r => r.json()),
-          fetch(`${API}/options/coherence-options`).then(r => r.json()),
-          fetch(`${API}/publishers`).then(r => r.json()),
-          fetch(`${API}/options/review-quality-scale`).then(r => r.json()),
-          fetch(`${API}/options/feedback-clarity-scale`).then(r => r.json()),
-          fetch(`${API}/options/decision-fairness`).then(r => r.json()),
-          fetch(`${API}/options/would-recommend`).then(r => r.json())
-        ]);
-        
-        setCnpqOptions(prev => ({ ...prev, grandeAreas }));
-        setOptions({
-          scientificAreas: grandeAreas, // Legacy compatibility
-          manuscriptTypes: types,
-          decisionTypes: decisions,
-          reviewerCounts: reviewers,
-          timeRanges: times,
-          apcRanges: apcs,
-          reviewCommentTypes: reviewComments,
-          editorCommentTypes: editorComments,
-          coherenceOptions: coherence,
-          publishers: publishers,
-          journals: [],
-          reviewQualityScale: reviewQuality,
-          feedbackClarityScale: feedbackClarity,
-          decisionFairnessOptions: fairness,
-          wouldRecommendOptions: recommend
+        // One bundle with every option list, shown from the browser cache when
+        // its version is known and replaced if a newer one is published
+        await fetchOptionsBundle(API, (bundle) => {
+          const grandeAreas = bundle.grande_areas;
+          
+          setCnpqOptions(prev => ({ ...prev, grandeAreas }));
+          // Keeps the journals loaded for a publisher picked meanwhile
+          setOptions(prev => ({
+            ...prev,
+            scientificAreas: grandeAreas, // Legacy compatibility
+            manuscriptTypes: bundle.manuscript_types,
+            decisionTypes: bundle.decision_types,
+            reviewerCounts: bundle.reviewer_counts,
+            timeRanges: bundle.time_ranges,
+            apcRanges: bundle.apc_ranges,
+            reviewCommentTypes: bundle.review_comment_types,
+            editorCommentTypes: bundle.editor_comment_types,
+            coherenceOptions: bundle.coherence_options,
+            publishers: bundle.publishers,
+            reviewQualityScale: bundle.review_quality_scale,
+            feedbackClarityScale: bundle.feedback_clarity_scale,
+            decisionFairnessOptions: bundle.decision_fairness_options,
+            wouldRecommendOptions: bundle.would_recommend_options
+          }));
+          setLoading(false);
         });
       } catch (err) {
         console.error('Failed to fetch options:', err);
@@ -204,7 +192,7 @@ export default function SubmissionPage() {
     const fetchJournals = async () => {
       if (formData.publisher_id) {
         try {
-          const journals = await fetch(`${API}/journals?publisher_id=${formData.publisher_id}`).then(r => r.json());
+          const journals = await fetchAllPages(`${API}/journals?publisher_id=${formData.publisher_id}`);
           setOptions(prev => ({ ...prev, journals }));
         } catch (err) {
           console.error('Failed to fetch journals:', err);
@@ -215,6 +203,42 @@ export default function SubmissionPage() {
     fetchJournals();
   }, [formData.publisher_id]);
 
+  // Journal search box (debounced, any publisher)
+  const [journalQuery, setJournalQuery] = useState('');
+  const [journalMatches, setJournalMatches] = useState([]);
+
+  useEffect(() => {
+    const query = journalQuery.trim();
+    if (!query) {
+      setJournalMatches([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const matches = await fetch(`${API}/journals/search?q=${encodeURIComponent(query)}&limit=8`).then(r => r.json());
+        if (!cancelled) setJournalMatches(matches);
+      } catch (err) {
+        console.error('Failed to search journals:', err);
+      }
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [journalQuery]);
+
+  const selectJournalMatch = (match) => {
+    updateFormData('publisher_id', match.publisher_id);
+    updateFormData('custom_publisher_name', '');
+    updateFormData('journal_id', match.journal_id);
+    updateFormData('custom_journal_name', '');
+    updateFormData('custom_journal_open_access', null);
+    updateFormData('custom_journal_apc_required', '');
+    setJournalQuery('');
+    setJournalMatches([]);
+  };
+
   const totalSteps = 6;  // Updated: Added Quality Assessment step
   const progress = (step / totalSteps) * 100;
 
@@ -244,17 +268,35 @@ export default function SubmissionPage() {
     }
   };
 
+  // Same payload => same Idempotency-Key, so retries after a dropped connection
+  // return the original submission instead of creating a duplicate
+  const idempotencyRef = useRef({ body: null, key: null });
+
+  const getIdempotencyKey = (body) => {
+    if (idempotencyRef.current.body !== body) {
+      const key = window.crypto?.randomUUID
+        ? window.crypto.randomUUID()
+        : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      idempotencyRef.current = { body, key };
+    }
+    return idempotencyRef.current.key;
+  };
+
   const handleSubmit = async () => {
     setSubmitting(true);
     setError(null);
     
     try {
       // Submit form data
+      const body = JSON.stringify(formData);
       const response = await fetch(`${API}/submissions`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: {
+          'Content-Type': 'application/json',
+          'Idempotency-Key': getIdempotencyKey(body)
+        },
         credentials: 'include',
-        body: JSON.stringify(formData)
+        body
       });
       
       if (!response.ok) throw new Error('Submission failed');
@@ -578,6 +620,36 @@ export default function SubmissionPage() {
             {/* Step 2: Journal Context */}
             {step === 2 && (
               <div className="space-y-6" data-testid="step-2">
+                <div>
+                  <Label className="text-stone-700 font-medium mb-3 block">
+                    {t('submission.searchJournal')}
+                  </Label>
+                  <Input
+                    value={journalQuery}
+                    onChange={(e) => setJournalQuery(e.target.value)}
+                    placeholder={t('submission.searchJournalPlaceholder')}
+                    className="w-full"
+                    data-testid="journal-search-input"
+                  />
+                  {journalMatches.length > 0 && (
+                    <div className="mt-2 border border-stone-200 rounded-lg divide-y divide-stone-100" data-testid="journal-search-results">
+                      {journalMatches.map(match => (
+                        <button
+                          key={match.journal_id}
+                          type="button"
+                          onClick={() => selectJournalMatch(match)}
+                          className="w-full text-left px-3 py-2 hover:bg-stone-50"
+                        >
+                          <span className="text-stone-800">{match.name}</span>
+                          {match.publisher_name && (
+                            <span className="text-stone-500 text-sm ml-2">{match.publisher_name}</span>
+                          )}
+                        </button>
+                      ))}
+                    </div>
+                  )}
+                </div>
+
                 <div>
                   <Label className="text-stone-700 font-medium mb-3 block">
                     {t('submission.selectPublisher')}